@@ -0,0 +1,173 @@
+from multiprocessing.managers import BaseManager, SyncManager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import json
+import multiprocessing
+import os
+import re
+import time
+
+import yaml
+
+from ghost_writer.utils.image_client import TokenBucket
+
+# GhostWriter flags a manifest entry may override through its "options"
+BOOK_OPTIONS = {
+    "disable_illustration", "incremental_pdf", "scene_concurrency", "chapter_concurrency", "illustration_workers",
+    "dag_scheduling", "max_parallel_tasks", "compact_prompt_context", "prompt_token_budget",
+    "stream_scenes", "pdf_image_profile", "atomic_transcript",
+    "memory_scope", "memory_max_items", "memory_eviction", "memory_batch_size", "pdf_preview_debounce",
+    "continuity", "continuity_token_budget", "continuity_summarizer", "progress_interval", "output_formats",
+}
+
+class BatchManager(BaseManager):
+    """Hosts the rate limiters shared by every book process of a batch."""
+
+BatchManager.register("TokenBucket", TokenBucket)
+
+def load_manifest(path: str) -> List[dict]:
+    """
+    Reads the books of a batch from a JSONL file (one book per line) or a YAML file (a list of
+    books, or a mapping with a "books" list).
+
+    Every book needs an idea, author and title; "id" (defaults to a slug of the title) names
+    its output directory, and "options" overrides GhostWriter flags for that book.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    if Path(path).suffix in (".yaml", ".yml"):
+        books = yaml.safe_load(text)
+        books = books["books"] if isinstance(books, dict) else books
+    else:
+        books = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    seen = set()
+    for index, book in enumerate(books):
+        missing = [key for key in ("idea", "author", "title") if not book.get(key)]
+        if missing:
+            raise ValueError(f"Book {index + 1} of {path} is missing {', '.join(missing)}.")
+        unknown = set(book.get("options", {})) - BOOK_OPTIONS
+        if unknown:
+            raise ValueError(f"Book {index + 1} of {path} has unknown options: {', '.join(sorted(unknown))}.")
+
+        book_id = book.get("id") or re.sub(r"[^a-z0-9]+", "_", book["title"].lower()).strip("_") or f"book_{index + 1}"
+        while book_id in seen:
+            book_id = f"{book_id}_{index + 1}"
+        seen.add(book_id)
+        book["id"] = book_id
+    return books
+
+def run_book(book: dict, output_path: str, status, llm_limiter=None, image_limiter=None):
+    """
+    Writes one book of a batch; runs in its own process.
+
+    crewAI resolves its memory storage directory at import time, so CREWAI_STORAGE_DIR is set
+    before the crew is imported to keep the memories of the books apart.
+    """
+    os.environ["CREWAI_STORAGE_DIR"] = f"ghost_writer_{book['id']}"
+    from ghost_writer.crew import GhostWriter
+    from ghost_writer.utils.crewai_events import event_bus, llm_event
+    from ghost_writer.utils.image_client import share_rate_limiter
+
+    if llm_limiter is not None:
+        event_bus().register_handler(llm_event("LLMCallStartedEvent"), lambda source, event: llm_limiter.acquire())
+    if image_limiter is not None:
+        share_rate_limiter(image_limiter)
+
+    ghost_writer = GhostWriter()
+    ghost_writer.output_path = output_path
+    ghost_writer.resume = book.get("resume", False)
+    for option, value in book.get("options", {}).items():
+        setattr(ghost_writer, option, value)
+
+    ghost_writer.kickoff(inputs={"idea": book["idea"], "author": book["author"], "title": book["title"]})
+
+def _run_book_process(worker: Callable, book: dict, output_path: str, status, llm_limiter, image_limiter):
+    status[book["id"]] = {**status[book["id"]], "state": "running", "started": time.time(), "pid": os.getpid()}
+    try:
+        worker(book, output_path, status, llm_limiter, image_limiter)
+    except BaseException as e:
+        status[book["id"]] = {**status[book["id"]], "state": "failed", "finished": time.time(), "error": repr(e)}
+        raise
+    status[book["id"]] = {**status[book["id"]], "state": "done", "finished": time.time()}
+
+class BatchRunner:
+    """
+    Writes many books at once, each in its own process and output directory.
+
+    At most max_concurrent_books run at a time; a new book starts as soon as any running one
+    finishes, so a slow book never holds up the rest of the queue. LLM calls and image
+    requests of all books draw from shared token buckets, so the batch as a whole stays within
+    the provider's rate limits. The state of every book is written to status_path as the batch
+    progresses.
+    """
+
+    def __init__(
+            self,
+            books: List[dict],
+            output_root: str = "output/batch",
+            max_concurrent_books: int = 2,
+            llm_requests_per_minute: Optional[float] = None,
+            image_requests_per_minute: Optional[float] = None,
+            status_path: Optional[str] = None,
+            poll_interval: float = 2.0,
+            worker: Callable = run_book):
+        self.books = books
+        self.output_root = Path(output_root)
+        self.max_concurrent_books = max_concurrent_books
+        self.llm_requests_per_minute = llm_requests_per_minute
+        self.image_requests_per_minute = image_requests_per_minute
+        self.status_path = Path(status_path) if status_path else self.output_root / "status.json"
+        self.poll_interval = poll_interval
+        self.worker = worker
+
+    def run(self) -> Dict[str, dict]:
+        """
+        Runs every book and returns the final status per book id.
+        """
+        context = multiprocessing.get_context("spawn")
+        with SyncManager(ctx=context) as sync_manager, BatchManager(ctx=context) as limiter_manager:
+            llm_limiter = limiter_manager.TokenBucket(self.llm_requests_per_minute) if self.llm_requests_per_minute else None
+            image_limiter = limiter_manager.TokenBucket(self.image_requests_per_minute) if self.image_requests_per_minute else None
+            status = sync_manager.dict({
+                book["id"]: {
+                    "state": "queued",
+                    "title": book["title"],
+                    "output_path": str(self.output_root / book["id"]),
+                    # Scenes, chapters and images done and the ETA of the book (see ProgressTracker)
+                    "progress_path": str(self.output_root / book["id"] / "progress.json"),
+                }
+                for book in self.books
+            })
+
+            queue = list(self.books)
+            running: Dict[str, multiprocessing.Process] = {}
+            while queue or running:
+                for book_id, process in list(running.items()):
+                    if not process.is_alive():
+                        process.join()
+                        if status[book_id]["state"] != "failed" and process.exitcode != 0:
+                            status[book_id] = {**status[book_id], "state": "failed", "error": f"exit code {process.exitcode}"}
+                        del running[book_id]
+
+                while queue and len(running) < self.max_concurrent_books:
+                    book = queue.pop(0)
+                    process = context.Process(
+                        target=_run_book_process,
+                        args=(self.worker, book, str(self.output_root / book["id"]), status, llm_limiter, image_limiter),
+                        name=f"book-{book['id']}")
+                    process.start()
+                    running[book["id"]] = process
+
+                self._write_status(dict(status))
+                if running:
+                    time.sleep(self.poll_interval)
+
+            final_status = dict(status)
+        self._write_status(final_status)
+        return final_status
+
+    def _write_status(self, status: Dict[str, dict]):
+        self.status_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.status_path.with_name(f"{self.status_path.name}.tmp")
+        tmp_path.write_text(json.dumps(status, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.status_path)
@@ -0,0 +1,132 @@
+from pathlib import Path
+from typing import List
+import hashlib
+import random
+import time
+
+from crewai import Agent, Task
+
+from ghost_writer.models import Act, ArtisticVision, Book, Chapter, Character, Characters, Idea, Scene
+from ghost_writer.services.scene_writer import SceneWriter
+from ghost_writer.utils.fake_image_server import synthetic_png
+
+WORDS = (
+    "the lantern river quiet stone morning letter harbor shadow voice window promise winter "
+    "garden memory silver road distant bell answer thread storm candle bridge orchard smile "
+    "hand whisper field journey light archive map ember silence door tide moment"
+).split()
+
+def fake_text(seed: str, words: int) -> str:
+    """
+    Deterministic prose-like text: the same seed always yields the same paragraphs.
+    """
+    rng = random.Random(hashlib.sha256(seed.encode("utf-8")).hexdigest())
+    paragraphs = []
+    while words > 0:
+        count = min(words, 120)
+        sentence_words = [rng.choice(WORDS) for _ in range(count)]
+        paragraphs.append(" ".join(sentence_words).capitalize() + ".")
+        words -= count
+    return "\n\n".join(paragraphs)
+
+class FakeSceneWriter(SceneWriter):
+    """
+    SceneWriter that builds the real prompts but answers every scene task with deterministic
+    text after a fixed latency instead of calling the LLM.
+    """
+
+    def __init__(self, *args, latency: float = 0.0, words: int = 500, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latency = latency
+        self.words = words
+
+    def _execute(self, task: Task, scene: Scene) -> str:
+        time.sleep(self.latency)
+        return fake_text(task.description, self.words)
+
+class FakeIllustrator:
+    """
+    Illustrator that writes a synthetic PNG of the requested size after a fixed latency.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def run(self, prompt, filename=None, size="1024x1024"):
+        time.sleep(self.latency)
+        width, height = (int(value) for value in size.split("x"))
+        seed = hashlib.sha256(prompt.encode("utf-8")).digest()
+        path = Path(filename)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(synthetic_png(width, height, color=tuple(seed[:3])))
+        return f"Image generated and saved to {filename}."
+
+def fake_author_agent() -> Agent:
+    return Agent(role="Author", goal="Write the scenes of the book", backstory="A benchmark author.", verbose=False)
+
+def synthetic_idea() -> Idea:
+    return Idea(
+        premise="A cartographer maps a city that rearranges itself every night",
+        theme="Memory and belonging",
+        characters="Mara Quill, Teodor Venn",
+        plot_concepts="A map that changes, a missing archive",
+        tone_style="Lyrical and quiet",
+        narrative_perspective="Third-person limited",
+        symbolism="Maps as memory",
+        linquistic_constraints="Plain language",
+        inspirations="Invisible Cities",
+        core_philosophical_questions="Is a place the same if everyone forgets it?")
+
+def synthetic_characters() -> Characters:
+    return Characters(characters=[
+        Character(name=name, role=role, traits="Curious", backstory="Grew up by the harbor",
+                  motivations="Find the archive", flaws="Stubborn", relationships="Old friends")
+        for name, role in [("Mara Quill", "Protagonist"), ("Teodor Venn", "Mentor"), ("Ilse Marrow", "Rival")]
+    ])
+
+def synthetic_book() -> Book:
+    return Book(
+        title="The Shifting City",
+        author="A. Benchmark",
+        epigraph=fake_text("epigraph", 25),
+        preface=fake_text("preface", 200),
+        authors_note=fake_text("authors_note", 150),
+        genre="Literary fantasy",
+        description="A city that will not stay still.")
+
+def synthetic_artistic_vision() -> ArtisticVision:
+    return ArtisticVision(
+        genre="Literary fantasy", tone="Quiet", style="Ink and wash", themes="Memory",
+        target_audience="Adults", visual_elements="Maps", color_palette="Sepia and blue",
+        description="Hand drawn maps that blur at the edges.")
+
+def synthetic_acts(chapters: int, scenes_per_chapter: int = 3, acts: int = 3) -> List[Act]:
+    """
+    Splits chapters as evenly as possible over the acts, each with scenes_per_chapter scenes.
+    """
+    names = [c.name for c in synthetic_characters().characters]
+    result = []
+    chapter_index = 0
+    for act_number in range(1, acts + 1):
+        act_chapters = []
+        for _ in range(chapters // acts + (1 if act_number <= chapters % acts else 0)):
+            chapter_index += 1
+            act_chapters.append(Chapter(
+                chapter_title=f"Chapter {chapter_index}",
+                chapter_description=fake_text(f"chapter-{chapter_index}", 20),
+                chapter_plot=fake_text(f"chapter-plot-{chapter_index}", 40),
+                scenes=[
+                    Scene(
+                        scene_title=f"Scene {chapter_index}.{scene_index}",
+                        scene_description=fake_text(f"scene-{chapter_index}-{scene_index}", 20),
+                        characters=names[(chapter_index + scene_index) % len(names)],
+                        scene_plot=fake_text(f"scene-plot-{chapter_index}-{scene_index}", 40))
+                    for scene_index in range(1, scenes_per_chapter + 1)
+                ]))
+        result.append(Act(
+            act_number=act_number,
+            act_title=f"Act {act_number}",
+            act_description=fake_text(f"act-{act_number}", 20),
+            act_plot=fake_text(f"act-plot-{act_number}", 40),
+            chapters=act_chapters))
+    return result
@@ -0,0 +1,78 @@
+from typing import Dict, List, Sequence
+import argparse
+import re
+import subprocess
+import sys
+
+# Modules the CLI must not load before a command actually needs them
+HEAVY_MODULES = ("crewai", "litellm", "openai", "markdown_pdf", "pymupdf", "fitz", "chromadb")
+
+# Cumulative import time allowed per entry point, in seconds
+IMPORT_BUDGETS = {
+    "ghost_writer.main": 0.5,
+    "ghost_writer.batch": 0.5,
+}
+
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)$")
+
+def parse_import_times(report: str) -> Dict[str, float]:
+    """
+    Parses the stderr of `python -X importtime` into the cumulative import time in seconds of
+    every module that was imported.
+    """
+    times = {}
+    for line in report.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            times[match.group(4)] = int(match.group(2)) / 1_000_000
+    return times
+
+def import_times(module: str) -> Dict[str, float]:
+    """
+    Imports the module in a fresh interpreter with -X importtime and returns the cumulative
+    import time of every module it loaded.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True)
+    return parse_import_times(result.stderr)
+
+def check_import_budget(
+        module: str,
+        times: Dict[str, float],
+        budget: float,
+        forbidden: Sequence[str] = HEAVY_MODULES) -> List[str]:
+    """
+    Returns the problems in the import times of the module: heavy modules it loads eagerly and
+    an import time over budget. An empty list means the module is within its budget.
+    """
+    problems = [
+        f"{module} imports {name} at import time"
+        for name in forbidden
+        if name in times
+    ]
+    if times.get(module, 0) > budget:
+        problems.append(f"{module} takes {times[module]:.3f}s to import (budget {budget:.3f}s)")
+    return problems
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Check the import time of the ghost_writer entry points.")
+    parser.add_argument("modules", nargs="*", default=list(IMPORT_BUDGETS))
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per module.")
+    args = parser.parse_args(argv)
+
+    problems = []
+    for module in args.modules:
+        times = import_times(module)
+        print(f"{module}: {times.get(module, 0):.3f}s")
+        for name, seconds in sorted(times.items(), key=lambda item: item[1], reverse=True)[1:args.top + 1]:
+            print(f"  {seconds:8.3f}s  {name}")
+        problems += check_import_budget(module, times, IMPORT_BUDGETS.get(module, 0.5))
+
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if problems:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import json
+import multiprocessing
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from ghost_writer.benchmarks.fakes import (
+    FakeIllustrator, FakeSceneWriter, fake_author_agent, synthetic_acts, synthetic_artistic_vision,
+    synthetic_book, synthetic_characters, synthetic_idea)
+from ghost_writer.services.book_writer_service import BookWriterService
+from ghost_writer.tools.buffered_transcribe_tool import BufferedTranscribeTool
+from ghost_writer.tools.convert_to_pdf_tool import MarkdownToPDFTool
+
+DEFAULT_CHAPTER_COUNTS = [10, 50, 100, 500]
+
+@dataclass
+class BenchmarkConfig:
+    chapters: int
+    scenes_per_chapter: int = 3
+    scene_words: int = 500
+    scene_latency: float = 0.0
+    image_latency: float = 0.0
+    scene_concurrency: int = 1
+    chapter_concurrency: int = 1
+    illustration_workers: int = 0
+    incremental_pdf: bool = True
+    pdf_image_profile: Optional[str] = None
+    render_pdf: bool = True
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+@contextmanager
+def stage(stages: Dict[str, dict], name: str):
+    start = time.perf_counter()
+    yield
+    stages[name] = {"wall_time": round(time.perf_counter() - start, 4), "peak_rss_mb": peak_rss_mb()}
+
+def run_benchmark(config: BenchmarkConfig, output_path: str) -> dict:
+    """
+    Writes a synthetic book with fake LLM and image backends and times every stage.
+
+    Returns:
+        dict: The config, per-stage wall time and peak RSS, and the size of the output.
+    """
+    output = Path(output_path)
+    acts = synthetic_acts(config.chapters, config.scenes_per_chapter)
+    idea, characters = synthetic_idea(), synthetic_characters()
+    author = fake_author_agent()
+    transcriber = BufferedTranscribeTool(filename=str(output / "book.md"))
+    stages: Dict[str, dict] = {}
+
+    book_writer = BookWriterService(
+        author_agent=author,
+        transcriber=transcriber,
+        illustrator=FakeIllustrator(latency=config.image_latency),
+        pdf_tool=MarkdownToPDFTool(incremental=config.incremental_pdf),
+        output_path=str(output),
+        illustration_workers=config.illustration_workers,
+        chapter_concurrency=config.chapter_concurrency,
+        pdf_image_profile=config.pdf_image_profile,
+        scene_writer=FakeSceneWriter(
+            author_agent=author,
+            transcriber=transcriber,
+            max_concurrency=config.scene_concurrency,
+            compact_context=True,
+            latency=config.scene_latency,
+            words=config.scene_words))
+    book_writer.set_artistic_vision(synthetic_artistic_vision())
+
+    with stage(stages, "intro"):
+        book_writer.write_book_intro(synthetic_book())
+    with stage(stages, "acts"):
+        for act in acts:
+            book_writer.write_act(act, idea, characters)
+    with stage(stages, "illustrations"):
+        book_writer.illustration_writer.wait()
+    if config.render_pdf:
+        with stage(stages, "pdf"):
+            book_writer.save_pdf()
+        # A second render shows what the incremental renderer saves on unchanged sections
+        with stage(stages, "pdf_rerender"):
+            book_writer.save_pdf()
+    else:
+        transcriber.finalize()
+
+    book_writer.scene_writer.shutdown()
+    scenes = sum(len(chapter.scenes) for act in acts for chapter in act.chapters)
+    pdf_path = output / "book.pdf"
+    return {
+        "config": asdict(config),
+        "stages": stages,
+        "scenes": scenes,
+        "scenes_per_second": round(scenes / stages["acts"]["wall_time"], 2) if stages["acts"]["wall_time"] else None,
+        "book_md_bytes": (output / "book.md").stat().st_size,
+        "book_pdf_bytes": pdf_path.stat().st_size if pdf_path.exists() else None,
+    }
+
+def _run_isolated(config: BenchmarkConfig) -> dict:
+    with tempfile.TemporaryDirectory(prefix="ghost_writer_bench_") as output_path:
+        return run_benchmark(config, output_path)
+
+def git_revision() -> dict:
+    def git(*args) -> str:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    try:
+        return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": "unknown", "dirty": None}
+
+def run_suite(configs: List[BenchmarkConfig], results_path: str = "bench_output.txt") -> List[dict]:
+    """
+    Runs every config in a fresh process (so peak RSS is per config) and appends one JSON line
+    per result, tagged with the git commit and environment, to results_path.
+    """
+    revision = git_revision()
+    environment = {"python": platform.python_version(), "platform": platform.platform()}
+    results = []
+    for config in configs:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            result = pool.submit(_run_isolated, config).result()
+        result.update(timestamp=time.time(), **revision, environment=environment)
+        results.append(result)
+        with open(results_path, "a", encoding="utf-8") as results_file:
+            results_file.write(json.dumps(result) + "\n")
+
+        stages = "  ".join(f"{name} {values['wall_time']:.2f}s" for name, values in result["stages"].items())
+        print(f"{config.chapters:>4} chapters, {result['scenes']:>5} scenes: {stages}  "
+              f"peak RSS {max(v['peak_rss_mb'] or 0 for v in result['stages'].values())} MB")
+    return results
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the book-writing pipeline with fake LLM and image backends.")
+    parser.add_argument("--chapters", type=int, nargs="+", default=DEFAULT_CHAPTER_COUNTS)
+    parser.add_argument("--scenes-per-chapter", type=int, default=3)
+    parser.add_argument("--scene-words", type=int, default=500)
+    parser.add_argument("--scene-latency", type=float, default=0.0, help="Seconds per fake scene generation.")
+    parser.add_argument("--image-latency", type=float, default=0.0, help="Seconds per fake image generation.")
+    parser.add_argument("--scene-concurrency", type=int, default=1)
+    parser.add_argument("--chapter-concurrency", type=int, default=1)
+    parser.add_argument("--illustration-workers", type=int, default=0)
+    parser.add_argument("--full-pdf", action="store_true", help="Disable incremental PDF rendering.")
+    parser.add_argument("--pdf-image-profile", choices=["print", "screen"], default=None)
+    parser.add_argument("--no-pdf", action="store_true", help="Skip the PDF stages.")
+    parser.add_argument("--results", default="bench_output.txt", help="JSON lines file the results are appended to.")
+    args = parser.parse_args(argv)
+
+    run_suite([
+        BenchmarkConfig(
+            chapters=chapters,
+            scenes_per_chapter=args.scenes_per_chapter,
+            scene_words=args.scene_words,
+            scene_latency=args.scene_latency,
+            image_latency=args.image_latency,
+            scene_concurrency=args.scene_concurrency,
+            chapter_concurrency=args.chapter_concurrency,
+            illustration_workers=args.illustration_workers,
+            incremental_pdf=not args.full_pdf,
+            pdf_image_profile=args.pdf_image_profile,
+            render_pdf=not args.no_pdf)
+        for chapters in args.chapters
+    ], results_path=args.results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import pytest
+
+from ghost_writer.benchmarks.import_time import IMPORT_BUDGETS, check_import_budget, import_times, parse_import_times
+
+REPORT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   yaml.error
+import time:      2000 |     900000 |     openai
+import time:      4000 |    1200000 | ghost_writer.batch
+"""
+
+def test_report_is_parsed_into_cumulative_seconds():
+    assert parse_import_times(REPORT) == {"yaml.error": 0.00012, "openai": 0.9, "ghost_writer.batch": 1.2}
+
+def test_eager_heavy_imports_and_slow_imports_are_reported():
+    problems = check_import_budget("ghost_writer.batch", parse_import_times(REPORT), budget=0.5)
+
+    assert problems == [
+        "ghost_writer.batch imports openai at import time",
+        "ghost_writer.batch takes 1.200s to import (budget 0.500s)",
+    ]
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS))
+def test_entry_points_stay_within_their_import_budget(module):
+    assert check_import_budget(module, import_times(module), IMPORT_BUDGETS[module]) == []
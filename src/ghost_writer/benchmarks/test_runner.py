@@ -0,0 +1,35 @@
+import json
+
+from ghost_writer.benchmarks.fakes import fake_text, synthetic_acts
+from ghost_writer.benchmarks.runner import BenchmarkConfig, run_benchmark, run_suite
+
+def test_synthetic_outline_spreads_chapters_over_acts():
+    acts = synthetic_acts(chapters=10, scenes_per_chapter=2)
+
+    assert [len(act.chapters) for act in acts] == [4, 3, 3]
+    assert all(len(chapter.scenes) == 2 for act in acts for chapter in act.chapters)
+    assert acts[2].chapters[-1].chapter_title == "Chapter 10"
+
+def test_fake_text_is_deterministic():
+    assert fake_text("seed", 250) == fake_text("seed", 250)
+    assert fake_text("seed", 250) != fake_text("other", 250)
+    assert len(fake_text("seed", 250).split()) == 250
+
+def test_benchmark_reports_every_stage(tmp_path):
+    result = run_benchmark(BenchmarkConfig(chapters=3, scenes_per_chapter=1, scene_words=50), str(tmp_path))
+
+    assert list(result["stages"]) == ["intro", "acts", "illustrations", "pdf", "pdf_rerender"]
+    assert result["scenes"] == 3
+    assert result["book_pdf_bytes"] > 0
+    assert "Scene 3.1" in (tmp_path / "book.md").read_text()
+
+def test_suite_appends_tagged_results(tmp_path):
+    results_path = tmp_path / "bench.jsonl"
+
+    run_suite([BenchmarkConfig(chapters=1, scenes_per_chapter=1, scene_words=20, render_pdf=False)], results_path=str(results_path))
+
+    [line] = results_path.read_text().splitlines()
+    result = json.loads(line)
+    assert "commit" in result
+    assert result["config"]["chapters"] == 1
+    assert result["stages"]["acts"]["peak_rss_mb"] > 0
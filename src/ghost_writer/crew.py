@@ -1,12 +1,26 @@
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task, before_kickoff
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from crewai.project import CrewBase, agent, crew, task, before_kickoff, after_kickoff
 from crewai.agents.agent_builder.base_agent import BaseAgent
 
+from ghost_writer.dag_crew import DagCrew
 from ghost_writer.models import Idea, Plot, Characters, Act, Book, ArtisticVision, SubPlots
+from ghost_writer.replay import ReplayCrew, ReplayFixtures, ReplayIllustrator, ReplaySceneWriter
 from ghost_writer.services.book_writer_service import BookWriterService
+from ghost_writer.services.checkpoint_store import CheckpointStore
+from ghost_writer.services.continuity_tracker import CONTINUITY_SUMMARIZERS, ContinuityTracker, author_summarizer
+from ghost_writer.services.crew_memory import ScopedCrewMemory
+from ghost_writer.services.progress_tracker import ProgressTracker
+from ghost_writer.services.scene_regenerator import SceneRegenerator
+from ghost_writer.services.scene_writer import SceneWriter
+from ghost_writer.tools.buffered_transcribe_tool import BufferedTranscribeTool
 from ghost_writer.tools.convert_to_pdf_tool import MarkdownToPDFTool
 from ghost_writer.utils.filesystem_utils import purge_directory
+from ghost_writer.utils.content_cache import ContentCache
+from ghost_writer.utils.metrics_recorder import MetricsRecorder, agent_usage, usage_delta
 
+from pathlib import Path
 from typing import List
 
 @CrewBase
@@ -18,19 +32,163 @@ class GhostWriter():
     
     # A cost savings measure that is useful when testing and debugging
     disable_illustration: bool = False
+
+    # Render the PDF per act / intro section and only re-render sections that changed
+    incremental_pdf: bool = True
+
+    # Maximum number of scenes of an act that are generated concurrently
+    scene_concurrency: int = 4
+
+    # Whole chapters (illustration and scenes) written at the same time, across acts. Chapters
+    # are written into fragments and appended to book.md in book order.
+    chapter_concurrency: int = 3
+
+    # Number of illustrations generated in the background while the text is being written
+    illustration_workers: int = 2
+
+    # Scene text and images are cached here across runs (outside of the purged output
+    # directory). Set cache_dir to None to always regenerate.
+    cache_dir: str = '.cache/ghost_writer'
+    cache_max_bytes: int = 2 * 1024 ** 3
+    cache_max_age_days: int = 30
+
+    # Everything a run produces (book.md, book.pdf, task outputs, checkpoints, traces) goes here
+    output_path: str = 'output'
+
+    # Continue an interrupted run from output/checkpoints instead of purging the output directory
+    resume: bool = False
+    checkpoints: CheckpointStore = None
+
+    # Run tasks as soon as the tasks in their context are done (e.g. book, artistic vision and
+    # characters right after ideation) instead of strictly in declaration order
+    dag_scheduling: bool = True
+    max_parallel_tasks: int = 3
+
+    # book.md is written through one buffered handle that is flushed at chapter boundaries.
+    # With atomic_transcript, book.md only grows by flushed chapters (plain appends; resume drops
+    # a torn tail) and is renamed into place at the end.
+    transcript_buffer_size: int = 64 * 1024
+    atomic_transcript: bool = False
+
+    # Scene prompts only carry the characters in the scene and stay within this token budget
+    compact_prompt_context: bool = True
+    prompt_token_budget: int = 3000
+
+    # Illustrations are downscaled and recompressed for this profile ('print' or 'screen')
+    # before they are embedded in the PDF. None embeds the generated PNGs as they are.
+    pdf_image_profile: str = 'print'
+
+    # The finished book is written as book.pdf ('pdf'), book.epub ('epub') and/or html/ with one
+    # page per chapter ('html'). Leaving out 'pdf' skips MarkdownPdf entirely, previews included.
+    output_formats: List[str] = ['pdf']
+
+    # Preview PDFs requested by the task callbacks render in the background; requests within
+    # pdf_preview_debounce seconds (or while a preview renders) collapse into the latest one.
+    # The final PDF is always rendered, after the last preview, at the end of the run.
+    pdf_preview_debounce: float = 1.0
+
+    # Stream scene text into book.md while it is generated. Only scenes that are not prefetched
+    # are streamed, so set scene_concurrency to 1 to stream every scene.
+    stream_scenes: bool = False
+
+    # Per-call wall time, tokens, LLM calls, retries and bytes written are appended to output/trace.jsonl
+    # and summarized by phase, act and chapter in output/trace_summary.json
+    metrics: MetricsRecorder = None
+
+    # Replay a recorded run (the output directory of an earlier run) without calling the LLM or
+    # the image API: every task, scene and illustration is served from the recording after
+    # replay_latency seconds. Everything else (scheduling, transcript, PDF) runs for real.
+    replay_from: str = None
+    replay_latency: float = 0.0
     
+    # Crew memory is kept in process, capped at memory_max_items per memory and dropped at every
+    # act ('act'), chapter ('chapter') or never ('book'). Saved memories are embedded in batches
+    # of memory_batch_size. Size and embedding calls per scope go to the trace as the "memory"
+    # phase. None uses crewAI's own unbounded memory.
+    memory_scope: str = 'act'
+    memory_max_items: int = 200
+    memory_eviction: str = 'lru'
+    memory_batch_size: int = 16
+    memory_embedder: dict = None
+    crew_memory: ScopedCrewMemory = None
+
+    # Every scene prompt carries a rolling summary of the scenes written before it in the act,
+    # within continuity_token_budget tokens. Each scene is summarized once, by the author
+    # ('author') or from its first sentences ('extractive', no LLM call). With continuity,
+    # scenes and chapters are written one at a time.
+    continuity: bool = False
+    continuity_token_budget: int = 600
+    continuity_summarizer: str = 'author'
+
+    # Completed and planned scenes, chapters and images, words per minute and an ETA are
+    # printed and written to output/progress.json at most every progress_interval seconds
+    progress_interval: float = 5.0
+    progress: ProgressTracker = None
+
     book_writer: BookWriterService = None
     book_idea: Idea = None
     book_characters: Characters = None
 
     @before_kickoff
     def on_before_kickoff(self, inputs):
-        # Delete the output directory if it exists
-        purge_directory('output')
+        if not self.resume:
+            # Delete the output directory if it exists
+            purge_directory(self.output_path)
+            self.checkpoints.reset()
+
+        self.metrics = MetricsRecorder(str(Path(self.output_path) / 'trace.jsonl'))
+        self._agent_usage = {}
+        if self.crew_memory:
+            self.crew_memory.metrics = self.metrics
+        self.progress = ProgressTracker(
+            status_path=str(Path(self.output_path) / 'progress.json'),
+            expected_acts=sum(1 for task in self.tasks if task.output_pydantic is Act),
+            report_interval=self.progress_interval)
+
+        transcriber = BufferedTranscribeTool(
+            filename=str(Path(self.output_path) / 'book.md'),
+            buffer_size=self.transcript_buffer_size,
+            atomic=self.atomic_transcript)
+        replay_options = {}
+        if self.replay_from:
+            fixtures = ReplayFixtures(self.replay_from)
+            replay_options = dict(
+                illustrator=ReplayIllustrator(fixtures, latency=self.replay_latency),
+                scene_writer=ReplaySceneWriter(
+                    author_agent=self.author(),
+                    transcriber=transcriber,
+                    max_concurrency=self.scene_concurrency,
+                    compact_context=self.compact_prompt_context,
+                    prompt_token_budget=self.prompt_token_budget,
+                    metrics=self.metrics,
+                    stream=self.stream_scenes,
+                    fixtures=fixtures,
+                    latency=self.replay_latency))
 
         self.book_writer = BookWriterService(
             author_agent=self.author(),
-            disable_illustration=self.disable_illustration)
+            transcriber=transcriber,
+            disable_illustration=self.disable_illustration,
+            output_path=self.output_path,
+            incremental_pdf=self.incremental_pdf,
+            scene_concurrency=self.scene_concurrency,
+            chapter_concurrency=self.chapter_concurrency,
+            illustration_workers=self.illustration_workers,
+            cache=None if self.replay_from else self._content_cache(),
+            checkpoints=self.checkpoints,
+            compact_prompt_context=self.compact_prompt_context,
+            prompt_token_budget=self.prompt_token_budget,
+            metrics=self.metrics,
+            stream_scenes=self.stream_scenes,
+            pdf_image_profile=self.pdf_image_profile,
+            memory=self.crew_memory,
+            pdf_preview_debounce=self.pdf_preview_debounce,
+            output_formats=self.output_formats,
+            continuity=self._continuity_tracker(),
+            progress=self.progress,
+            **replay_options)
+
+        self._replay_checkpointed_tasks()
         
        # MarkdownToPDFTool().run(
        #     markdown_path="output/book_finetuned.md",
@@ -38,6 +196,127 @@ class GhostWriter():
         
         return inputs
 
+    def _checkpointed(self, task: Task, callback):
+        # The task output is saved before the callback runs, so a crash while writing an act
+        # resumes with the same outline instead of asking the LLM for a new one.
+        def on_task_completed(task_output):
+            pydantic_output = task_output.pydantic
+            self.checkpoints.save_task_output(
+                task.name,
+                pydantic_output.model_dump_json() if pydantic_output else task_output.raw)
+            if callback:
+                callback(task_output)
+        return on_task_completed
+
+    def _replay_checkpointed_tasks(self):
+        """
+        Restores the output of every checkpointed task and re-runs its callback. Writing is
+        idempotent under checkpoints, so completed units are skipped and the chapter counter is
+        rebuilt from the restored outlines before the first incomplete unit is written.
+        """
+        if not self.resume:
+            return
+
+        for task in self.tasks:
+            saved_output = self.checkpoints.load_task_output(task.name)
+            if saved_output is None:
+                continue
+
+            task.output = TaskOutput(
+                name=task.name,
+                description=task.description,
+                raw=saved_output,
+                pydantic=task.output_pydantic.model_validate_json(saved_output) if task.output_pydantic else None,
+                agent=task.agent.role)
+            task.callback(task.output)
+
+    def _record_task_metrics(self, task_output):
+        task = next((task for task in self.tasks if task.name == task_output.name), None)
+        if task is None or self.metrics is None:
+            # Ad hoc scene tasks report through the crew as well; SceneWriter records those
+            return
+
+        # Agents only keep running totals, so diff against the last task the agent finished
+        usage = agent_usage(task.agent)
+        previous = self._agent_usage.get(id(task.agent), {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0})
+        self._agent_usage[id(task.agent)] = usage
+
+        llm = task.agent.llm
+        self.metrics.record(
+            "task",
+            task=task.name,
+            model=getattr(llm, "model", str(llm)),
+            wall_time=round(task.execution_duration or 0, 4),
+            bytes_written=len(task_output.raw.encode("utf-8")),
+            **usage_delta(previous, usage))
+
+    def _content_cache(self):
+        if not self.cache_dir:
+            return None
+        return ContentCache(
+            cache_dir=self.cache_dir,
+            max_bytes=self.cache_max_bytes,
+            max_age_seconds=self.cache_max_age_days * 24 * 60 * 60)
+
+    def _continuity_tracker(self):
+        if not self.continuity:
+            return None
+        if self.continuity_summarizer not in CONTINUITY_SUMMARIZERS:
+            raise ValueError(
+                f"Unknown continuity summarizer '{self.continuity_summarizer}', expected one of {', '.join(CONTINUITY_SUMMARIZERS)}.")
+
+        # A replay never calls the LLM, so its summaries are extracted
+        summarizer = 'extractive' if self.replay_from else self.continuity_summarizer
+        tracker = ContinuityTracker(
+            token_budget=self.continuity_token_budget,
+            cache=None if self.replay_from else self._content_cache(),
+            summarizer_name=summarizer,
+            metrics=self.metrics)
+        if summarizer == 'author':
+            tracker.summarize = author_summarizer(self.author(), tracker.summary_tokens)
+        return tracker
+
+    @after_kickoff
+    def on_after_kickoff(self, output):
+        # Final render; waits for any illustrations still being generated
+        self.book_writer.save_pdf()
+        if self.crew_memory:
+            self.crew_memory.report()
+        self.metrics.write_summary()
+        self.progress.finish()
+
+        failures = getattr(self.book_writer.illustrator, "failures", [])
+        for filename, error in failures:
+            print(f"Illustration {filename} could not be generated: {error}")
+        return output
+
+    def kickoff(self, inputs: dict):
+        """
+        Runs the crew. If the run fails (in a task, a chapter or the final render),
+        progress.json is marked as failed so schedulers polling it do not wait forever.
+        """
+        try:
+            crew = self.crew()
+            if crew.tasks:
+                return crew.kickoff(inputs=inputs)
+            return self._finish_restored_run(crew, inputs)
+        except BaseException:
+            if self.progress:
+                self.progress.finish("failed")
+            raise
+
+    def _finish_restored_run(self, crew: Crew, inputs: dict) -> CrewOutput:
+        # A resumed run whose task outputs were all checkpointed (e.g. it failed while writing
+        # the last act) has nothing left for crewAI to run, and crewAI cannot build the output
+        # of a crew without tasks. The kickoff hooks restore the outputs and finish the book.
+        for before_callback in crew.before_kickoff_callbacks:
+            inputs = before_callback(inputs)
+        outputs = [task.output for task in self.tasks]
+        output = CrewOutput(raw=outputs[-1].raw, pydantic=outputs[-1].pydantic, tasks_output=outputs)
+        for after_callback in crew.after_kickoff_callbacks:
+            output = after_callback(output)
+        return output
+
     @agent
     def idea_developer(self) -> Agent:
         return Agent(
@@ -119,13 +398,13 @@ class GhostWriter():
     def on_act_created(self, task_output):
         act = task_output.pydantic
         self.book_writer.write_act(act, self.book_idea, self.book_characters)
-        self.book_writer.save_pdf()
+        self.book_writer.save_pdf(final=False)
 
     def on_book_created(self, task_output):
         book = task_output.pydantic
 
         self.book_writer.write_book_intro(book)
-        self.book_writer.save_pdf()
+        self.book_writer.save_pdf(final=False)
 
     @task
     def book_development_task(self) -> Task:
@@ -171,12 +450,82 @@ class GhostWriter():
             callback=self.on_act_created,
         )
 
+    def scene_regenerator(self) -> SceneRegenerator:
+        """
+        Regenerates scenes of the book written to output_path with this crew's author and the
+        same prompt and PDF settings, without running the crew.
+        """
+        return SceneRegenerator(
+            output_path=self.output_path,
+            scene_writer=SceneWriter(
+                author_agent=self.author(),
+                compact_context=self.compact_prompt_context,
+                prompt_token_budget=self.prompt_token_budget),
+            pdf_tool=MarkdownToPDFTool(incremental=self.incremental_pdf),
+            pdf_image_profile=self.pdf_image_profile,
+            continuity=self._continuity_tracker())
+
     @crew
     def crew(self) -> Crew:
+        self.checkpoints = CheckpointStore(self.output_path)
+        for task in self.tasks:
+            task.callback = self._checkpointed(task, task.callback)
+            # tasks.yaml writes task outputs to output/; follow the configured output_path
+            if task.output_file and Path(task.output_file).parts[0] == 'output':
+                task.output_file = str(Path(self.output_path, *Path(task.output_file).parts[1:]))
+
+        # Checkpointed tasks are restored in on_before_kickoff instead of being run again
+        tasks = self.tasks
+        if self.resume:
+            tasks = [task for task in self.tasks if self.checkpoints.load_task_output(task.name) is None]
+
+        if self.replay_from:
+            if Path(self.replay_from).resolve() == Path(self.output_path).resolve():
+                raise ValueError("replay_from must not be the output directory, which is purged before the run.")
+            # No memory: it would embed every task output through the embedding API
+            return ReplayCrew(
+                agents=self.agents,
+                tasks=tasks,
+                process=Process.sequential,
+                verbose=True,
+                memory=False,
+                max_parallel_tasks=self.max_parallel_tasks if self.dag_scheduling else 1,
+                task_callback=self._record_task_metrics,
+                fixtures=ReplayFixtures(self.replay_from),
+                latency=self.replay_latency
+            )
+
+        memories = {}
+        if self.memory_scope:
+            # Chapters (and acts) written concurrently keep the memories of the ones still in flight
+            keep_scopes = self.chapter_concurrency if self.memory_scope == 'chapter' else (2 if self.chapter_concurrency > 1 else 1)
+            self.crew_memory = ScopedCrewMemory(
+                scope=self.memory_scope,
+                max_items=self.memory_max_items,
+                batch_size=self.memory_batch_size,
+                eviction=self.memory_eviction,
+                keep_scopes=keep_scopes,
+                embedder_config=self.memory_embedder)
+            memories = self.crew_memory.crew_memories()
+
+        if self.dag_scheduling:
+            return DagCrew(
+                agents=self.agents,
+                tasks=tasks,
+                process=Process.sequential,
+                verbose=True,
+                memory=True,
+                max_parallel_tasks=self.max_parallel_tasks,
+                task_callback=self._record_task_metrics,
+                **memories
+            )
+
         return Crew(
             agents=self.agents,
-            tasks=self.tasks, 
+            tasks=tasks, 
             process=Process.sequential,
             verbose=True,
-            memory=True
+            memory=True,
+            task_callback=self._record_task_metrics,
+            **memories
         )
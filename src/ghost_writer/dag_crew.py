@@ -0,0 +1,96 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List
+
+from crewai import Crew, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+
+def task_dependencies(tasks: List[Task]) -> List[List[int]]:
+    """
+    Derives the dependency graph of the tasks from their context lists.
+
+    Tasks without an explicit context depend on every task before them, which mirrors what
+    the sequential process feeds them. Context tasks that are not part of the list (e.g.
+    restored from a checkpoint) are considered done already.
+
+    Args:
+        tasks (List[Task]): The tasks in declaration order.
+
+    Returns:
+        List[List[int]]: For each task, the indexes of the tasks it depends on.
+    """
+    index_of = {id(task): index for index, task in enumerate(tasks)}
+    dependencies = []
+    for index, task in enumerate(tasks):
+        if isinstance(task.context, list):
+            dependencies.append(sorted(index_of[id(t)] for t in task.context if id(t) in index_of))
+        else:
+            dependencies.append(list(range(index)))
+    return dependencies
+
+class DagCrew(Crew):
+    """
+    Crew that runs every task as soon as the tasks in its context are done, instead of strictly
+    one after another, so the planning phase takes roughly the length of its critical path.
+
+    Tasks that share an agent never run at the same time, since crewAI agents keep
+    per-execution state. Task callbacks and the crew task_callback are deferred and always
+    fired in declaration order from the scheduling thread, exactly as the sequential process
+    would, so callbacks that build on each other (idea -> characters -> book -> acts) keep
+    working.
+    """
+
+    max_parallel_tasks: int = 3
+
+    def _execute_tasks(self, tasks: List[Task], start_index: int = 0, was_replayed: bool = False) -> CrewOutput:
+        dependencies = task_dependencies(tasks)
+        agents = [self._get_agent_to_use(task) for task in tasks]
+        callbacks = [task.callback for task in tasks]
+        crew_callback, self.task_callback = self.task_callback, None
+        for task in tasks:
+            task.callback = None
+
+        outputs: Dict[int, TaskOutput] = {}
+        running: Dict[Future, int] = {}
+        next_callback = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_parallel_tasks, thread_name_prefix="crew-task") as pool:
+                while next_callback < len(tasks):
+                    busy_agents = {id(agents[index]) for index in running.values()}
+                    for index, task in enumerate(tasks):
+                        if index in outputs or index in running.values() or id(agents[index]) in busy_agents:
+                            continue
+                        if not all(dependency in outputs for dependency in dependencies[index]):
+                            continue
+                        busy_agents.add(id(agents[index]))
+                        context = self._get_context(task, [outputs[dependency] for dependency in dependencies[index]])
+                        running[pool.submit(self._execute_dag_task, task, agents[index], context)] = index
+
+                    if running:
+                        done, _ = wait(running, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            outputs[running.pop(future)] = future.result()
+                    elif next_callback not in outputs:
+                        raise ValueError("Task context graph has a cycle or an unsatisfiable dependency.")
+
+                    # Fire callbacks for the longest finished prefix, in declaration order
+                    while next_callback in outputs:
+                        task, task_output = tasks[next_callback], outputs[next_callback]
+                        if callbacks[next_callback]:
+                            callbacks[next_callback](task_output)
+                        if crew_callback and crew_callback != callbacks[next_callback]:
+                            crew_callback(task_output)
+                        self._process_task_result(task, task_output)
+                        self._store_execution_log(task, task_output, next_callback, was_replayed)
+                        next_callback += 1
+        finally:
+            for task, callback in zip(tasks, callbacks):
+                task.callback = callback
+            self.task_callback = crew_callback
+
+        return self._create_crew_output([outputs[index] for index in range(len(tasks))])
+
+    def _execute_dag_task(self, task: Task, agent, context: str) -> TaskOutput:
+        tools = self._prepare_tools(agent, task, task.tools or agent.tools or [])
+        self._log_task_start(task, agent.role)
+        return task.execute_sync(agent=agent, context=context, tools=tools)
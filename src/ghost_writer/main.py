@@ -1,10 +1,10 @@
 #!/usr/bin/env python
+import argparse
 import sys
 import warnings
 
 from datetime import datetime
-
-from ghost_writer.crew import GhostWriter
+from pathlib import Path
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -12,9 +12,11 @@ warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 # crew locally, so refrain from adding unnecessary logic into this file.
 # Replace with inputs you want to test with, it will automatically
 # interpolate any tasks and agents information
+#
+# crewAI and the service layer take seconds to import, so each command imports what it needs
+# when it runs instead of at module import time.
 
-def run():
-    
+def default_inputs() -> dict:
     idea = """
     In a near-future world, an autistic scientist named Dr. Ada N. Sel—obsessed with patterns, vibration, 
     and the limits of perception—has created a revolutionary AI model capable of interpreting complex tactile 
@@ -37,13 +39,105 @@ def run():
     IMPORTANT: Avoid using em dashes. Use commas, periods, or parentheses instead depending on the context.
     """
 
-    inputs = {
+    return {
         'idea': idea,
         'author': 'Morgan Vale',
         'title': 'Tactile Reveries II: Of Silence and Substance'
     }
-    
+
+def run(resume: bool = False):
+    from ghost_writer.crew import GhostWriter
+
     try:
-        GhostWriter().crew().kickoff(inputs=inputs)
+        ghost_writer = GhostWriter()
+        ghost_writer.resume = resume
+        ghost_writer.kickoff(inputs=default_inputs())
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
+
+def resume():
+    """
+    Continue an interrupted run from the checkpoints in the output directory.
+    """
+    run(resume=True)
+
+def batch():
+    """
+    Write every book of a manifest (JSONL or YAML), each into output/batch/<book id>.
+    """
+    parser = argparse.ArgumentParser(description="Write a batch of books.")
+    parser.add_argument("manifest", help="JSONL or YAML file with an idea, author and title per book.")
+    parser.add_argument("--books", type=int, default=2, help="Books written at the same time.")
+    parser.add_argument("--llm-rpm", type=float, default=None, help="LLM calls per minute across all books.")
+    parser.add_argument("--image-rpm", type=float, default=None, help="Image requests per minute across all books.")
+    parser.add_argument("--output", default="output/batch", help="Directory that receives one folder per book.")
+    args = parser.parse_args(sys.argv[1:])
+
+    from ghost_writer.batch import BatchRunner, load_manifest
+
+    status = BatchRunner(
+        books=load_manifest(args.manifest),
+        output_root=args.output,
+        max_concurrent_books=args.books,
+        llm_requests_per_minute=args.llm_rpm,
+        image_requests_per_minute=args.image_rpm).run()
+
+    failed = [book_id for book_id, book in status.items() if book["state"] != "done"]
+    if failed:
+        raise Exception(f"{len(failed)} of {len(status)} books failed: {', '.join(failed)}")
+
+def regenerate():
+    """
+    Regenerate single scenes or whole chapters of a written book in place, without rerunning
+    the crew. Only the PDF sections that changed are rendered again.
+    """
+    parser = argparse.ArgumentParser(description="Regenerate scenes or chapters of a written book.")
+    parser.add_argument("targets", nargs="+", help="Chapters (e.g. 12) or scenes (e.g. 12.3, counted from 1) to regenerate.")
+    parser.add_argument("--output", default="output", help="Output directory of the run that wrote the book.")
+    parser.add_argument("--no-pdf", action="store_true", help="Only update book.md.")
+    args = parser.parse_args(sys.argv[1:])
+
+    from ghost_writer.crew import GhostWriter
+    from ghost_writer.services.scene_regenerator import parse_target
+
+    ghost_writer = GhostWriter()
+    ghost_writer.output_path = args.output
+    regenerator = ghost_writer.scene_regenerator()
+    for scene in regenerator.regenerate([parse_target(target) for target in args.targets]):
+        print(f"Chapter {scene.chapter_number}, scene {scene.scene_index + 1} '{scene.scene_title}': "
+              f"{scene.previous_words} -> {scene.words} words")
+    if not args.no_pdf:
+        print(regenerator.render_pdf())
+
+def _replay_arguments(description: str):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("fixtures", nargs="?", default="fixtures", help="Output directory of a recorded run.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per task, scene and image.")
+    parser.add_argument("--output", default="output/replay", help="Directory the replayed book is written to.")
+    return parser.parse_args(sys.argv[1:])
+
+def replay():
+    """
+    Replay a recorded run offline: every task, scene and illustration is served from the
+    recording, so the pipeline can be profiled end to end without any API calls.
+    """
+    _replay(_replay_arguments("Replay a recorded run without calling the LLM or the image API."))
+
+def _replay(args):
+    from ghost_writer.crew import GhostWriter
+
+    ghost_writer = GhostWriter()
+    ghost_writer.output_path = args.output
+    ghost_writer.replay_from = args.fixtures
+    ghost_writer.replay_latency = args.latency
+    ghost_writer.kickoff(inputs=default_inputs())
+
+def test():
+    """
+    Replay a recorded run and check that it produced a complete book.
+    """
+    args = _replay_arguments("Replay a recorded run and check its output.")
+    _replay(args)
+    missing = [name for name in ("book.md", "book.pdf") if not (Path(args.output) / name).exists()]
+    if missing:
+        raise Exception(f"The replay did not produce {', '.join(missing)}")
@@ -0,0 +1,132 @@
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import shutil
+import threading
+import time
+
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+from pydantic import ValidationError
+
+from ghost_writer.dag_crew import DagCrew
+from ghost_writer.models import Act, Scene
+from ghost_writer.services.checkpoint_store import CheckpointStore
+from ghost_writer.services.scene_writer import SceneWriter
+from ghost_writer.utils.fake_image_server import synthetic_png
+
+class ReplayFixtures:
+    """
+    The recorded output directory of an earlier run, read back as fixtures.
+
+    Task outputs come from checkpoints/tasks (falling back to the task's own output file, e.g.
+    ideation.json), scene text from checkpoints/scenes and illustrations from images/. Scenes
+    are matched by title and plot against the recorded act outlines, so they are found no
+    matter in which order the replay writes them.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.checkpoints = CheckpointStore(str(self.path))
+        self.images_path = self.path / "images"
+        self._scenes: Optional[Dict[Tuple[str, str], Tuple[int, int]]] = None
+        self._scenes_lock = threading.Lock()
+
+    def task_output(self, task: Task) -> str:
+        output = self.checkpoints.load_task_output(task.name)
+        if output is None and task.output_file:
+            output_file = self.path / Path(task.output_file).name
+            output = output_file.read_text(encoding="utf-8") if output_file.exists() else None
+        if output is None:
+            raise FileNotFoundError(f"No recorded output for task '{task.name}' in {self.path}.")
+        return output
+
+    def scene_text(self, scene: Scene) -> str:
+        location = self._scene_index().get((scene.scene_title, scene.scene_plot))
+        text = self.checkpoints.load_scene(*location) if location else None
+        if text is None:
+            raise FileNotFoundError(f"No recorded text for scene '{scene.scene_title}' in {self.path}.")
+        return text
+
+    def image(self, filename: str) -> Optional[Path]:
+        path = self.images_path / Path(filename).name
+        return path if path.exists() else None
+
+    def _scene_index(self) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        with self._scenes_lock:
+            if self._scenes is None:
+                acts = []
+                for path in sorted(self.checkpoints.tasks_path.glob("*.json")):
+                    try:
+                        acts.append(Act.model_validate_json(path.read_text(encoding="utf-8")))
+                    except ValidationError:
+                        continue
+
+                # Chapters are numbered across acts, exactly as BookWriterService numbers them
+                self._scenes = {}
+                chapter_number = 0
+                for act in sorted(acts, key=lambda act: act.act_number):
+                    for chapter in act.chapters:
+                        chapter_number += 1
+                        for scene_index, scene in enumerate(chapter.scenes):
+                            self._scenes.setdefault((scene.scene_title, scene.scene_plot), (chapter_number, scene_index))
+            return self._scenes
+
+class ReplayCrew(DagCrew):
+    """
+    DagCrew that answers every task from recorded fixtures after a simulated latency instead of
+    calling the LLM. Scheduling, callbacks, checkpoints and output files work as in a real run.
+    """
+
+    fixtures: Any = None
+    latency: float = 0.0
+
+    def _execute_dag_task(self, task: Task, agent, context: str) -> TaskOutput:
+        time.sleep(self.latency)
+        raw = self.fixtures.task_output(task)
+        task.output = TaskOutput(
+            name=task.name,
+            description=task.description,
+            raw=raw,
+            pydantic=task.output_pydantic.model_validate_json(raw) if task.output_pydantic else None,
+            agent=agent.role)
+        if task.output_file:
+            task._save_file(raw)
+        return task.output
+
+class ReplaySceneWriter(SceneWriter):
+    """
+    SceneWriter that builds the real prompts but answers every scene task with the recorded
+    scene text after a simulated latency.
+    """
+
+    def __init__(self, *args, fixtures: ReplayFixtures, latency: float = 0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fixtures = fixtures
+        self.latency = latency
+
+    def _execute(self, task: Task, scene: Scene) -> str:
+        time.sleep(self.latency)
+        return self.fixtures.scene_text(scene)
+
+class ReplayIllustrator:
+    """
+    Illustrator that copies the recorded image after a simulated latency, or writes a synthetic
+    PNG of the requested size when the recording has none (e.g. illustration was disabled).
+    """
+
+    def __init__(self, fixtures: ReplayFixtures, latency: float = 0.0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.failures = []
+
+    def run(self, prompt, filename=None, size="1024x1024"):
+        time.sleep(self.latency)
+        path = Path(filename)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        recorded = self.fixtures.image(filename)
+        if recorded:
+            shutil.copyfile(recorded, path)
+        else:
+            width, height = (int(value) for value in size.split("x"))
+            path.write_bytes(synthetic_png(width, height))
+        return f"Image generated and saved to {filename}."
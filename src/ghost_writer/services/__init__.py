@@ -1,3 +1,8 @@
-from .book_writer_service import BookWriterService
-
 __all__ = ["BookWriterService"]
+
+def __getattr__(name):
+    # The service layer pulls in crewAI; load it on first use rather than with the package
+    if name == "BookWriterService":
+        from .book_writer_service import BookWriterService
+        return BookWriterService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
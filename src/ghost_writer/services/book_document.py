@@ -0,0 +1,209 @@
+from array import array
+from enum import IntEnum
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import threading
+
+from ghost_writer.utils.markdown_utils import add_page_break, header_markdown, image_markdown, quote_block_markdown
+
+class NodeKind(IntEnum):
+    BOOK = 0
+    FRONT_MATTER = 1
+    ACT = 2
+    CHAPTER = 3
+    SCENE = 4
+    HEADING = 5
+    # Markdown written as is
+    TEXT = 6
+    # Prose followed by a blank line (preface, scene text)
+    PARAGRAPHS = 7
+    QUOTE = 8
+    IMAGE = 9
+    PAGE_BREAK = 10
+
+ROOT = 0
+
+class BookDocument:
+    """
+    The book as a tree of front matter, acts, chapters, scenes, images and text, built by
+    BookWriterService as it writes.
+
+    Nodes are ids into parallel arrays (kind, parent, number, text, attribute, children), so
+    even a long book is a handful of flat lists rather than an object per paragraph. Every node
+    renders to the markdown fragment that is written to book.md for it; to_markdown() emits
+    them in document order, each followed by the newline the transcriber appends, so the
+    emitted markdown equals book.md and consumers never have to re-read and re-parse it.
+
+    Nodes can be added from several threads (chapters are written concurrently); children keep
+    the order they were added in, and a chapter's node is added before its content is written.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._kinds = array("B")
+        self._parents = array("i")
+        self._numbers = array("i")
+        self._texts: List[str] = []
+        self._attributes: List[Optional[str]] = []
+        self._children: List[array] = []
+        self.front_matter: Optional[int] = None
+        self.acts: Dict[int, int] = {}
+        self.chapters: Dict[int, int] = {}
+        self.scenes: Dict[Tuple[int, int], int] = {}
+        self._add(NodeKind.BOOK, -1)
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def add_front_matter(self) -> int:
+        with self._lock:
+            if self.front_matter is None:
+                self.front_matter = self._add(NodeKind.FRONT_MATTER, ROOT)
+            return self.front_matter
+
+    def add_act(self, act_number: int, title: str) -> int:
+        with self._lock:
+            if act_number not in self.acts:
+                self.acts[act_number] = self._add(NodeKind.ACT, ROOT, title, number=act_number)
+            return self.acts[act_number]
+
+    def add_chapter(self, act_node: int, chapter_number: int, title: str) -> int:
+        with self._lock:
+            if chapter_number not in self.chapters:
+                self.chapters[chapter_number] = self._add(NodeKind.CHAPTER, act_node, title, number=chapter_number)
+            return self.chapters[chapter_number]
+
+    def add_scene(self, chapter_node: int, scene_index: int, title: str) -> int:
+        with self._lock:
+            key = (self._numbers[chapter_node], scene_index)
+            if key not in self.scenes:
+                self.scenes[key] = self._add(NodeKind.SCENE, chapter_node, title, number=scene_index)
+            return self.scenes[key]
+
+    def add_heading(self, parent: int, text: str, level: int) -> int:
+        return self._add(NodeKind.HEADING, parent, text, number=level)
+
+    def add_text(self, parent: int, text: str) -> int:
+        return self._add(NodeKind.TEXT, parent, text)
+
+    def add_paragraphs(self, parent: int, text: str) -> int:
+        return self._add(NodeKind.PARAGRAPHS, parent, text)
+
+    def add_quote(self, parent: int, text: str, author: str) -> int:
+        return self._add(NodeKind.QUOTE, parent, text, attribute=author)
+
+    def add_image(self, parent: int, image_path: str, alt_text: str = "") -> int:
+        return self._add(NodeKind.IMAGE, parent, image_path, attribute=alt_text)
+
+    def add_page_break(self, parent: int) -> int:
+        return self._add(NodeKind.PAGE_BREAK, parent)
+
+    def kind(self, node: int) -> NodeKind:
+        return NodeKind(self._kinds[node])
+
+    def parent(self, node: int) -> int:
+        return self._parents[node]
+
+    def number(self, node: int) -> int:
+        return self._numbers[node]
+
+    def text(self, node: int) -> str:
+        return self._texts[node]
+
+    def children(self, node: int) -> List[int]:
+        with self._lock:
+            return list(self._children[node])
+
+    def set_text(self, node: int, text: str):
+        """Replaces the text of a node, e.g. a regenerated scene."""
+        with self._lock:
+            self._texts[node] = text
+
+    def move(self, node: int, position: int):
+        """Moves a node to the given position among its siblings."""
+        with self._lock:
+            siblings = self._children[self._parents[node]]
+            siblings.remove(node)
+            siblings.insert(position, node)
+
+    def scene_text(self, chapter_number: int, scene_index: int) -> Optional[str]:
+        """The prose of a scene, or None if the scene has not been written."""
+        scene = self.scenes.get((chapter_number, scene_index))
+        prose = [child for child in self.children(scene) if self.kind(child) == NodeKind.PARAGRAPHS] if scene is not None else []
+        return self.text(prose[0]) if prose else None
+
+    def walk(self, node: int = ROOT) -> Iterator[int]:
+        """Yields the node and all of its descendants in document order."""
+        with self._lock:
+            stack = [node]
+            order = []
+            while stack:
+                current = stack.pop()
+                order.append(current)
+                stack.extend(reversed(self._children[current]))
+        return iter(order)
+
+    def fragment(self, node: int, image_path: Callable[[str], str] = None) -> str:
+        """
+        The markdown written for the node itself (without its children or the transcriber's
+        newline). image_path maps the path of an image node, e.g. to a downscaled variant.
+        """
+        kind, text, number, attribute = self.kind(node), self._texts[node], self._numbers[node], self._attributes[node]
+        if kind == NodeKind.ACT:
+            return header_markdown(text=f"Act {number}: {text}", level=2)
+        if kind == NodeKind.CHAPTER:
+            return header_markdown(text=f"Chapter {number}: {text}", level=3)
+        if kind == NodeKind.SCENE:
+            return header_markdown(text=text, level=4)
+        if kind == NodeKind.HEADING:
+            return header_markdown(text=text, level=number)
+        if kind == NodeKind.TEXT:
+            return text
+        if kind == NodeKind.PARAGRAPHS:
+            return f"{text}\n\n"
+        if kind == NodeKind.QUOTE:
+            return quote_block_markdown(text=text, author=attribute)
+        if kind == NodeKind.IMAGE:
+            return image_markdown(image_path=image_path(text) if image_path else text, alt_text=attribute)
+        if kind == NodeKind.PAGE_BREAK:
+            return add_page_break()
+        return ""
+
+    def to_markdown(self, node: int = ROOT, image_path: Callable[[str], str] = None) -> str:
+        """Emits the markdown of the node and its descendants in one pass."""
+        return "".join(self._emit_nodes(self.walk(node), image_path)[1])
+
+    def sections(self, image_path: Callable[[str], str] = None) -> List[str]:
+        """
+        Emits the book as sections that each start at a level-2 heading (preface, author's
+        note, every act), with the title page as the first section. These are the sections the
+        incremental PDF renderer caches.
+        """
+        sections: List[List[str]] = [[]]
+        for node, markdown in zip(*self._emit_nodes(self.walk(), image_path)):
+            kind = self.kind(node)
+            if (kind == NodeKind.ACT or (kind == NodeKind.HEADING and self._numbers[node] == 2)) and sections[-1]:
+                sections.append([])
+            sections[-1].append(markdown)
+        return [section for section in ("".join(parts) for parts in sections) if section.strip()]
+
+    def _emit_nodes(self, nodes: Iterator[int], image_path) -> Tuple[List[int], List[str]]:
+        emitted_nodes, markdown = [], []
+        for node in nodes:
+            fragment = self.fragment(node, image_path)
+            if fragment or self.kind(node) == NodeKind.TEXT:
+                emitted_nodes.append(node)
+                markdown.append(fragment + "\n")
+        return emitted_nodes, markdown
+
+    def _add(self, kind: NodeKind, parent: int, text: str = "", number: int = 0, attribute: str = None) -> int:
+        with self._lock:
+            node = len(self._kinds)
+            self._kinds.append(kind)
+            self._parents.append(parent)
+            self._numbers.append(number)
+            self._texts.append(text)
+            self._attributes.append(attribute)
+            self._children.append(array("i"))
+            if parent >= 0:
+                self._children[parent].append(node)
+            return node
@@ -1,13 +1,24 @@
 from ghost_writer.models import Act, Chapter, Book, Idea, Characters
+from ghost_writer.tools.convert_to_epub_tool import MarkdownToEPUBTool, MarkdownToHTMLTool
 from ghost_writer.tools.convert_to_pdf_tool import MarkdownToPDFTool
 from ghost_writer.tools.transcribe_tool import TranscribeTool
 from ghost_writer.tools.illustrator_tool import IllustratorTool
-from ghost_writer.utils.markdown_utils import add_page_break, header_markdown, quote_block_markdown
+from ghost_writer.services.book_document import BookDocument
 from ghost_writer.services.illustration_writer import IllustrationWriter
+from ghost_writer.services.pdf_preview_renderer import PdfPreviewRenderer
+from ghost_writer.services.image_pipeline import ImagePipeline
 from ghost_writer.services.scene_writer import SceneWriter
+from ghost_writer.utils.metrics_recorder import NullMetricsRecorder
 from ghost_writer.services.writer_templates import  get_chapter_illustration_prompt, get_book_cover_illustration_prompt, get_book_frontispiece_illustration_prompt
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
+from typing import Deque, Dict, List, Tuple
+import threading
+
+# Formats the finished book is written in: book.pdf, book.epub and html/ (one page per chapter)
+OUTPUT_FORMATS = ("pdf", "epub", "html")
 
 class NullIllustrator:
     def run(self, prompt, filename=None, size=None):
@@ -22,23 +33,80 @@ class BookWriterService:
         illustrator=None, 
         disable_illustration=False, 
         pdf_tool=None,
-        output_path='output'
+        output_path='output',
+        incremental_pdf=False,
+        scene_concurrency=1,
+        illustration_workers=0,
+        cache=None,
+        checkpoints=None,
+        compact_prompt_context=False,
+        prompt_token_budget=None,
+        metrics=None,
+        stream_scenes=False,
+        image_pipeline=None,
+        pdf_image_profile=None,
+        scene_writer=None,
+        chapter_concurrency=1,
+        memory=None,
+        background_pdf_previews=True,
+        pdf_preview_debounce=0.0,
+        continuity=None,
+        progress=None,
+        output_formats=("pdf",),
+        epub_tool=None,
+        html_tool=None
     ):
+        if continuity:
+            # Every scene prompt carries the summaries of the scenes before it, so with
+            # continuity scenes and chapters are always written one at a time
+            scene_concurrency = chapter_concurrency = 1
+
+        unknown_formats = set(output_formats) - set(OUTPUT_FORMATS)
+        if unknown_formats:
+            raise ValueError(f"Unknown output formats {', '.join(sorted(unknown_formats))}, expected {', '.join(OUTPUT_FORMATS)}.")
+
         self.author_agent = author_agent
+        self.metrics = metrics or NullMetricsRecorder()
         self.transcriber = transcriber or TranscribeTool()
+        # Progress only counts illustrations that are generated, not NullIllustrator placeholders
+        self.illustrate = not disable_illustration
         self.illustrator = (
-            NullIllustrator() if disable_illustration else illustrator or IllustratorTool()
+            NullIllustrator() if disable_illustration else illustrator or IllustratorTool(cache=cache, metrics=metrics)
         )
-        self.chapter_number = 1
+        # Chapter numbers follow from the act outlines (see chapter_numbers), not from write order
+        self.act_chapter_counts: Dict[int, int] = {}
         self.artistic_vision = None
-        self.pdf_tool = pdf_tool or MarkdownToPDFTool()
+        self.pdf_tool = pdf_tool or MarkdownToPDFTool(incremental=incremental_pdf)
         self.output_path = Path(output_path)
         self.images_path = self.output_path / "images"
         self.book_md_path = self.output_path / "book.md"
         self.book_pdf_path = self.output_path / "book.pdf"
-        self.scene_writer = SceneWriter(
+        self.book_epub_path = self.output_path / "book.epub"
+        self.html_path = self.output_path / "html"
+        # Without "pdf", MarkdownPdf never runs: no previews and no final PDF
+        self.output_formats = tuple(output_formats)
+        self.epub_tool = epub_tool or MarkdownToEPUBTool()
+        self.html_tool = html_tool or MarkdownToHTMLTool()
+        self.book_author = None
+        self.fragments_path = self.output_path / "fragments"
+        # Illustrations are embedded as variants of this profile (see IMAGE_PROFILES); None
+        # embeds the generated originals
+        self.pdf_image_profile = pdf_image_profile
+        self.image_pipeline = image_pipeline or ImagePipeline(self.images_path, cache=cache)
+        self.scene_writer = scene_writer or SceneWriter(
             author_agent=self.author_agent,
-            transcriber=self.transcriber)
+            transcriber=self.transcriber,
+            max_concurrency=scene_concurrency,
+            cache=cache,
+            compact_context=compact_prompt_context,
+            prompt_token_budget=prompt_token_budget,
+            metrics=metrics,
+            stream=stream_scenes)
+        # Scene summaries per act (see ContinuityTracker); scenes are recorded as they are written
+        self.continuity = continuity
+        if continuity:
+            self.scene_writer.continuity = continuity
+            self.scene_writer.max_concurrency = 1
         
         self.output_path.mkdir(parents=True, exist_ok=True)
         self.images_path.mkdir(parents=True, exist_ok=True)
@@ -47,97 +115,327 @@ class BookWriterService:
             illustrator=self.illustrator,
             transcriber=self.transcriber,
             images_path=self.images_path,
-            output_path=self.output_path
+            output_path=self.output_path,
+            max_workers=illustration_workers,
+            image_pipeline=self.image_pipeline,
+            image_profile=pdf_image_profile,
+            progress=progress if self.illustrate else None
+        )
+
+        # With chapter_concurrency > 1 whole chapters are written concurrently into fragments,
+        # which are appended to book.md in book order as soon as every unit before them is done
+        self.chapter_executor = (
+            ThreadPoolExecutor(max_workers=chapter_concurrency, thread_name_prefix="chapter-writer")
+            if chapter_concurrency > 1 else None
+        )
+        self._units: Deque[Tuple[str, Future]] = deque()
+        self._units_lock = threading.RLock()
+
+        # The book as a tree (see BookDocument); everything written to book.md is emitted from it
+        self.document = BookDocument()
+
+        # Planned and completed scenes, chapters and images (see ProgressTracker)
+        self.progress = progress
+
+        # Scoped crew memory (see ScopedCrewMemory) is told where each act and chapter starts
+        self.memory = memory
+
+        # Intermediate previews render in the background and coalesce (see PdfPreviewRenderer)
+        self.pdf_previews = (
+            PdfPreviewRenderer(self.__render_pdf, debounce=pdf_preview_debounce)
+            if background_pdf_previews else None
         )
 
+        # Resumed runs cut book.md back to the end of the last fully written unit
+        self.checkpoints = checkpoints
+        if self.checkpoints and self.book_md_path.exists():
+            with open(self.book_md_path, 'r+b') as book_md:
+                book_md.truncate(self.checkpoints.transcript_size)
+
     def set_artistic_vision(self, vision):
         self.artistic_vision = vision
 
     def write_book_intro(self, book_info: Book):
-        self.__write_book_cover( book_info)
-        self.__write_frontispiece(book_info)
-        self.__write_epigraph(book_info)
-        self.transcriber.run(content=add_page_break())
-        self.__write_preface(book_info)
-        self.transcriber.run(content=add_page_break())
-        self.__write_authors_note(book_info)
-        self.transcriber.run(content=add_page_break())
+        document = self.document
+        self.book_author = book_info.author
+        front_matter = document.add_front_matter()
+        illustrations = {}
+
+        cover = self.__add_image(front_matter, "cover.png")
+        illustrations[cover] = (get_book_cover_illustration_prompt(book_info=book_info, artistic_vision=self.artistic_vision), '1024x1536')
+        document.add_heading(front_matter, book_info.title, level=1)
+        frontispiece = self.__add_image(front_matter, "frontispiece.png")
+        illustrations[frontispiece] = (get_book_frontispiece_illustration_prompt(book_info=book_info, artistic_vision=self.artistic_vision), '1024x1024')
+        document.add_quote(front_matter, book_info.epigraph, author=book_info.author)
+        document.add_page_break(front_matter)
+        document.add_heading(front_matter, "Preface", level=2)
+        document.add_paragraphs(front_matter, book_info.preface)
+        document.add_page_break(front_matter)
+        document.add_heading(front_matter, "Author's Note", level=2)
+        document.add_text(front_matter, book_info.authors_note)
+        document.add_page_break(front_matter)
+
+        # A resumed run only rebuilds the document for the intro it already wrote
+        complete = self.__is_complete("intro")
+        if self.progress:
+            self.progress.add_work(images=len(illustrations) if self.illustrate else 0, done=complete)
+        if complete:
+            return
+        for node in document.children(front_matter):
+            self.__write(node, illustration=illustrations.get(node))
+        self.__complete_unit("intro")
         
-    def save_pdf(self):
-        self.pdf_tool.run(
-            markdown_path=str(self.book_md_path),
-            output_pdf_path=str(self.book_pdf_path)
-        )
+    def save_pdf(self, final=True, profile=None):
+        """
+        Renders book.pdf from book.md, and on the final save the other output formats.
+
+        Args:
+            final (bool): Waits for outstanding chapters, illustrations and previews, finalizes
+                the transcript and renders in the calling thread. Intermediate saves only queue
+                a background preview when background previews are enabled.
+            profile (str): Image profile to embed; defaults to pdf_image_profile.
+        """
+        # Intermediate previews may render before background chapters and images land; the
+        # final render waits for all of them so the book is complete.
+        if final:
+            self.wait_for_chapters()
+            self.illustration_writer.wait()
+        self.__flush_transcript(finalize=final)
+
+        if "pdf" in self.output_formats:
+            if self.pdf_previews and not final:
+                self.pdf_previews.request(profile)
+                return
+            if self.pdf_previews:
+                # A pending preview is superseded by the final render; one that is already
+                # rendering has to finish first since the PDF libraries are not thread-safe
+                self.pdf_previews.wait(discard_pending=True)
+            self.__render_pdf(profile, final=final)
+        if final:
+            self.__export()
+
+    def __export(self):
+        # E-books reference the generated images as they are; no image profile applies
+        exports = [
+            (output_format, tool, path) for output_format, tool, path in (
+                ("epub", self.epub_tool, self.book_epub_path), ("html", self.html_tool, self.html_path))
+            if output_format in self.output_formats
+        ]
+        if not exports:
+            return
+        content = self.document.to_markdown() if len(self.document) > 1 else self.book_md_path.read_text(encoding="utf-8")
+        for output_format, tool, path in exports:
+            with self.metrics.measure(output_format, final=True) as metrics:
+                metrics["documents"] = tool.export(content, root=self.output_path, output_path=path, author=self.book_author)
+
+    def __render_pdf(self, profile=None, final=False):
+        profile = profile or self.pdf_image_profile
+        image_path = (lambda path: self.image_pipeline.variant_reference(path, self.output_path, profile)) if profile else None
+
+        with self.metrics.measure("pdf", final=final, profile=profile):
+            # The incremental renderer takes the sections straight from the document instead of
+            # re-reading and re-splitting book.md
+            if isinstance(self.pdf_tool, MarkdownToPDFTool) and self.pdf_tool.incremental:
+                self.pdf_tool.render_sections(
+                    self.document.sections(image_path=image_path),
+                    root=self.output_path,
+                    output_pdf_path=self.book_pdf_path,
+                    title=self.book_md_path.stem)
+                return
+
+            markdown_path = self.book_md_path
+            if profile:
+                markdown_path = self.output_path / f"book.{profile}.md"
+                markdown_path.write_text(self.document.to_markdown(image_path=image_path), encoding="utf-8")
+            self.pdf_tool.run(
+                markdown_path=str(markdown_path),
+                output_pdf_path=str(self.book_pdf_path)
+            )
+
+    @property
+    def chapter_number(self) -> int:
+        """The number the first chapter after the acts seen so far gets."""
+        return 1 + sum(self.act_chapter_counts.values())
+
+    def chapter_numbers(self, act: Act) -> List[int]:
+        """
+        Returns the book-wide numbers of the act's chapters. They only depend on the chapter
+        counts of the earlier acts, so chapters can be written in any order.
+
+        Raises:
+            ValueError: If the outline of an earlier act has not been seen yet.
+        """
+        self.act_chapter_counts[act.act_number] = len(act.chapters)
+        missing = [number for number in range(1, act.act_number) if number not in self.act_chapter_counts]
+        if missing:
+            raise ValueError(f"Chapters of act {act.act_number} cannot be numbered before the outline of act {missing[0]}.")
+
+        first = 1 + sum(self.act_chapter_counts[number] for number in range(1, act.act_number))
+        return list(range(first, first + len(act.chapters)))
 
     def write_act(self, act: Act, idea: Idea, characters: Characters):
-        act_header = header_markdown(text=f"Act {act.act_number}: {act.act_title}", level=2)
-        self.transcriber.run(content=act_header)
+        chapter_numbers = self.chapter_numbers(act)
+        if self.progress:
+            self.progress.add_act(act, images=self.illustrate)
+        if self.memory:
+            self.memory.enter("act", act.act_number)
 
-        for chapter in act.chapters:
-            self.__write_chapter(chapter, act, idea, characters)
+        act_node = self.document.add_act(act.act_number, act.act_title)
+        act_header_unit = f"act_{act.act_number}_header"
+        if not self.__is_complete(act_header_unit):
+            act_header = self.document.fragment(act_node)
+            if self.chapter_executor:
+                header = Future()
+                header.set_result(act_header + "\n")
+                self.__queue_unit(act_header_unit, header)
+            else:
+                self.transcriber.run(content=act_header)
+                self.__complete_unit(act_header_unit)
 
-    def __write_chapter(self, chapter: Chapter, act: Act, idea: Idea, characters: Characters):
-        chapter_header = header_markdown(
-            text=f"Chapter {self.chapter_number}: {chapter.chapter_title}", level=3
-        )
-        self.transcriber.run(content=chapter_header)
-
-        self.illustration_writer.write_illustration(
-            prompt=get_chapter_illustration_prompt(
-                chapter=chapter,
-                artistic_vision=self.artistic_vision
-            ),
-            size='1024x1024',
-            filename=str(f"chapter_{self.chapter_number:02}.png")
-        )
+        # Only scenes that are neither part of a finished chapter nor checkpointed need the LLM
+        self.scene_writer.prefetch_scenes(act, idea, characters, scenes=[
+            (chapter, scene)
+            for chapter_number, chapter in zip(chapter_numbers, act.chapters)
+            if not self.__is_complete(f"chapter_{chapter_number}")
+            for scene_index, scene in enumerate(chapter.scenes)
+            if self.__load_scene(chapter_number, scene_index) is None
+        ])
 
-        self.chapter_number += 1
+        for chapter_number, chapter in zip(chapter_numbers, act.chapters):
+            # Added in book order here, so concurrently written chapters keep their place
+            chapter_node = self.document.add_chapter(act_node, chapter_number, chapter.chapter_title)
+            chapter_unit = f"chapter_{chapter_number}"
+            if self.__is_complete(chapter_unit):
+                self.__restore_chapter(chapter_node, chapter_number, chapter, act)
+                continue
+            if self.chapter_executor:
+                self.__queue_unit(chapter_unit, self.chapter_executor.submit(
+                    self.__write_chapter_fragment, chapter_node, chapter_number, chapter, act, idea, characters))
+            else:
+                self.__write_chapter(chapter_node, chapter_number, chapter, act, idea, characters, self.transcriber)
+                self.__complete_unit(chapter_unit)
 
-        for scene in chapter.scenes:
-            self.scene_writer.write_scene(scene, act, chapter, idea, characters)
+    def wait_for_chapters(self):
+        """
+        Blocks until every queued chapter is written and appended to book.md.
 
-        self.transcriber.run(content=add_page_break())
+        Raises:
+            Exception: The first error of a chapter; book.md stops before that chapter.
+        """
+        with self._units_lock:
+            futures = [future for _, future in self._units]
+        wait(futures)
+        self.__commit_units()
+        for future in futures:
+            future.result()
 
-    def __write_authors_note(self, book_info: Book):
-        authors_note_header_md = header_markdown("Author's Note", level=2)
-        self.transcriber.run(content=authors_note_header_md)
-        
-        authors_note_md = book_info.authors_note
-        self.transcriber.run(content=authors_note_md)
+    def __write_chapter(self, chapter_node: int, chapter_number: int, chapter: Chapter, act: Act, idea: Idea, characters: Characters, transcriber, agent_factory=None):
+        self.__write(chapter_node, transcriber)
+        if self.memory:
+            self.memory.enter("chapter", act.act_number, chapter_number)
 
-    def __write_preface(self, book_info: Book):
-        preface_header_md = header_markdown("Preface", level=2)
-        self.transcriber.run(content=preface_header_md)
-        
-        self.transcriber.run(content=f"{book_info.preface}\n\n")
+        self.__write(
+            self.__add_image(chapter_node, f"chapter_{chapter_number:02}.png"),
+            transcriber,
+            illustration=(get_chapter_illustration_prompt(chapter=chapter, artistic_vision=self.artistic_vision), '1024x1024'))
 
-    def __write_epigraph(self, book_info: Book):
-        epigraph_md = quote_block_markdown(
-            text=book_info.epigraph,
-            author=book_info.author,
-        )
-        self.transcriber.run(content=epigraph_md)
-
-    def __write_frontispiece(self, book_info: Book):
-        self.illustration_writer.write_illustration(
-            prompt=get_book_frontispiece_illustration_prompt(
-                book_info=book_info,
-                artistic_vision=self.artistic_vision
-            ),
-            size='1024x1024',
-            filename=str("frontispiece.png")
-        )
+        for scene_index, scene in enumerate(chapter.scenes):
+            # SceneWriter writes the scene header and text; the document records them
+            scene_node = self.document.add_scene(chapter_node, scene_index, scene.scene_title)
+            paragraphs = self.__load_scene(chapter_number, scene_index)
+            restored = paragraphs is not None
+            if restored:
+                self.scene_writer.transcribe_scene(scene, paragraphs, transcriber=transcriber)
+            else:
+                paragraphs = self.scene_writer.write_scene(
+                    scene, act, chapter, idea, characters, transcriber=transcriber, agent_factory=agent_factory)
+                if self.checkpoints:
+                    self.checkpoints.save_scene(chapter_number, scene_index, paragraphs)
+            self.document.add_paragraphs(scene_node, paragraphs)
+            if self.continuity:
+                self.continuity.record(act.act_number, scene.scene_title, paragraphs)
+            if self.progress:
+                self.progress.scene_completed(len(paragraphs.split()), restored=restored)
 
-    def __write_book_cover(self, book_info: Book):
-        self.illustration_writer.write_illustration(
-            prompt=get_book_cover_illustration_prompt(
-                book_info=book_info,
-                artistic_vision=self.artistic_vision
-            ),
-            size='1024x1536',
-            filename=str("cover.png")
-        )
-    
-        title_md = header_markdown(text=book_info.title, level=1)
-        self.transcriber.run(content=title_md)
+        self.__write(self.document.add_page_break(chapter_node), transcriber)
+
+    def __restore_chapter(self, chapter_node: int, chapter_number: int, chapter: Chapter, act: Act):
+        # A chapter an earlier run completed is only added to the document, from its checkpoints
+        self.__add_image(chapter_node, f"chapter_{chapter_number:02}.png")
+        for scene_index, scene in enumerate(chapter.scenes):
+            scene_node = self.document.add_scene(chapter_node, scene_index, scene.scene_title)
+            paragraphs = self.__load_scene(chapter_number, scene_index)
+            if paragraphs is not None:
+                self.document.add_paragraphs(scene_node, paragraphs)
+                if self.continuity:
+                    self.continuity.record(act.act_number, scene.scene_title, paragraphs)
+        self.document.add_page_break(chapter_node)
+        if self.progress:
+            self.progress.restore(scenes=len(chapter.scenes), chapters=1, images=1 if self.illustrate else 0)
+
+    def __add_image(self, parent: int, filename: str) -> int:
+        # The same relative path IllustrationWriter writes into the image tag
+        return self.document.add_image(parent, str((self.images_path / filename).relative_to(self.output_path)), alt_text="Book Cover")
+
+    def __write(self, node: int, transcriber=None, illustration=None):
+        """
+        Writes the markdown of a document node. Image nodes with an illustration (prompt, size)
+        are handed to the IllustrationWriter, which writes the image tag itself.
+        """
+        transcriber = transcriber or self.transcriber
+        if illustration:
+            prompt, size = illustration
+            self.illustration_writer.write_illustration(
+                prompt=prompt, size=size, filename=Path(self.document.text(node)).name, transcriber=transcriber)
+        else:
+            transcriber.run(content=self.document.fragment(node))
+
+    def __write_chapter_fragment(self, chapter_node: int, chapter_number: int, chapter: Chapter, act: Act, idea: Idea, characters: Characters) -> str:
+        fragment_path = self.fragments_path / f"chapter_{chapter_number:02}.md"
+        fragment_path.parent.mkdir(parents=True, exist_ok=True)
+        fragment_path.unlink(missing_ok=True)
+
+        self.__write_chapter(
+            chapter_node, chapter_number, chapter, act, idea, characters,
+            transcriber=TranscribeTool(filename=str(fragment_path)),
+            agent_factory=self.scene_writer.worker_agent)
+
+        fragment = fragment_path.read_text(encoding="utf-8")
+        fragment_path.unlink()
+        return fragment
+
+    def __queue_unit(self, unit: str, future: Future):
+        with self._units_lock:
+            self._units.append((unit, future))
+        future.add_done_callback(lambda _: self.__commit_units())
+
+    def __commit_units(self):
+        # Appends finished units to book.md in book order; a failed unit stops the stitching
+        with self._units_lock:
+            while self._units and self._units[0][1].done():
+                unit, future = self._units[0]
+                if future.exception() is not None:
+                    return
+                self.transcriber.write(future.result())
+                self._units.popleft()
+                self.__complete_unit(unit)
+
+    def __flush_transcript(self, finalize=False):
+        flush = getattr(self.transcriber, "finalize" if finalize else "flush", None)
+        if callable(flush):
+            flush()
+
+    def __is_complete(self, unit: str) -> bool:
+        return bool(self.checkpoints) and self.checkpoints.is_complete(unit)
+
+    def __load_scene(self, chapter_number: int, scene_index: int):
+        return self.checkpoints.load_scene(chapter_number, scene_index) if self.checkpoints else None
 
+    def __complete_unit(self, unit: str):
+        # Unit boundaries (intro, act header, chapter) are where a buffered transcript is flushed
+        self.__flush_transcript()
+        if self.checkpoints:
+            size = self.book_md_path.stat().st_size if self.book_md_path.exists() else 0
+            self.checkpoints.complete(unit, transcript_size=size)
+        if self.progress and unit.startswith("chapter_"):
+            self.progress.chapter_completed()
@@ -0,0 +1,82 @@
+from pathlib import Path
+from typing import Optional
+import json
+import os
+
+class CheckpointStore:
+    """
+    Records the progress of a book run under <output>/checkpoints so an interrupted run can resume.
+
+    Three kinds of checkpoints are kept:
+        - task outputs: the structured output of every crew task, saved before its callback runs,
+        - scenes: the generated text of every scene, keyed by chapter number and scene index,
+        - units: transcript units (intro, act headers, chapters) that were fully written, together
+          with the size of book.md at that point so a partial unit can be cut off on resume.
+    """
+
+    def __init__(self, output_path='output'):
+        self.path = Path(output_path) / "checkpoints"
+        self.state_path = self.path / "state.json"
+        self.tasks_path = self.path / "tasks"
+        self.scenes_path = self.path / "scenes"
+        self.state = self._load_state()
+
+    def reset(self):
+        self.state = {"units": {}, "transcript_size": 0}
+
+    def save_task_output(self, task_name: str, output: str):
+        self._write(self.tasks_path / f"{task_name}.json", output)
+
+    def load_task_output(self, task_name: str) -> Optional[str]:
+        path = self.tasks_path / f"{task_name}.json"
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    def save_scene(self, chapter_number: int, scene_index: int, text: str):
+        self._write(self._scene_path(chapter_number, scene_index), text)
+
+    def load_scene(self, chapter_number: int, scene_index: int) -> Optional[str]:
+        path = self._scene_path(chapter_number, scene_index)
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    def is_complete(self, unit: str) -> bool:
+        return unit in self.state["units"]
+
+    def complete(self, unit: str, transcript_size: int):
+        self.state["units"][unit] = transcript_size
+        self.state["transcript_size"] = transcript_size
+        self._write(self.state_path, json.dumps(self.state, indent=2))
+
+    def shift_transcript(self, offset: int, delta: int):
+        """
+        Records that book.md grew by delta bytes (or shrank) at offset, e.g. because a scene was
+        replaced, so units completed after that point still cut book.md at their own end on resume.
+        """
+        if not delta:
+            return
+        units = self.state["units"]
+        for unit, size in units.items():
+            if size > offset:
+                units[unit] = size + delta
+        if self.state["transcript_size"] > offset:
+            self.state["transcript_size"] += delta
+        self._write(self.state_path, json.dumps(self.state, indent=2))
+
+    @property
+    def transcript_size(self) -> int:
+        """Size of book.md after the last completed unit."""
+        return self.state["transcript_size"]
+
+    def _load_state(self) -> dict:
+        if self.state_path.exists():
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        return {"units": {}, "transcript_size": 0}
+
+    def _scene_path(self, chapter_number: int, scene_index: int) -> Path:
+        return self.scenes_path / f"chapter_{chapter_number:02}_scene_{scene_index:02}.md"
+
+    def _write(self, path: Path, content: str):
+        # Write-then-rename so a crash never leaves a half written checkpoint behind
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(content, encoding="utf-8")
+        os.replace(tmp_path, path)
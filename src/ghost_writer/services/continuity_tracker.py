@@ -0,0 +1,117 @@
+from collections import deque
+from typing import Callable, Deque, Dict
+import hashlib
+import re
+import threading
+
+from ghost_writer.utils.content_cache import ContentCache
+from ghost_writer.utils.metrics_recorder import NullMetricsRecorder
+from ghost_writer.utils.token_utils import estimate_tokens, truncate_to_tokens
+
+CONTINUITY_SUMMARIZERS = ("author", "extractive")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def extractive_summary(text: str, max_tokens: int) -> str:
+    """
+    Summarizes scene text without an LLM: the first sentence of every paragraph, cut to
+    max_tokens.
+    """
+    paragraphs = [paragraph.strip() for paragraph in text.split("\n\n") if paragraph.strip()]
+    sentences = [_SENTENCE_END.split(paragraph, maxsplit=1)[0] for paragraph in paragraphs]
+    return truncate_to_tokens(" ".join(sentences), max_tokens)
+
+def author_summarizer(agent, max_tokens: int) -> Callable[[str], str]:
+    """
+    Summarizes scene text with a short task for the given agent (usually the author).
+    """
+    def summarize(text: str) -> str:
+        from crewai import Task
+
+        task = Task(
+            description=(
+                f"Summarize the following scene in at most {max_tokens * 3 // 4} words. Keep what later "
+                "scenes must stay consistent with: who was present, what happened, what changed, "
+                f"and any open threads. Plain prose, no headings.\n\nScene:\n{text}"),
+            expected_output="A short plain prose summary of the scene.",
+            agent=agent)
+        return truncate_to_tokens(task.execute_sync().raw.strip(), max_tokens)
+    return summarize
+
+class ContinuityTracker:
+    """
+    A rolling summary of the scenes written so far in each act, added to every scene prompt.
+
+    Every scene is summarized once, when it is recorded; summaries are memoized by the hash of
+    the scene text (and kept in the ContentCache across runs when one is given), so resumed,
+    replayed or unchanged scenes are never summarized again. context() returns the most recent
+    summaries of the act that fit into token_budget and older ones are dropped, so continuity
+    costs the same bounded number of prompt tokens per scene however long the act gets.
+
+    Scenes have to be recorded in book order before the next scene's prompt is built, so
+    BookWriterService writes scenes and chapters one at a time when continuity is on.
+    """
+
+    def __init__(
+            self,
+            summarize: Callable[[str], str] = None,
+            token_budget: int = 600,
+            summary_tokens: int = 150,
+            cache: ContentCache = None,
+            summarizer_name: str = "extractive",
+            metrics=None):
+        self.token_budget = token_budget
+        self.summary_tokens = min(summary_tokens, token_budget)
+        self.summarize = summarize or (lambda text: extractive_summary(text, self.summary_tokens))
+        self.summarizer_name = summarizer_name
+        self.cache = cache
+        self.metrics = metrics or NullMetricsRecorder()
+        self.summarized = 0
+        self.memoized = 0
+        self._summaries: Dict[str, str] = {}
+        self._acts: Dict[int, Deque[str]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, act_number: int, scene_title: str, text: str):
+        """Adds the scene, which was just written (or restored), to the act's rolling summary."""
+        entry = f"- {scene_title}: {self.summary(text, act=act_number, scene=scene_title)}"
+        with self._lock:
+            scenes = self._acts.setdefault(act_number, deque())
+            scenes.append(entry)
+            while len(scenes) > 1 and sum(estimate_tokens(line) for line in scenes) > self.token_budget:
+                scenes.popleft()
+
+    def context(self, act_number: int) -> str:
+        """The summaries of the act's most recent scenes, within token_budget."""
+        with self._lock:
+            lines = list(self._acts.get(act_number, ()))
+        return truncate_to_tokens("\n".join(lines), self.token_budget)
+
+    def reset(self, act_number: int):
+        """Forgets the act's rolling summary; memoized scene summaries are kept."""
+        with self._lock:
+            self._acts.pop(act_number, None)
+
+    def summary(self, text: str, **fields) -> str:
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            summary = self._summaries.get(text_hash)
+        if summary is not None:
+            self.memoized += 1
+            return summary
+
+        with self.metrics.measure("summary", summarizer=self.summarizer_name, **fields) as metrics:
+            cache_key = ContentCache.make_key(
+                kind="scene_summary", text=text_hash, summarizer=self.summarizer_name, tokens=self.summary_tokens)
+            summary = self.cache.get_text(cache_key) if self.cache else None
+            metrics["cached"] = summary is not None
+            if summary is None:
+                summary = self.summarize(text)
+                self.summarized += 1
+                if self.cache:
+                    self.cache.put_text(cache_key, summary)
+            metrics["summary_tokens"] = estimate_tokens(summary)
+
+        with self._lock:
+            self._summaries[text_hash] = summary
+        return summary
@@ -0,0 +1,242 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import math
+import threading
+
+from ghost_writer.utils.metrics_recorder import NullMetricsRecorder
+
+MEMORY_SCOPES = ("book", "act", "chapter")
+
+# crewAI's default embedder, used when no embedder is configured
+DEFAULT_EMBEDDER = {"provider": "openai", "config": {"model_name": "text-embedding-3-small"}}
+
+def build_embedder(embedder_config: dict):
+    """
+    Builds the embedding function for a crewAI embedder config ({"provider": ..., "config":
+    {"model_name": ...}}). Older crewAI releases (such as the locked 0.119) have no
+    crewai.rag and read the model from "model", so the config is translated for their
+    EmbeddingConfigurator. Both return a chromadb embedding function.
+    """
+    try:
+        from crewai.rag.embeddings.factory import build_embedder as build_rag_embedder
+    except ImportError:
+        from crewai.utilities.embedding_configurator import EmbeddingConfigurator
+        config = embedder_config.get("config", {})
+        embedder_config = {**embedder_config, "config": {"model": config.get("model_name"), **config}}
+        return EmbeddingConfigurator().configure_embedder(embedder_config)
+    return build_rag_embedder(embedder_config)
+
+@dataclass
+class MemoryItem:
+    content: str
+    metadata: Dict[str, Any]
+    scope: Optional[str]
+    embedding: Optional[Sequence[float]] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.content.encode("utf-8"))
+
+@dataclass
+class MemoryStats:
+    items: int = 0
+    bytes: int = 0
+    pending: int = 0
+    embedding_calls: int = 0
+    embedded_texts: int = 0
+    evictions: int = 0
+    searches: int = 0
+    scope: Optional[str] = None
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+class BoundedMemoryStorage:
+    """
+    In-process storage for crewAI short-term and entity memory with a size cap.
+
+    Implements the crewAI Storage interface (save, search, reset). At most max_items items are
+    kept; beyond that the least recently used item (eviction="lru", where a search hit counts
+    as a use) or the oldest item (eviction="fifo") is dropped. Saved items are embedded in
+    batches: they wait until batch_size items are pending or a search needs them, so n saves
+    cost ceil(n / batch_size) embedding calls instead of n.
+
+    Items are tagged with the scope they were saved in; start_scope() drops everything outside
+    the last keep_scopes scopes, e.g. the memories of the previous act.
+    """
+
+    def __init__(
+            self,
+            embed: Callable[[List[str]], List[Sequence[float]]],
+            max_items: int = 200,
+            batch_size: int = 16,
+            eviction: str = "lru",
+            keep_scopes: int = 1):
+        if eviction not in ("lru", "fifo"):
+            raise ValueError(f"Unknown eviction policy '{eviction}', expected 'lru' or 'fifo'.")
+        self.embed = embed
+        self.max_items = max_items
+        self.batch_size = batch_size
+        self.eviction = eviction
+        self.keep_scopes = keep_scopes
+        self.items: "OrderedDict[int, MemoryItem]" = OrderedDict()
+        self.scopes: List[str] = []
+        self.stats = MemoryStats()
+        self._next_id = 0
+        self._lock = threading.RLock()
+
+    def save(self, value: Any, metadata: Dict[str, Any] = None):
+        with self._lock:
+            self.items[self._next_id] = MemoryItem(
+                content=str(value), metadata=metadata or {}, scope=self.scopes[-1] if self.scopes else None)
+            self._next_id += 1
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
+                self.stats.evictions += 1
+            if sum(1 for item in self.items.values() if item.embedding is None) >= self.batch_size:
+                self.flush()
+
+    def search(self, query: str, limit: int = 5, score_threshold: float = 0.6, **_) -> List[Dict[str, Any]]:
+        with self._lock:
+            self.stats.searches += 1
+            self.flush()
+            if not self.items:
+                return []
+            query_embedding = self._embed([query])[0]
+            scored = sorted(
+                ((cosine_similarity(query_embedding, item.embedding), item_id) for item_id, item in self.items.items()),
+                reverse=True)
+            hits = [(score, item_id) for score, item_id in scored if score >= score_threshold][:limit]
+            if self.eviction == "lru":
+                for _, item_id in hits:
+                    self.items.move_to_end(item_id)
+            return [
+                {"content": self.items[item_id].content, "metadata": self.items[item_id].metadata, "score": score}
+                for score, item_id in hits
+            ]
+
+    def reset(self):
+        with self._lock:
+            self.items.clear()
+
+    def flush(self):
+        """Embeds every pending item in batches of batch_size."""
+        with self._lock:
+            pending = [item for item in self.items.values() if item.embedding is None]
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                for item, embedding in zip(batch, self._embed([item.content for item in batch])):
+                    item.embedding = embedding
+
+    def start_scope(self, scope: str):
+        """Saves go to the new scope; memories of scopes older than the last keep_scopes are dropped."""
+        with self._lock:
+            if scope in self.scopes:
+                self.scopes.remove(scope)
+            self.scopes.append(scope)
+            kept = set(self.scopes[-self.keep_scopes:])
+            for item_id in [item_id for item_id, item in self.items.items() if item.scope not in kept]:
+                del self.items[item_id]
+                self.stats.evictions += 1
+            del self.scopes[:-self.keep_scopes]
+
+    def snapshot(self) -> MemoryStats:
+        with self._lock:
+            return MemoryStats(
+                items=len(self.items),
+                bytes=sum(item.size for item in self.items.values()),
+                pending=sum(1 for item in self.items.values() if item.embedding is None),
+                embedding_calls=self.stats.embedding_calls,
+                embedded_texts=self.stats.embedded_texts,
+                evictions=self.stats.evictions,
+                searches=self.stats.searches,
+                scope=self.scopes[-1] if self.scopes else None)
+
+    def _embed(self, texts: List[str]) -> List[Sequence[float]]:
+        self.stats.embedding_calls += 1
+        self.stats.embedded_texts += len(texts)
+        return [list(embedding) for embedding in self.embed(texts)]
+
+class ScopedCrewMemory:
+    """
+    Bounded short-term and entity memory for the crew, scoped to the whole book, an act or a
+    chapter.
+
+    BookWriterService calls enter() whenever an act or chapter starts; when that is the
+    configured scope, the previous scope's size, evictions and embedding calls are recorded
+    under the "memory" phase and its memories are dropped. The embedder is only built on the
+    first embedding call.
+    """
+
+    def __init__(
+            self,
+            scope: str = "act",
+            max_items: int = 200,
+            batch_size: int = 16,
+            eviction: str = "lru",
+            keep_scopes: int = 1,
+            embedder_config: dict = None,
+            embed: Callable[[List[str]], List[Sequence[float]]] = None,
+            metrics=None):
+        if scope not in MEMORY_SCOPES:
+            raise ValueError(f"Unknown memory scope '{scope}', expected one of {', '.join(MEMORY_SCOPES)}.")
+        self.scope = scope
+        self.embedder_config = embedder_config or DEFAULT_EMBEDDER
+        self._embed = embed
+        self._embed_lock = threading.Lock()
+        self.metrics = metrics or NullMetricsRecorder()
+        self.storages = {
+            name: BoundedMemoryStorage(self.embed, max_items=max_items, batch_size=batch_size, eviction=eviction, keep_scopes=keep_scopes)
+            for name in ("short_term", "entity")
+        }
+        self._reported = {name: MemoryStats() for name in self.storages}
+        self._scope_fields: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def embed(self, texts: List[str]) -> List[Sequence[float]]:
+        with self._embed_lock:
+            if self._embed is None:
+                self._embed = build_embedder(self.embedder_config)
+        return self._embed(texts)
+
+    def crew_memories(self) -> Dict[str, Any]:
+        """The short_term_memory and entity_memory arguments for the crew."""
+        from crewai.memory.entity.entity_memory import EntityMemory
+        from crewai.memory.short_term.short_term_memory import ShortTermMemory
+        return {
+            "short_term_memory": ShortTermMemory(storage=self.storages["short_term"]),
+            "entity_memory": EntityMemory(storage=self.storages["entity"]),
+        }
+
+    def enter(self, level: str, act: int, chapter: int = None):
+        """
+        Called when an act (level "act") or a chapter (level "chapter") starts.
+        """
+        if level != self.scope:
+            return
+        with self._lock:
+            self.report()
+            name = f"act_{act}" if level == "act" else f"chapter_{chapter}"
+            self._scope_fields = {"act": act, "chapter": f"Chapter {chapter}" if chapter else None}
+            for storage in self.storages.values():
+                storage.start_scope(name)
+
+    def report(self):
+        """Records the size of each memory and the embedding calls and evictions since the last report."""
+        for name, storage in self.storages.items():
+            stats, previous = storage.snapshot(), self._reported[name]
+            self._reported[name] = stats
+            self.metrics.record(
+                "memory",
+                memory=name,
+                scope=stats.scope,
+                items=stats.items,
+                bytes=stats.bytes,
+                embedding_calls=stats.embedding_calls - previous.embedding_calls,
+                embedded_texts=stats.embedded_texts - previous.embedded_texts,
+                evictions=stats.evictions - previous.evictions,
+                searches=stats.searches - previous.searches,
+                **self._scope_fields)
@@ -1,18 +1,68 @@
 from ghost_writer.utils.markdown_utils import image_markdown
 
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import List
+
 class IllustrationWriter:
-    def __init__(self, illustrator, transcriber, images_path, output_path):
+    def __init__(
+            self,
+            illustrator,
+            transcriber,
+            images_path,
+            output_path,
+            max_workers: int = 0,
+            image_pipeline=None,
+            image_profile: str = None,
+            progress=None):
         self.illustrator = illustrator
         self.transcriber = transcriber
         self.images_path = images_path
         self.output_path = output_path
-    
-    def write_illustration(self, prompt: str, size: str, filename: str) -> str:
-        cover_image = self.images_path / filename
-        self.illustrator.run(
-            prompt=prompt,
-            filename=str(cover_image),
-            size=size
+        # With workers, images are generated in the background while text generation continues
+        self.executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="illustrator")
+            if max_workers > 0 else None
         )
+        self.pending: List[Future] = []
+        # Variants for the profile the PDF embeds are rendered as soon as each image lands
+        self.image_pipeline = image_pipeline
+        self.image_profile = image_profile
+        self.progress = progress
+
+    def write_illustration(self, prompt: str, size: str, filename: str, transcriber=None) -> str:
+        cover_image = self.images_path / filename
+        if self.executor:
+            self.pending.append(self.executor.submit(
+                self.__illustrate,
+                prompt=prompt,
+                filename=str(cover_image),
+                size=size
+            ))
+        else:
+            self.__illustrate(
+                prompt=prompt,
+                filename=str(cover_image),
+                size=size
+            )
+        # The image tag only needs the file name, so it can be written before the image exists
         image_md = image_markdown(image_path=str(cover_image.relative_to(self.output_path)), alt_text="Book Cover")
-        self.transcriber.run(content=image_md)
\ No newline at end of file
+        (transcriber or self.transcriber).run(content=image_md)
+
+    def __illustrate(self, prompt: str, filename: str, size: str):
+        result = self.illustrator.run(prompt=prompt, filename=filename, size=size)
+        if self.image_pipeline and self.image_profile:
+            self.image_pipeline.variant(filename, self.image_profile)
+        if self.progress:
+            self.progress.image_completed()
+        return result
+
+    def wait(self) -> list:
+        """
+        Blocks until every illustration submitted so far has been generated.
+
+        Returns:
+            list: The illustrator results in submission order.
+        """
+        pending, self.pending = self.pending, []
+        wait(pending)
+        return [future.result() for future in pending]
@@ -0,0 +1,137 @@
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+import hashlib
+import io
+import os
+import threading
+
+from ghost_writer.utils.content_cache import ContentCache
+from ghost_writer.utils.markdown_utils import replace_image_references
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it the original images are embedded
+    Image = None
+
+@dataclass(frozen=True)
+class ImageProfile:
+    """
+    How illustrations are prepared for one kind of output. Images are downscaled to fit
+    dpi * width_inches pixels (never upscaled) and re-encoded; with palette_colors they are
+    reduced to that many colours and stored as PNG instead.
+    """
+    name: str
+    dpi: int
+    width_inches: float = 6.0
+    format: str = "JPEG"
+    quality: int = 85
+    palette_colors: Optional[int] = None
+
+    @property
+    def max_pixels(self) -> int:
+        return int(self.dpi * self.width_inches)
+
+    @property
+    def extension(self) -> str:
+        if self.palette_colors:
+            return "png"
+        return {"JPEG": "jpg", "WEBP": "webp", "PNG": "png"}[self.format]
+
+IMAGE_PROFILES: Dict[str, ImageProfile] = {
+    "print": ImageProfile(name="print", dpi=300, quality=90),
+    "screen": ImageProfile(name="screen", dpi=150, quality=75),
+}
+
+class ImagePipeline:
+    """
+    Produces downscaled, recompressed variants of the generated illustrations so the PDF does
+    not embed the raw PNGs.
+
+    Variants live in <images>/variants and are named after a hash of the source bytes and the
+    profile, so a variant is only rendered once per distinct image; with a ContentCache the
+    encoded variants are also reused across runs.
+    """
+
+    def __init__(self, images_path, profiles: Dict[str, ImageProfile] = None, cache: ContentCache = None):
+        self.images_path = Path(images_path)
+        self.variants_path = self.images_path / "variants"
+        self.profiles = profiles or IMAGE_PROFILES
+        self.cache = cache
+        self._warned = False
+
+    def variant(self, source, profile_name: str) -> Path:
+        """
+        Returns the variant of the source image for the profile, rendering it if needed. The
+        source itself is returned when it does not exist (yet) or Pillow is not installed.
+        """
+        profile = self.profiles[profile_name]
+        source = Path(source)
+        if not source.exists():
+            return source
+        if Image is None:
+            if not self._warned:
+                print("Pillow is not installed; embedding the original illustrations.")
+                self._warned = True
+            return source
+
+        source_bytes = source.read_bytes()
+        key = ContentCache.make_key(
+            kind="image_variant",
+            source=hashlib.sha256(source_bytes).hexdigest(),
+            profile=asdict(profile))
+        target = self.variants_path / f"{source.stem}.{profile.name}.{key[:12]}.{profile.extension}"
+        if target.exists():
+            return target
+
+        variant_bytes = self.cache.get(key) if self.cache else None
+        if variant_bytes is None:
+            variant_bytes = self._render(source_bytes, profile)
+            if self.cache:
+                self.cache.put(key, variant_bytes)
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(variant_bytes)
+        os.replace(tmp_path, target)
+
+        # Variants of an earlier version of the same image are no longer referenced
+        for stale in self.variants_path.glob(f"{source.stem}.{profile.name}.*.{profile.extension}"):
+            if stale != target:
+                stale.unlink(missing_ok=True)
+        return target
+
+    def rewrite_markdown(self, content: str, base_path, profile_name: str) -> str:
+        """
+        Points every image tag of the markdown at the variant for the profile. Image paths are
+        resolved relative to base_path (the directory of the markdown file).
+        """
+        return replace_image_references(content, lambda image_path: self.variant_reference(image_path, base_path, profile_name))
+
+    def variant_reference(self, image_path: str, base_path, profile_name: str) -> str:
+        """The image path, relative to base_path, of the variant of an image referenced from base_path."""
+        base_path = Path(base_path)
+        variant = self.variant(base_path / image_path, profile_name)
+        return variant.relative_to(base_path).as_posix() if variant.is_relative_to(base_path) else image_path
+
+    @staticmethod
+    def _render(source_bytes: bytes, profile: ImageProfile) -> bytes:
+        with Image.open(io.BytesIO(source_bytes)) as image:
+            image.thumbnail((profile.max_pixels, profile.max_pixels))
+            if image.mode in ("RGBA", "LA", "P"):
+                # JPEG has no alpha channel; flatten transparent areas onto the white page
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            else:
+                image = image.convert("RGB")
+
+            output = io.BytesIO()
+            if profile.palette_colors:
+                image.quantize(colors=profile.palette_colors).save(
+                    output, format="PNG", optimize=True, dpi=(profile.dpi, profile.dpi))
+            else:
+                image.save(output, format=profile.format, quality=profile.quality, optimize=True,
+                           dpi=(profile.dpi, profile.dpi))
+            return output.getvalue()
@@ -0,0 +1,90 @@
+from typing import Callable, Optional, Tuple
+import threading
+import time
+
+class PdfPreviewRenderer:
+    """
+    Renders PDF previews on one background thread so the crew never waits for MarkdownPdf.
+
+    Requests coalesce: while a preview renders, new requests only replace the pending one, so
+    however many previews are requested during a render, only the latest runs next. With a
+    debounce, the worker also waits that long after the last request before it starts, so a
+    burst of requests costs a single render. Previews never run concurrently with each other;
+    wait() lets a final render take over once the worker is idle.
+    """
+
+    def __init__(self, render: Callable, debounce: float = 0.0):
+        self.render = render
+        self.debounce = debounce
+        self.requested = 0
+        self.rendered = 0
+        # Requests superseded by a later one (or by a final render) before they could run
+        self.coalesced = 0
+        self.last_error: Optional[Exception] = None
+        self._pending: Optional[Tuple] = None
+        self._requested_at = 0.0
+        self._rendering = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._condition = threading.Condition()
+
+    def request(self, *args):
+        """Schedules a preview render with the given arguments and returns immediately."""
+        with self._condition:
+            if self._closed:
+                return
+            self.requested += 1
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = args
+            self._requested_at = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pdf-preview", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def wait(self, discard_pending: bool = False):
+        """
+        Blocks until no preview is rendering or pending. With discard_pending, a preview that
+        has not started yet is dropped instead of rendered (e.g. a final render supersedes it).
+        """
+        with self._condition:
+            if discard_pending and self._pending is not None:
+                self.coalesced += 1
+                self._pending = None
+                self._condition.notify_all()
+            self._condition.wait_for(lambda: self._pending is None and not self._rendering)
+
+    def close(self):
+        self.wait(discard_pending=True)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._closed)
+                if self._closed:
+                    return
+                # Debounce: let a burst of requests settle into the last one
+                while self._pending is not None and (remaining := self._requested_at + self.debounce - time.monotonic()) > 0:
+                    self._condition.wait(remaining)
+                if self._pending is None:
+                    continue
+                args, self._pending = self._pending, None
+                self._rendering = True
+
+            try:
+                self.render(*args)
+            except Exception as e:
+                # Previews are best effort (the error is kept in last_error and in the render's
+                # metrics); the final render reports its own errors
+                self.last_error = e
+            finally:
+                with self._condition:
+                    self._rendering = False
+                    self.rendered += 1
+                    self._condition.notify_all()
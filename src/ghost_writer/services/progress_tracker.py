@@ -0,0 +1,184 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional
+import json
+import os
+import threading
+import time
+
+from ghost_writer.models import Act
+
+PROGRESS_KINDS = ("scenes", "chapters", "images")
+
+class ProgressTracker:
+    """
+    Tracks how far a book run is: scenes, chapters and images completed out of those planned.
+
+    The plan grows as act outlines land (add_act); until every act is outlined, the remaining
+    acts are extrapolated from the average act so far. The ETA is the remaining scenes times an
+    exponential moving average of the time between completed scenes (so scene concurrency is
+    accounted for), and throughput is the words of generated scenes per minute of writing.
+    Restored scenes (resume, checkpoints) count as completed but do not move the averages.
+
+    Every update is reported at most once per report_interval seconds: a line on the terminal
+    and a JSON status file (written atomically) for schedulers to poll.
+    """
+
+    def __init__(
+            self,
+            status_path: str = None,
+            expected_acts: int = 3,
+            smoothing: float = 0.3,
+            report_interval: float = 5.0,
+            clock: Callable[[], float] = time.monotonic,
+            echo: bool = True):
+        self.status_path = Path(status_path) if status_path else None
+        self.expected_acts = expected_acts
+        self.smoothing = smoothing
+        self.report_interval = report_interval
+        self.clock = clock
+        self.echo = echo
+        self.total = {kind: 0 for kind in PROGRESS_KINDS}
+        self.completed = {kind: 0 for kind in PROGRESS_KINDS}
+        self.acts: Dict[int, int] = {}
+        self.words = 0
+        self.seconds_per_scene: Optional[float] = None
+        self.state = "running"
+        self.started = self.clock()
+        self.started_at = datetime.now()
+        self._writing_started: Optional[float] = None
+        self._writing_time = 0.0
+        self._last_scene: Optional[float] = None
+        self._last_report: Optional[float] = None
+        self._lock = threading.Lock()
+        self._report_lock = threading.Lock()
+
+    def add_work(self, scenes: int = 0, chapters: int = 0, images: int = 0, done: bool = False):
+        """
+        Adds planned work that is not part of an act outline, e.g. the intro illustrations. With
+        done, the work is completed already (e.g. restored from checkpoints).
+        """
+        with self._lock:
+            for kind, count in zip(PROGRESS_KINDS, (scenes, chapters, images)):
+                self.total[kind] += count
+                if done:
+                    self.completed[kind] += count
+        self.report()
+
+    def add_act(self, act: Act, images: bool = True):
+        """
+        Adds the scenes, chapters and chapter illustrations of an act outline (once per act).
+        Without images, the run does not illustrate and no chapter illustrations are planned.
+        """
+        with self._lock:
+            if act.act_number in self.acts:
+                return
+            scenes = sum(len(chapter.scenes) for chapter in act.chapters)
+            self.acts[act.act_number] = scenes
+            if self._writing_started is None:
+                # Scenes are written from the first outline on
+                self._writing_started = self.clock()
+            self.total["scenes"] += scenes
+            self.total["chapters"] += len(act.chapters)
+            if images:
+                self.total["images"] += len(act.chapters)
+        self.report()
+
+    def restore(self, scenes: int = 0, chapters: int = 0, images: int = 0):
+        """Counts planned work an earlier run completed (e.g. a chapter restored from checkpoints)."""
+        with self._lock:
+            for kind, count in zip(PROGRESS_KINDS, (scenes, chapters, images)):
+                self.completed[kind] += count
+        self.report()
+
+    def scene_completed(self, words: int, restored: bool = False):
+        with self._lock:
+            now = self.clock()
+            self.completed["scenes"] += 1
+            if not restored:
+                if self._writing_started is None:
+                    self._writing_started = self.started
+                interval = now - (self._last_scene if self._last_scene is not None else self._writing_started)
+                self.seconds_per_scene = interval if self.seconds_per_scene is None else (
+                    self.smoothing * interval + (1 - self.smoothing) * self.seconds_per_scene)
+                self.words += words
+                self._writing_time = now - self._writing_started
+            self._last_scene = now
+        self.report()
+
+    def chapter_completed(self):
+        self._complete("chapters")
+
+    def image_completed(self):
+        self._complete("images")
+
+    def finish(self, state: str = "done"):
+        with self._lock:
+            self.state = state
+        self.report(force=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = self.clock()
+            known_acts = len(self.acts)
+            remaining_acts = max(self.expected_acts - known_acts, 0)
+            # Acts that are not outlined yet are assumed to be as long as the average act so far
+            planned_scenes = self.total["scenes"] + (
+                round(self.total["scenes"] / known_acts * remaining_acts) if known_acts else 0)
+            remaining_scenes = max(planned_scenes - self.completed["scenes"], 0)
+            eta_seconds = (
+                round(remaining_scenes * self.seconds_per_scene, 1)
+                if self.seconds_per_scene is not None and self.state == "running" else None)
+            elapsed = now - self.started
+            return {
+                "state": self.state,
+                "started": self.started_at.isoformat(timespec="seconds"),
+                "updated": datetime.now().isoformat(timespec="seconds"),
+                "elapsed_seconds": round(elapsed, 1),
+                **{kind: {"completed": self.completed[kind], "total": self.total[kind]} for kind in PROGRESS_KINDS},
+                "acts": {"outlined": known_acts, "expected": self.expected_acts},
+                "planned_scenes": planned_scenes,
+                "percent": round(100 * self.completed["scenes"] / planned_scenes, 1) if planned_scenes else 0.0,
+                "words": self.words,
+                "words_per_minute": round(self.words / (self._writing_time / 60)) if self._writing_time else None,
+                "seconds_per_scene": round(self.seconds_per_scene, 2) if self.seconds_per_scene is not None else None,
+                "eta_seconds": eta_seconds,
+                "eta": (datetime.now() + timedelta(seconds=eta_seconds)).isoformat(timespec="seconds") if eta_seconds is not None else None,
+            }
+
+    def report(self, force: bool = False):
+        """Writes the status file and prints a progress line, at most once per report_interval."""
+        with self._lock:
+            now = self.clock()
+            if not force and self._last_report is not None and now - self._last_report < self.report_interval:
+                return
+            self._last_report = now
+
+        with self._report_lock:
+            self._write(self.snapshot())
+
+    def _write(self, status: dict):
+        if self.status_path:
+            self.status_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.status_path.with_name(f"{self.status_path.name}.tmp")
+            tmp_path.write_text(json.dumps(status, indent=2), encoding="utf-8")
+            os.replace(tmp_path, self.status_path)
+        if self.echo:
+            print(format_progress(status))
+
+    def _complete(self, kind: str):
+        with self._lock:
+            self.completed[kind] += 1
+        self.report()
+
+def format_progress(status: dict) -> str:
+    """The one-line terminal rendering of a progress snapshot."""
+    counts = ", ".join(f"{status[kind]['completed']}/{status[kind]['total']} {kind}" for kind in PROGRESS_KINDS)
+    line = f"Progress: {status['percent']:.0f}% ({counts})"
+    if status["words_per_minute"] is not None:
+        line += f", {status['words_per_minute']} words/min"
+    if status["eta_seconds"] is not None:
+        line += f", ETA {timedelta(seconds=round(status['eta_seconds']))}"
+    elif status["state"] != "running":
+        line += f", {status['state']} after {timedelta(seconds=round(status['elapsed_seconds']))}"
+    return line
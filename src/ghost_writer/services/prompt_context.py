@@ -0,0 +1,86 @@
+from ghost_writer.models import Scene, Idea, Characters, Character
+from ghost_writer.utils.token_utils import estimate_tokens, truncate_to_tokens
+
+from typing import Dict, List, Optional, Tuple
+import json
+import re
+
+# Fields kept when the full idea or character profiles do not fit the token budget
+IDEA_ESSENTIAL_FIELDS = ["premise", "theme", "tone_style", "narrative_perspective", "linquistic_constraints"]
+CHARACTER_SUMMARY_FIELDS = ["name", "role", "traits", "motivations"]
+
+NAME_TITLES = {"dr", "mr", "mrs", "ms", "miss", "sir", "lady", "lord", "prof", "professor", "the"}
+
+class ScenePromptContext:
+    """
+    Serializes the Idea and Characters context once per run and hands out compact per-scene slices.
+
+    Instead of inlining the full idea and cast into every scene prompt, only the characters
+    named in Scene.characters are included. With a token budget, the context is degraded step
+    by step (character summaries, essential idea fields, hard truncation) until it fits.
+    """
+
+    def __init__(self, idea: Idea, characters: Characters, token_budget: Optional[int] = None):
+        self.idea = idea
+        self.cast = characters
+        self.token_budget = token_budget
+        self.idea_json = idea.model_dump_json()
+        self.idea_essentials_json = json.dumps(idea.model_dump(include=set(IDEA_ESSENTIAL_FIELDS)))
+        self.characters = characters.characters
+        self._profiles: Dict[str, str] = {c.name: c.model_dump_json() for c in self.characters}
+        self._summaries: Dict[str, str] = {
+            c.name: json.dumps(c.model_dump(include=set(CHARACTER_SUMMARY_FIELDS))) for c in self.characters
+        }
+        self._name_patterns = {c.name: self._name_pattern(c) for c in self.characters}
+
+    def for_scene(self, scene: Scene, base_tokens: int = 0) -> Tuple[str, str]:
+        """
+        Returns the idea and character context to embed in the prompt for the scene.
+
+        Args:
+            scene (Scene): The scene being written.
+            base_tokens (int): Tokens the rest of the prompt already uses.
+
+        Returns:
+            Tuple[str, str]: The idea JSON and the character JSON for the scene.
+        """
+        names = self.scene_characters(scene)
+        profiles = self._join(self._profiles, names)
+        if self._fits(base_tokens, self.idea_json, profiles):
+            return self.idea_json, profiles
+
+        summaries = self._join(self._summaries, names)
+        if self._fits(base_tokens, self.idea_json, summaries):
+            return self.idea_json, summaries
+
+        if self._fits(base_tokens, self.idea_essentials_json, summaries):
+            return self.idea_essentials_json, summaries
+
+        remaining = max(self.token_budget - base_tokens - estimate_tokens(self.idea_essentials_json), 0)
+        return self.idea_essentials_json, truncate_to_tokens(summaries, remaining)
+
+    def scene_characters(self, scene: Scene) -> List[str]:
+        """
+        Returns the names of the characters mentioned in Scene.characters, in cast order. Falls
+        back to the whole cast when no name can be matched.
+        """
+        named = [name for name, pattern in self._name_patterns.items() if pattern.search(scene.characters)]
+        return named or [c.name for c in self.characters]
+
+    def _fits(self, base_tokens: int, idea: str, characters: str) -> bool:
+        if self.token_budget is None:
+            return True
+        return base_tokens + estimate_tokens(idea) + estimate_tokens(characters) <= self.token_budget
+
+    @staticmethod
+    def _join(serialized: Dict[str, str], names: List[str]) -> str:
+        return "[" + ", ".join(serialized[name] for name in names) + "]"
+
+    @staticmethod
+    def _name_pattern(character: Character) -> re.Pattern:
+        # Match the full name or any distinctive part of it ("Ada" for "Dr. Ada N. Sel")
+        parts = [character.name] + [
+            part for part in re.split(r"[\s.,]+", character.name)
+            if len(part) > 2 and part.lower() not in NAME_TITLES
+        ]
+        return re.compile(r"\b(" + "|".join(re.escape(part) for part in parts) + r")\b", re.IGNORECASE)
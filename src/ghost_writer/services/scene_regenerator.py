@@ -0,0 +1,200 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel
+
+from ghost_writer.models import Act, Chapter, Characters, Idea, Scene
+from ghost_writer.services.book_document import BookDocument
+from ghost_writer.services.checkpoint_store import CheckpointStore
+from ghost_writer.services.continuity_tracker import ContinuityTracker
+from ghost_writer.services.image_pipeline import ImagePipeline
+from ghost_writer.services.scene_writer import SceneWriter
+from ghost_writer.tools.convert_to_pdf_tool import MarkdownToPDFTool
+from ghost_writer.utils.markdown_utils import split_markdown_sections
+from ghost_writer.utils.metrics_recorder import NullMetricsRecorder
+
+# (task name, output file) of the recorded outputs a regeneration needs
+IDEA_OUTPUT = ("ideation_task", "ideation.json")
+CHARACTERS_OUTPUT = ("character_development_task", "character_development.json")
+ACT_OUTPUTS = [(f"act{number}_development_task", f"act{number}_development.json") for number in (1, 2, 3)]
+
+def parse_target(target: str) -> Tuple[int, Optional[int]]:
+    """
+    Parses a command line target: "12" is chapter 12, "12.3" its third scene. Returns the
+    chapter number and the 0-based scene index (None for the whole chapter).
+    """
+    chapter, _, scene = target.partition(".")
+    try:
+        return int(chapter), int(scene) - 1 if scene else None
+    except ValueError:
+        raise ValueError(f"Invalid target '{target}', expected a chapter (12) or a scene (12.3).")
+
+@dataclass
+class SceneLocation:
+    act: Act
+    chapter: Chapter
+    scene: Scene
+    chapter_number: int
+    scene_index: int
+
+@dataclass
+class RegeneratedScene:
+    chapter_number: int
+    scene_index: int
+    scene_title: str
+    previous_words: int
+    words: int
+
+class SceneRegenerator:
+    """
+    Rewrites single scenes or whole chapters of a written book without rerunning the crew.
+
+    The idea, the characters and the act outlines are loaded from the run's checkpoints (or its
+    output files), only the requested scenes are generated again through the SceneWriter, and
+    their text is spliced into book.md in place of the recorded text. The scene checkpoints and
+    the transcript sizes of completed units are updated, so resume and replay see the new text.
+
+    The PDF is rebuilt through the incremental renderer: every act other than the ones that
+    changed is a cache hit from the original run, so only the affected sections are rendered.
+    """
+
+    def __init__(
+            self,
+            output_path='output',
+            scene_writer: SceneWriter = None,
+            author_agent=None,
+            pdf_tool=None,
+            pdf_image_profile: str = None,
+            image_pipeline: ImagePipeline = None,
+            metrics=None,
+            continuity: ContinuityTracker = None):
+        self.output_path = Path(output_path)
+        self.book_md_path = self.output_path / "book.md"
+        self.book_pdf_path = self.output_path / "book.pdf"
+        self.checkpoints = CheckpointStore(str(self.output_path))
+        self.metrics = metrics or NullMetricsRecorder()
+        # No content cache: the same prompt has to reach the LLM again to get a new scene
+        self.scene_writer = scene_writer or SceneWriter(author_agent, metrics=self.metrics)
+        # With continuity, a scene is regenerated with the summaries of the scenes before it
+        self.continuity = continuity
+        if continuity:
+            self.scene_writer.continuity = continuity
+        self.pdf_tool = pdf_tool or MarkdownToPDFTool(incremental=True)
+        self.pdf_image_profile = pdf_image_profile
+        self.image_pipeline = image_pipeline or ImagePipeline(self.output_path / "images")
+        self.idea: Idea = self._load(*IDEA_OUTPUT, Idea)
+        self.characters: Characters = self._load(*CHARACTERS_OUTPUT, Characters)
+        self.acts: List[Act] = [self._load(*output, Act) for output in ACT_OUTPUTS]
+
+    def locate(self, chapter_number: int, scene_index: int = None) -> List[SceneLocation]:
+        """
+        The scenes of a chapter, or a single scene of it. Chapters are numbered across acts
+        and scenes from 0, as BookWriterService numbers them.
+        """
+        number = 0
+        for act in sorted(self.acts, key=lambda act: act.act_number):
+            for chapter in act.chapters:
+                number += 1
+                if number != chapter_number:
+                    continue
+                if scene_index is not None and not 0 <= scene_index < len(chapter.scenes):
+                    raise ValueError(f"Chapter {chapter_number} has no scene {scene_index + 1}.")
+                return [
+                    SceneLocation(act, chapter, scene, chapter_number, index)
+                    for index, scene in enumerate(chapter.scenes)
+                    if scene_index is None or index == scene_index
+                ]
+        raise ValueError(f"The book has no chapter {chapter_number}.")
+
+    def regenerate(self, targets: Sequence[Tuple[int, Optional[int]]]) -> List[RegeneratedScene]:
+        """
+        Regenerates the (chapter number, scene index) targets, where a scene index of None
+        stands for every scene of the chapter, and splices the new text into book.md.
+        """
+        locations = [location for chapter_number, scene_index in targets for location in self.locate(chapter_number, scene_index)]
+        book = self.book_md_path.read_text(encoding="utf-8")
+        regenerated = []
+        for location in locations:
+            previous = self.checkpoints.load_scene(location.chapter_number, location.scene_index)
+            if previous is None:
+                raise ValueError(f"Scene '{location.scene.scene_title}' has not been written yet.")
+            if self.continuity:
+                self._recall_act(location)
+
+            text = self.scene_writer.generate_scene(
+                location.scene, location.act, location.chapter, self.idea, self.characters)
+            book = self._splice(book, location, previous, text)
+            self.checkpoints.save_scene(location.chapter_number, location.scene_index, text)
+            regenerated.append(RegeneratedScene(
+                chapter_number=location.chapter_number,
+                scene_index=location.scene_index,
+                scene_title=location.scene.scene_title,
+                previous_words=len(previous.split()),
+                words=len(text.split())))
+        return regenerated
+
+    def render_pdf(self) -> str:
+        """Rebuilds book.pdf from book.md; with the incremental renderer only changed sections render."""
+        book = self.book_md_path.read_text(encoding="utf-8")
+        profile = self.pdf_image_profile
+        with self.metrics.measure("pdf", final=True, profile=profile):
+            if isinstance(self.pdf_tool, MarkdownToPDFTool) and self.pdf_tool.incremental:
+                # The same sections the run rendered, so unchanged acts come from the section cache
+                sections = split_markdown_sections(book, level=2)
+                if profile:
+                    sections = [self.image_pipeline.rewrite_markdown(section, self.output_path, profile) for section in sections]
+                rendered = self.pdf_tool.render_sections(
+                    sections, root=self.output_path, output_pdf_path=self.book_pdf_path, title=self.book_md_path.stem)
+                return f"PDF successfully created at: {self.book_pdf_path} ({rendered} section(s) re-rendered)"
+
+            markdown_path = self.book_md_path
+            if profile:
+                markdown_path = self.output_path / f"book.{profile}.md"
+                markdown_path.write_text(self.image_pipeline.rewrite_markdown(book, self.output_path, profile), encoding="utf-8")
+            return self.pdf_tool.run(markdown_path=str(markdown_path), output_pdf_path=str(self.book_pdf_path))
+
+    def _recall_act(self, location: SceneLocation):
+        # The act's rolling summary as it was when the scene was first written
+        self.continuity.reset(location.act.act_number)
+        first_chapter = location.chapter_number - location.act.chapters.index(location.chapter)
+        for chapter_number, chapter in enumerate(location.act.chapters, start=first_chapter):
+            for scene_index, scene in enumerate(chapter.scenes):
+                if (chapter_number, scene_index) == (location.chapter_number, location.scene_index):
+                    return
+                text = self.checkpoints.load_scene(chapter_number, scene_index)
+                if text is not None:
+                    self.continuity.record(location.act.act_number, scene.scene_title, text)
+
+    def _splice(self, book: str, location: SceneLocation, previous: str, text: str) -> str:
+        # The scene's markdown exactly as BookWriterService wrote it, searched from its chapter on
+        document = BookDocument()
+        act = document.add_act(location.act.act_number, location.act.act_title)
+        chapter = document.add_chapter(act, location.chapter_number, location.chapter.chapter_title)
+        scene = document.add_scene(chapter, location.scene_index, location.scene.scene_title)
+        prose = document.add_paragraphs(scene, previous)
+        previous_markdown = document.to_markdown(scene)
+        document.set_text(prose, text)
+        markdown = document.to_markdown(scene)
+
+        chapter_start = book.find(document.fragment(chapter))
+        start = book.find(previous_markdown, chapter_start) if chapter_start >= 0 else -1
+        if start < 0:
+            raise ValueError(
+                f"Scene '{location.scene.scene_title}' was edited in {self.book_md_path.name} since it was written; "
+                "it cannot be replaced in place.")
+
+        spliced = book[:start] + markdown + book[start + len(previous_markdown):]
+        self.book_md_path.write_text(spliced, encoding="utf-8")
+        self.checkpoints.shift_transcript(
+            offset=len(book[:start].encode("utf-8")),
+            delta=len(markdown.encode("utf-8")) - len(previous_markdown.encode("utf-8")))
+        return spliced
+
+    def _load(self, task_name: str, output_file: str, model: Type[BaseModel]):
+        output = self.checkpoints.load_task_output(task_name)
+        if output is None and (self.output_path / output_file).exists():
+            output = (self.output_path / output_file).read_text(encoding="utf-8")
+        if output is None:
+            raise FileNotFoundError(f"No recorded output for task '{task_name}' in {self.output_path}.")
+        return model.model_validate_json(output)
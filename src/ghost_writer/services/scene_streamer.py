@@ -0,0 +1,133 @@
+from contextlib import contextmanager
+from typing import Dict, Optional
+import threading
+import time
+
+from crewai import Task
+
+from ghost_writer.utils.crewai_events import event_bus, llm_event
+
+# The author's reasoning precedes this marker; only what follows it is scene text
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+# Keyed by task id, and by the thread that runs the task for crewAI releases whose chunk
+# events do not say which task they belong to
+_streamers: Dict[object, "SceneStreamer"] = {}
+_streamers_lock = threading.Lock()
+_handler_registered = False
+
+def _dispatch_chunk(source, event):
+    if event.tool_call is not None:
+        return
+    streamer = _streamer_for(event)
+    if streamer is not None:
+        streamer.feed(event.chunk)
+
+def _streamer_for(event) -> Optional["SceneStreamer"]:
+    task_id = getattr(event, "task_id", None)
+    with _streamers_lock:
+        return _streamers.get(str(task_id) if task_id is not None else threading.get_ident())
+
+def _dispatch_call_started(source, event):
+    streamer = _streamer_for(event)
+    if streamer is not None:
+        streamer.restart()
+
+def _register_handler():
+    # crewAI handlers cannot be removed, so one handler per event dispatches to the active streamers
+    global _handler_registered
+    with _streamers_lock:
+        if not _handler_registered:
+            event_bus().register_handler(llm_event("LLMStreamChunkEvent"), _dispatch_chunk)
+            event_bus().register_handler(llm_event("LLMCallStartedEvent"), _dispatch_call_started)
+            _handler_registered = True
+
+class SceneStreamer:
+    """
+    Writes a scene through the transcriber while the LLM is still generating it.
+
+    Chunks are dropped until the agent's "Final Answer:" marker shows up and written straight
+    through afterwards; the transcriber is flushed at paragraph boundaries so book.md can be
+    tailed. finish() reconciles the streamed text with the final task output: if nothing was
+    streamed (the provider does not stream, or the scene came from the cache) the whole output
+    is written at once, exactly like the non-streaming path, and streamed text the final
+    output does not start with (the agent retried) is retracted and replaced by the output.
+    """
+
+    def __init__(self, transcriber):
+        self.transcriber = transcriber
+        self.streamed = []
+        self.ttfb: Optional[float] = None
+        self._pending = ""
+        self._in_answer = False
+        self._started = None
+
+    @contextmanager
+    def listen(self, task: Task):
+        _register_handler()
+        self._started = time.perf_counter()
+        keys = (str(task.id), threading.get_ident())
+        with _streamers_lock:
+            for key in keys:
+                _streamers[key] = self
+        try:
+            yield self
+        finally:
+            with _streamers_lock:
+                for key in keys:
+                    _streamers.pop(key, None)
+
+    def feed(self, chunk: str):
+        if not self._in_answer:
+            self._pending += chunk
+            marker_at = self._pending.find(FINAL_ANSWER_MARKER)
+            if marker_at < 0:
+                return
+            self._in_answer = True
+            chunk = self._pending[marker_at + len(FINAL_ANSWER_MARKER):]
+            self._pending = ""
+            if self.streamed:
+                # A later call answered again (the agent retried); it replaces the earlier answer
+                self.transcriber.retract("".join(self.streamed))
+                self.streamed = []
+
+        if not self.streamed:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return
+
+        if self.ttfb is None:
+            self.ttfb = round(time.perf_counter() - self._started, 4)
+        self.streamed.append(chunk)
+        self._write(chunk)
+        if "\n" in chunk:
+            self._flush()
+
+    def restart(self):
+        """
+        Called when the task starts another LLM call: its chunks are reasoning again until the
+        next "Final Answer:" marker.
+        """
+        self._pending = ""
+        self._in_answer = False
+
+    def finish(self, paragraphs: str):
+        streamed = "".join(self.streamed)
+        if streamed and not paragraphs.startswith(streamed):
+            # The transcript has to match the scene that is checkpointed, cached and rendered
+            self.transcriber.retract(streamed)
+            streamed = ""
+        self._write(paragraphs[len(streamed):])
+        self._write("\n\n\n")
+        self._flush()
+
+    def _write(self, content: str):
+        if content:
+            self.transcriber.write(content)
+
+    def _flush(self):
+        # Makes the streamed text visible to anyone tailing the file; an atomic transcript still
+        # only publishes at chapter boundaries
+        flush = getattr(self.transcriber, "flush", None)
+        if callable(flush):
+            flush(publish=False)
@@ -1,35 +1,231 @@
 from ghost_writer.models import Scene, Act, Chapter, Idea, Characters
 from ghost_writer.tools.transcribe_tool import TranscribeTool
 from ghost_writer.services.writer_templates import get_scene_task_prompt
+from ghost_writer.services.continuity_tracker import ContinuityTracker
+from ghost_writer.services.prompt_context import ScenePromptContext
+from ghost_writer.services.scene_streamer import SceneStreamer
 from ghost_writer.utils.markdown_utils import header_markdown
+from ghost_writer.utils.content_cache import ContentCache
+from ghost_writer.utils.token_utils import estimate_tokens
+from ghost_writer.utils.metrics_recorder import MetricsRecorder, NullMetricsRecorder, agent_usage, usage_delta
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Dict, List, Tuple
+import threading
+import time
 
 from crewai import Agent, Task
 
 class SceneWriter:
     def __init__(
-            self, 
-            author_agent: Agent, 
-            transcriber: TranscribeTool = None):
+            self,
+            author_agent: Agent,
+            transcriber: TranscribeTool = None,
+            max_concurrency: int = 1,
+            cache: ContentCache = None,
+            compact_context: bool = False,
+            prompt_token_budget: int = None,
+            metrics: MetricsRecorder = None,
+            stream: bool = False,
+            continuity: ContinuityTracker = None):
         self.transcriber = transcriber or TranscribeTool()
         self.author_agent = author_agent
-    
-    def write_scene(self, scene: Scene, act: Act, chapter: Chapter, idea: Idea, characters: Characters):
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.compact_context = compact_context
+        self.prompt_token_budget = prompt_token_budget
+        self.metrics = metrics or NullMetricsRecorder()
+        # Scenes written without prefetching are streamed into the transcriber as they generate
+        self.stream = stream
+        # Rolling summary of the act so far, added to every scene prompt (see ContinuityTracker)
+        self.continuity = continuity
+        self._prompt_context: ScenePromptContext = None
+        self._prompt_context_lock = threading.Lock()
+        self._executor: ThreadPoolExecutor = None
+        self._pending: Dict[int, Future] = {}
+        self._worker_state = threading.local()
+
+    def prefetch_scenes(self, act: Act, idea: Idea, characters: Characters, scenes: List[Tuple[Chapter, Scene]] = None):
+        """
+        Starts generating every scene of the act in the background, bounded by max_concurrency.
+
+        Scene prompts only depend on the outline, so they can all be in flight at once. The
+        text is still transcribed in outline order when write_scene is called for each scene.
+        Does nothing when max_concurrency is 1.
+
+        Args:
+            scenes: Optional (chapter, scene) pairs to restrict prefetching to, e.g. the scenes
+                that have not been checkpointed yet. Defaults to every scene of the act.
+        """
+        if self.max_concurrency <= 1:
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="scene-writer")
+
+        if scenes is None:
+            scenes = [(chapter, scene) for chapter in act.chapters for scene in chapter.scenes]
+
+        for chapter, scene in scenes:
+            self._pending[id(scene)] = self._executor.submit(
+                self.generate_scene, scene, act, chapter, idea, characters, self.worker_agent)
+
+    def write_scene(
+            self,
+            scene: Scene,
+            act: Act,
+            chapter: Chapter,
+            idea: Idea,
+            characters: Characters,
+            transcriber: TranscribeTool = None,
+            agent_factory=None) -> str:
+        """
+        Transcribes the scene, generating it unless it was prefetched.
+
+        Args:
+            transcriber: Writes to this transcriber instead (e.g. a chapter fragment).
+            agent_factory: Supplies the author agent; required when called from a worker thread.
+        """
+        transcriber = transcriber or self.transcriber
         scene_header = header_markdown(text=scene.scene_title, level=4)
-        self.transcriber.run(content=scene_header)
-
-        write_scene_task_description = get_scene_task_prompt(
-            scene=scene,
-            act=act,
-            chapter=chapter,
-            idea=idea,
-            characters=characters
-        )
-        
-        task = Task(
-            description=write_scene_task_description.strip(),
-            expected_output="A well-written scene in markdown format.",
-            agent=self.author_agent
+        transcriber.run(content=scene_header)
+
+        pending = self._pending.pop(id(scene), None)
+        if pending is not None:
+            paragraphs = pending.result()
+        elif self.stream:
+            streamer = SceneStreamer(transcriber)
+            paragraphs = self.generate_scene(scene, act, chapter, idea, characters, agent_factory, streamer=streamer)
+            streamer.finish(paragraphs)
+            return paragraphs
+        else:
+            paragraphs = self.generate_scene(scene, act, chapter, idea, characters, agent_factory)
+
+        transcriber.run(content=f"{paragraphs}\n\n")
+        return paragraphs
+
+    def transcribe_scene(self, scene: Scene, paragraphs: str, transcriber: TranscribeTool = None):
+        """
+        Writes previously generated scene text (e.g. from a checkpoint) without calling the LLM.
+        """
+        transcriber = transcriber or self.transcriber
+        transcriber.run(content=header_markdown(text=scene.scene_title, level=4))
+        transcriber.run(content=f"{paragraphs}\n\n")
+
+    def generate_scene(
+            self,
+            scene: Scene,
+            act: Act,
+            chapter: Chapter,
+            idea: Idea,
+            characters: Characters,
+            agent_factory=None,
+            streamer: SceneStreamer = None) -> str:
+        with self.metrics.measure(
+                "scene",
+                act=act.act_number,
+                chapter=chapter.chapter_title,
+                scene=scene.scene_title,
+                model=self._model_name()) as metrics:
+            write_scene_task_description = get_scene_task_prompt(
+                scene=scene,
+                act=act,
+                chapter=chapter,
+                idea=idea,
+                characters=characters,
+                prompt_context=self._get_prompt_context(idea, characters),
+                continuity=self.continuity.context(act.act_number) if self.continuity else None
+            )
+            metrics["prompt_tokens_estimate"] = estimate_tokens(write_scene_task_description.strip())
+
+            cache_key = self._cache_key(write_scene_task_description.strip()) if self.cache else None
+            if cache_key:
+                cached = self.cache.get_text(cache_key)
+                if cached is not None:
+                    metrics["cached"] = True
+                    metrics["bytes_written"] = len(cached.encode("utf-8"))
+                    return cached
+
+            if streamer:
+                agent = self._streaming_agent()
+            else:
+                agent = agent_factory() if agent_factory else self.author_agent
+            task = Task(
+                description=write_scene_task_description.strip(),
+                expected_output="A well-written scene in markdown format.",
+                agent=agent
+            )
+            usage_before = agent_usage(agent)
+            started = time.perf_counter()
+            with streamer.listen(task) if streamer else nullcontext():
+                paragraphs = self._execute(task, scene)
+            metrics.update(usage_delta(usage_before, agent_usage(agent)))
+            # Time until the first byte of the scene could be transcribed
+            metrics["ttfb"] = streamer.ttfb if streamer and streamer.ttfb is not None else round(time.perf_counter() - started, 4)
+            metrics["bytes_written"] = len(paragraphs.encode("utf-8"))
+
+            if cache_key:
+                self.cache.put_text(cache_key, paragraphs)
+            return paragraphs
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _get_prompt_context(self, idea: Idea, characters: Characters) -> ScenePromptContext:
+        # Serialized once per run (i.e. per idea / cast) instead of once per scene
+        if not self.compact_context:
+            return None
+        with self._prompt_context_lock:
+            context = self._prompt_context
+            if context is None or context.idea is not idea or context.cast is not characters:
+                context = ScenePromptContext(idea, characters, token_budget=self.prompt_token_budget)
+                self._prompt_context = context
+            return context
+
+    def _model_name(self) -> str:
+        llm = self.author_agent.llm
+        return getattr(llm, "model", str(llm))
+
+    def _cache_key(self, description: str) -> str:
+        return ContentCache.make_key(
+            kind="scene",
+            prompt=description,
+            model=self._model_name(),
+            temperature=getattr(self.author_agent.llm, "temperature", None),
+            role=self.author_agent.role,
+            goal=self.author_agent.goal,
+            backstory=self.author_agent.backstory,
         )
-        paragraphs = task.execute_sync().raw
-        
-        self.transcriber.run(content=f"{paragraphs}\n\n")
\ No newline at end of file
+
+    def _execute(self, task: Task, scene: Scene) -> str:
+        # Subclasses answer the scene task without the LLM (benchmarks, replay)
+        return task.execute_sync().raw
+
+    def _streaming_agent(self) -> Agent:
+        # A per-thread copy of the author whose LLM streams; the author itself is shared with the crew
+        agent = getattr(self._worker_state, "stream_agent", None)
+        if agent is None:
+            agent = self.author_agent.copy()
+            agent.crew = self.author_agent.crew
+            if hasattr(agent.llm, "stream"):
+                agent.llm.stream = True
+            self._worker_state.stream_agent = agent
+        return agent
+
+    def worker_agent(self) -> Agent:
+        """
+        Returns the author copy of the calling thread. crewAI agents keep per-execution state
+        (executor, tool handlers), so each worker thread gets its own copy that still shares the
+        crew (and therefore its memory).
+        """
+        agent = getattr(self._worker_state, "agent", None)
+        if agent is None:
+            agent = self.author_agent.copy()
+            agent.crew = self.author_agent.crew
+            self._worker_state.agent = agent
+        return agent
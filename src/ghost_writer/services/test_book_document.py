@@ -0,0 +1,60 @@
+from ghost_writer.services.book_document import BookDocument, NodeKind
+from ghost_writer.utils.markdown_utils import split_markdown_sections
+
+def make_document():
+    document = BookDocument()
+    front_matter = document.add_front_matter()
+    document.add_image(front_matter, "images/cover.png", alt_text="Book Cover")
+    document.add_heading(front_matter, "Title", level=1)
+    document.add_quote(front_matter, "An epigraph", author="Author")
+    document.add_page_break(front_matter)
+    document.add_heading(front_matter, "Preface", level=2)
+    document.add_paragraphs(front_matter, "The preface.")
+    document.add_page_break(front_matter)
+
+    for act_number in (1, 2):
+        act = document.add_act(act_number, f"Act {act_number}")
+        chapter = document.add_chapter(act, act_number, f"Chapter {act_number}")
+        document.add_image(chapter, f"images/chapter_{act_number:02}.png", alt_text="Book Cover")
+        for scene_index in range(2):
+            scene = document.add_scene(chapter, scene_index, f"Scene {act_number}.{scene_index}")
+            document.add_paragraphs(scene, f"Text {act_number}.{scene_index}")
+        document.add_page_break(chapter)
+    return document
+
+def test_markdown_is_emitted_in_document_order():
+    document = make_document()
+    markdown = document.to_markdown()
+
+    markers = ["![Book Cover](images/cover.png)", "# Title", "An epigraph", "## Preface", "The preface.",
+               "## Act 1: Act 1", "### Chapter 1: Chapter 1", "#### Scene 1.0", "Text 1.0", "Text 1.1",
+               "## Act 2: Act 2", "Text 2.1"]
+    assert [markdown.index(marker) for marker in markers] == sorted(markdown.index(marker) for marker in markers)
+    assert document.to_markdown(document.acts[2]).startswith("## Act 2: Act 2")
+
+def test_sections_match_the_split_markdown():
+    document = make_document()
+
+    assert document.sections() == split_markdown_sections(document.to_markdown(), level=2)
+    assert document.sections(image_path=lambda path: path.replace(".png", ".print.jpg"))[0].count(".print.jpg") == 1
+
+def test_structural_nodes_are_added_once_and_scenes_can_be_replaced():
+    document = make_document()
+    nodes = len(document)
+
+    assert document.add_act(1, "Act 1") == document.acts[1]
+    assert document.add_scene(document.chapters[1], 1, "Scene 1.1") == document.scenes[(1, 1)]
+    assert len(document) == nodes
+
+    prose = [child for child in document.children(document.scenes[(2, 0)]) if document.kind(child) == NodeKind.PARAGRAPHS][0]
+    document.set_text(prose, "Rewritten 2.0")
+    assert document.scene_text(2, 0) == "Rewritten 2.0"
+    assert document.scene_text(3, 0) is None
+    assert "Text 2.0" not in document.to_markdown()
+
+def test_nodes_can_be_reordered_among_their_siblings():
+    document = make_document()
+    document.move(document.scenes[(1, 1)], 1)
+
+    markdown = document.to_markdown()
+    assert markdown.index("Text 1.1") < markdown.index("Text 1.0")
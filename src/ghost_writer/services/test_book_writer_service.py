@@ -2,6 +2,9 @@ import pytest
 from unittest.mock import MagicMock, patch
 from pathlib import Path
 from ghost_writer.services.book_writer_service import BookWriterService
+from ghost_writer.services.checkpoint_store import CheckpointStore
+from ghost_writer.services.progress_tracker import ProgressTracker
+from ghost_writer.tools.transcribe_tool import TranscribeTool
 from ghost_writer.models import Act, Chapter, Scene, Book, Idea, Characters
 from crewai import Agent
 
@@ -119,3 +122,197 @@ def test_save_pdf_calls_pdf_tool(book_writer, mock_pdf_tool):
         markdown_path=str(book_writer.book_md_path),
         output_pdf_path=str(book_writer.book_pdf_path)
     )
+
+def test_previews_render_in_the_background_and_the_final_render_runs_last(book_writer, mock_pdf_tool):
+    import threading
+    book_writer.book_md_path.write_text("# Test Book\n")
+    rendering = threading.Event()
+    release = threading.Event()
+    finals = []
+
+    def render(markdown_path, output_pdf_path):
+        finals.append(threading.current_thread().name)
+        rendering.set()
+        assert release.wait(5)
+    mock_pdf_tool.run.side_effect = render
+
+    book_writer.save_pdf(final=False)
+    assert rendering.wait(5)
+    # The crew keeps going while the first preview renders; these two collapse into one
+    book_writer.save_pdf(final=False)
+    book_writer.save_pdf(final=False)
+
+    # The final save discards the pending preview right away and waits for the running one
+    threading.Timer(0.05, release.set).start()
+    book_writer.save_pdf()
+
+    # The pending preview was superseded by the final render in the calling thread
+    assert finals == ["pdf-preview", threading.current_thread().name]
+
+def test_resumed_act_skips_completed_work(tmp_path, author_agent, mock_illustrator, mock_pdf_tool):
+    def make_scene(title):
+        return Scene(scene_title=title, scene_description="d", scene_plot=f"plot {title}", characters="John Doe")
+
+    act = Act(
+        act_number=1,
+        act_title="Act I",
+        act_description="The beginning",
+        act_plot="Setup",
+        chapters=[
+            Chapter(chapter_title="One", chapter_plot="p", chapter_description="d", scenes=[make_scene("A"), make_scene("B")]),
+            Chapter(chapter_title="Two", chapter_plot="p", chapter_description="d", scenes=[make_scene("C"), make_scene("D")]),
+        ]
+    )
+    idea = Idea(
+        premise="p", theme="t", characters="c", plot_concepts="p", tone_style="t", narrative_perspective="n",
+        symbolism="s", linquistic_constraints="l", inspirations="i", core_philosophical_questions="q")
+    characters = Characters(characters=[])
+
+    def make_writer():
+        return BookWriterService(
+            author_agent=author_agent,
+            transcriber=TranscribeTool(filename=str(tmp_path / "book.md")),
+            illustrator=mock_illustrator,
+            pdf_tool=mock_pdf_tool,
+            output_path=tmp_path,
+            checkpoints=CheckpointStore(output_path=tmp_path)
+        )
+
+    # The first run dies while generating the last scene of chapter two
+    outputs = [MagicMock(raw="text A"), MagicMock(raw="text B"), MagicMock(raw="text C"), RuntimeError("rate limited")]
+    with patch("crewai.Task.execute_sync", side_effect=outputs):
+        with pytest.raises(RuntimeError):
+            make_writer().write_act(act, idea, characters)
+
+    with patch("crewai.Task.execute_sync", return_value=MagicMock(raw="text D")) as execute:
+        writer = make_writer()
+        writer.write_act(act, idea, characters)
+
+    book = (tmp_path / "book.md").read_text(encoding="utf-8")
+    assert execute.call_count == 1
+    assert writer.chapter_number == 3
+    assert book.count("## Act 1: Act I") == 1
+    assert book.count("### Chapter 1: One") == 1
+    assert book.count("### Chapter 2: Two") == 1
+    assert [book.count(f"text {s}") for s in "ABCD"] == [1, 1, 1, 1]
+    assert book.index("text C") < book.index("text D")
+    # Chapter one was only restored from its checkpoints, yet the document matches the book
+    assert writer.document.to_markdown() == book
+
+def test_progress_counts_no_images_when_illustration_is_disabled(tmp_path, author_agent, mock_pdf_tool):
+    act = make_outline_act(1, 2)
+    idea = Idea(
+        premise="p", theme="t", characters="c", plot_concepts="p", tone_style="t", narrative_perspective="n",
+        symbolism="s", linquistic_constraints="l", inspirations="i", core_philosophical_questions="q")
+
+    def make_writer(progress=None):
+        return BookWriterService(
+            author_agent=author_agent,
+            transcriber=TranscribeTool(filename=str(tmp_path / "book.md")),
+            disable_illustration=True,
+            pdf_tool=mock_pdf_tool,
+            output_path=tmp_path,
+            checkpoints=CheckpointStore(output_path=tmp_path),
+            progress=progress
+        )
+
+    # Chapter one is restored from its checkpoints on resume, chapter two is written
+    with patch("crewai.Task.execute_sync", side_effect=[MagicMock(raw="text A"), RuntimeError("rate limited")]):
+        with pytest.raises(RuntimeError):
+            make_writer().write_act(act, idea, Characters(characters=[]))
+    progress = ProgressTracker(report_interval=0, echo=False)
+    with patch("crewai.Task.execute_sync", return_value=MagicMock(raw="text B")):
+        make_writer(progress).write_act(act, idea, Characters(characters=[]))
+
+    status = progress.snapshot()
+    assert status["chapters"] == {"completed": 2, "total": 2}
+    assert status["images"] == {"completed": 0, "total": 0}
+
+def make_outline_act(act_number, chapter_count):
+    chapters = [
+        Chapter(
+            chapter_title=f"A{act_number}C{index}",
+            chapter_plot="p",
+            chapter_description="d",
+            scenes=[Scene(scene_title=f"S{act_number}.{index}", scene_description="d",
+                          scene_plot=f"plot-{act_number}-{index}", characters="John Doe")])
+        for index in range(chapter_count)
+    ]
+    return Act(act_number=act_number, act_title=f"Act {act_number}", act_description="d", act_plot="p", chapters=chapters)
+
+def test_chapter_numbers_follow_the_outlines(book_writer):
+    with pytest.raises(ValueError):
+        book_writer.chapter_numbers(make_outline_act(2, 2))
+
+    assert book_writer.chapter_numbers(make_outline_act(1, 3)) == [1, 2, 3]
+    assert book_writer.chapter_numbers(make_outline_act(2, 2)) == [4, 5]
+
+def test_concurrent_chapters_are_stitched_in_book_order(tmp_path, author_agent, mock_illustrator, mock_pdf_tool):
+    import threading
+    import time
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def fake_execute(task):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        act_number, index = task.description.split("plot-")[1].split()[0].split("-")
+        # Earlier chapters take longest so they finish last
+        time.sleep(0.05 * (3 - int(index)))
+        with lock:
+            active -= 1
+        return MagicMock(raw=f"text {act_number}.{index}")
+
+    writer = BookWriterService(
+        author_agent=author_agent,
+        transcriber=TranscribeTool(filename=str(tmp_path / "book.md")),
+        illustrator=mock_illustrator,
+        pdf_tool=mock_pdf_tool,
+        output_path=tmp_path,
+        chapter_concurrency=4
+    )
+    idea = Idea(
+        premise="p", theme="t", characters="c", plot_concepts="p", tone_style="t", narrative_perspective="n",
+        symbolism="s", linquistic_constraints="l", inspirations="i", core_philosophical_questions="q")
+
+    book_info = Book(title="T", author="A", description="D", epigraph="E", preface="P", authors_note="N", genre="g")
+
+    with patch("crewai.Task.execute_sync", autospec=True, side_effect=fake_execute):
+        writer.write_book_intro(book_info)
+        writer.write_act(make_outline_act(1, 3), idea, Characters(characters=[]))
+        writer.write_act(make_outline_act(2, 3), idea, Characters(characters=[]))
+        writer.save_pdf()
+
+    book = (tmp_path / "book.md").read_text(encoding="utf-8")
+    markers = ["## Act 1", "### Chapter 1: A1C0", "text 1.0", "### Chapter 3: A1C2", "text 1.2",
+               "## Act 2", "### Chapter 4: A2C0", "text 2.0", "### Chapter 6: A2C2", "text 2.2"]
+    assert [book.index(marker) for marker in markers] == sorted(book.index(marker) for marker in markers)
+    assert peak > 1
+    assert not list((tmp_path / "fragments").glob("*.md"))
+    assert writer.document.to_markdown() == book
+
+def test_ebook_formats_skip_the_pdf_renderer(tmp_path, author_agent, mock_illustrator, mock_pdf_tool):
+    writer = BookWriterService(
+        author_agent=author_agent,
+        transcriber=TranscribeTool(filename=str(tmp_path / "book.md")),
+        illustrator=mock_illustrator,
+        pdf_tool=mock_pdf_tool,
+        output_path=tmp_path,
+        output_formats=("epub", "html"))
+    idea = Idea(
+        premise="p", theme="t", characters="c", plot_concepts="p", tone_style="t", narrative_perspective="n",
+        symbolism="s", linquistic_constraints="l", inspirations="i", core_philosophical_questions="q")
+
+    with patch("crewai.Task.execute_sync", return_value=MagicMock(raw="Scene text")):
+        writer.write_book_intro(Book(title="T", author="A", description="D", epigraph="E", preface="P", authors_note="N", genre="g"))
+        writer.write_act(make_outline_act(1, 2), idea, Characters(characters=[]))
+        writer.save_pdf(final=False)
+        writer.save_pdf()
+
+    assert not mock_pdf_tool.run.called
+    assert (tmp_path / "book.epub").exists()
+    assert (tmp_path / "html" / "index.html").exists()
+    with pytest.raises(ValueError):
+        BookWriterService(author_agent=author_agent, output_path=tmp_path, output_formats=("mobi",))
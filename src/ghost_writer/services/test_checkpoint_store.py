@@ -0,0 +1,32 @@
+from ghost_writer.services.checkpoint_store import CheckpointStore
+
+def test_units_and_transcript_size_survive_reload(tmp_path):
+    store = CheckpointStore(output_path=tmp_path)
+    store.complete("intro", transcript_size=120)
+    store.complete("chapter_1", transcript_size=480)
+
+    reloaded = CheckpointStore(output_path=tmp_path)
+
+    assert reloaded.is_complete("intro")
+    assert reloaded.is_complete("chapter_1")
+    assert not reloaded.is_complete("chapter_2")
+    assert reloaded.transcript_size == 480
+
+def test_scene_and_task_output_round_trip(tmp_path):
+    store = CheckpointStore(output_path=tmp_path)
+    store.save_scene(3, 1, "Scene text")
+    store.save_task_output("ideation_task", '{"premise": "p"}')
+
+    assert store.load_scene(3, 1) == "Scene text"
+    assert store.load_scene(3, 2) is None
+    assert store.load_task_output("ideation_task") == '{"premise": "p"}'
+    assert store.load_task_output("plot_development_task") is None
+
+def test_reset_forgets_progress(tmp_path):
+    store = CheckpointStore(output_path=tmp_path)
+    store.complete("intro", transcript_size=10)
+
+    store.reset()
+
+    assert not store.is_complete("intro")
+    assert store.transcript_size == 0
@@ -0,0 +1,79 @@
+from unittest.mock import MagicMock
+
+from ghost_writer.benchmarks.fakes import (
+    FakeSceneWriter, fake_author_agent, fake_text, synthetic_acts, synthetic_characters, synthetic_idea)
+from ghost_writer.services.book_writer_service import BookWriterService
+from ghost_writer.services.continuity_tracker import ContinuityTracker, extractive_summary
+from ghost_writer.services.writer_templates import get_scene_task_prompt
+from ghost_writer.tools.transcribe_tool import TranscribeTool
+from ghost_writer.utils.token_utils import estimate_tokens
+
+def test_extractive_summary_keeps_the_first_sentence_of_every_paragraph():
+    text = "Ada listens. The ground hums.\n\nCaelum answers! It is warm.\n\n"
+
+    assert extractive_summary(text, max_tokens=100) == "Ada listens. Caelum answers!"
+    assert estimate_tokens(extractive_summary(fake_text("long", 2000), max_tokens=50)) <= 50
+
+def test_scenes_are_summarized_once_and_the_context_stays_within_budget():
+    summarize = MagicMock(side_effect=lambda text: f"summary of {text[:12]}")
+    tracker = ContinuityTracker(summarize=summarize, token_budget=40)
+
+    for index in range(6):
+        tracker.record(1, f"Scene {index}", f"Scene text {index:02}")
+    # A restored or unchanged scene is not summarized again
+    tracker.record(1, "Scene 5", "Scene text 05")
+
+    assert summarize.call_count == 6
+    assert tracker.memoized == 1
+    context = tracker.context(1)
+    assert estimate_tokens(context) <= 40
+    assert "Scene 5" in context and "Scene 0" not in context
+    assert tracker.context(2) == ""
+
+    tracker.reset(1)
+    assert tracker.context(1) == ""
+
+def test_prompts_without_continuity_are_unchanged():
+    act = synthetic_acts(chapters=3, scenes_per_chapter=1)[0]
+    chapter, scene = act.chapters[0], act.chapters[0].scenes[0]
+    prompt = get_scene_task_prompt(scene, act, chapter, synthetic_idea(), synthetic_characters())
+
+    assert get_scene_task_prompt(scene, act, chapter, synthetic_idea(), synthetic_characters(), continuity="") == prompt
+    assert "Story so far" not in prompt
+    assert "- Scene 1.1: It began." in get_scene_task_prompt(
+        scene, act, chapter, synthetic_idea(), synthetic_characters(), continuity="- Scene 1.1: It began.")
+
+class RecordingSceneWriter(FakeSceneWriter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prompts = {}
+
+    def _execute(self, task, scene):
+        self.prompts[scene.scene_title] = task.description
+        return super()._execute(task, scene)
+
+def test_each_scene_prompt_carries_the_earlier_scenes_of_its_act(tmp_path):
+    author = fake_author_agent()
+    transcriber = TranscribeTool(filename=str(tmp_path / "book.md"))
+    scene_writer = RecordingSceneWriter(author_agent=author, transcriber=transcriber, max_concurrency=4, words=40)
+    writer = BookWriterService(
+        author_agent=author,
+        transcriber=transcriber,
+        illustrator=MagicMock(),
+        pdf_tool=MagicMock(),
+        output_path=tmp_path,
+        scene_writer=scene_writer,
+        chapter_concurrency=3,
+        continuity=ContinuityTracker(token_budget=400))
+
+    for act in synthetic_acts(chapters=6, scenes_per_chapter=2)[:2]:
+        writer.write_act(act, synthetic_idea(), synthetic_characters())
+
+    # Written one at a time, so every prompt saw everything before it
+    assert writer.chapter_executor is None and scene_writer.max_concurrency == 1
+    assert "Story so far" not in scene_writer.prompts["Scene 1.1"]
+    assert "- Scene 1.1:" in scene_writer.prompts["Scene 1.2"]
+    assert "- Scene 1.1:" in scene_writer.prompts["Scene 2.2"] and "- Scene 2.1:" in scene_writer.prompts["Scene 2.2"]
+    # A new act starts without the previous act's summaries
+    assert "Story so far" not in scene_writer.prompts["Scene 3.1"]
+    assert "- Scene 3.1:" in scene_writer.prompts["Scene 4.1"]
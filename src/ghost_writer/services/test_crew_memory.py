@@ -0,0 +1,93 @@
+import pytest
+
+from ghost_writer.services.crew_memory import BoundedMemoryStorage, ScopedCrewMemory
+from ghost_writer.utils.fake_image_server import FakeImageServer
+from ghost_writer.utils.metrics_recorder import MetricsRecorder
+
+VOCABULARY = ["ada", "caelum", "worm", "light", "clay", "signal"]
+
+class FakeEmbedder:
+    """Bag-of-words embeddings over a tiny vocabulary; counts the calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[text.lower().split().count(word) for word in VOCABULARY] for text in texts]
+
+@pytest.fixture
+def embed():
+    return FakeEmbedder()
+
+def test_saves_are_embedded_in_batches(embed):
+    storage = BoundedMemoryStorage(embed, max_items=100, batch_size=16)
+    for index in range(40):
+        storage.save(f"ada signal {index}")
+
+    # Two full batches while saving, the remaining 8 and the query once a search needs them
+    assert [len(call) for call in embed.calls] == [16, 16]
+    storage.search("ada")
+    assert [len(call) for call in embed.calls] == [16, 16, 8, 1]
+    assert storage.snapshot().embedding_calls == 4
+
+def test_least_recently_used_items_are_evicted(embed):
+    storage = BoundedMemoryStorage(embed, max_items=2, batch_size=1, eviction="lru")
+    storage.save("ada light")
+    storage.save("caelum clay")
+    # A search hit makes "ada light" the most recently used item
+    assert [hit["content"] for hit in storage.search("ada light", score_threshold=0.9)] == ["ada light"]
+    storage.save("worm signal")
+
+    assert [item.content for item in storage.items.values()] == ["ada light", "worm signal"]
+    assert storage.snapshot().evictions == 1
+
+def test_oldest_items_are_evicted_first_in_fifo_mode(embed):
+    storage = BoundedMemoryStorage(embed, max_items=2, batch_size=1, eviction="fifo")
+    storage.save("ada light")
+    storage.save("caelum clay")
+    storage.search("ada light")
+    storage.save("worm signal")
+
+    assert [item.content for item in storage.items.values()] == ["caelum clay", "worm signal"]
+
+def test_memories_outside_the_kept_scopes_are_dropped(embed):
+    storage = BoundedMemoryStorage(embed, keep_scopes=2)
+    for scope in ["act_1", "act_2", "act_3"]:
+        storage.start_scope(scope)
+        storage.save(f"ada {scope}")
+
+    assert [item.content for item in storage.items.values()] == ["ada act_2", "ada act_3"]
+
+def test_scope_changes_report_memory_metrics_and_reset_crew_memory(tmp_path, embed):
+    metrics = MetricsRecorder(str(tmp_path / "trace.jsonl"))
+    memory = ScopedCrewMemory(scope="act", batch_size=2, embed=embed, metrics=metrics)
+    short_term = memory.crew_memories()["short_term_memory"]
+
+    memory.enter("act", 1)
+    short_term.save("Caelum speaks in clay", metadata={"observation": "scene"})
+    short_term.save("Ada measures light", metadata={"observation": "scene"})
+    assert [hit["content"] for hit in short_term.search("caelum clay")] == ["Caelum speaks in clay"]
+    # Chapters do not change an act scope
+    memory.enter("chapter", 1, 1)
+    memory.enter("act", 2)
+    assert short_term.search("caelum clay") == []
+
+    act_1 = next(r for r in metrics.records if r["memory"] == "short_term" and r.get("act") == 1)
+    assert act_1["items"] == 2
+    assert act_1["embedding_calls"] == 2
+    assert metrics.summary()["act"]["Act 1"]["embedding_calls"] == 2
+
+def test_unknown_scope_is_rejected():
+    with pytest.raises(ValueError):
+        ScopedCrewMemory(scope="scene")
+
+def test_the_default_embedder_is_built_by_the_installed_crewai():
+    with FakeImageServer() as server:
+        memory = ScopedCrewMemory(embedder_config={
+            "provider": "openai",
+            "config": {"model_name": "text-embedding-3-small", "api_key": "test", "api_base": server.base_url}})
+        vectors = memory.embed(["Ada listens", "The worm turns slowly"])
+
+    assert [list(vector) for vector in vectors] == [[11.0, 2.0, 1.0], [21.0, 4.0, 1.0]]
+    assert server.requests[0]["model"] == "text-embedding-3-small"
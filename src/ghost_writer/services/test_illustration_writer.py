@@ -0,0 +1,41 @@
+import threading
+from unittest.mock import MagicMock
+
+from ghost_writer.services.illustration_writer import IllustrationWriter
+
+def test_background_illustration_writes_tag_before_image_completes(tmp_path):
+    release = threading.Event()
+    illustrator = MagicMock()
+    illustrator.run.side_effect = lambda **kwargs: release.wait(5) and "done"
+    transcriber = MagicMock()
+    writer = IllustrationWriter(
+        illustrator=illustrator,
+        transcriber=transcriber,
+        images_path=tmp_path / "images",
+        output_path=tmp_path,
+        max_workers=2
+    )
+
+    writer.write_illustration(prompt="a cat", size="1024x1024", filename="chapter_01.png")
+
+    # The tag is transcribed while the image is still being generated
+    transcriber.run.assert_called_once_with(content="![Book Cover](images/chapter_01.png)\n\n")
+    assert len(writer.pending) == 1
+
+    release.set()
+    assert writer.wait() == ["done"]
+    assert writer.pending == []
+
+def test_synchronous_illustration_runs_inline(tmp_path):
+    illustrator = MagicMock()
+    writer = IllustrationWriter(
+        illustrator=illustrator,
+        transcriber=MagicMock(),
+        images_path=tmp_path / "images",
+        output_path=tmp_path
+    )
+
+    writer.write_illustration(prompt="a cat", size="1024x1024", filename="cover.png")
+
+    illustrator.run.assert_called_once_with(prompt="a cat", filename=str(tmp_path / "images" / "cover.png"), size="1024x1024")
+    assert writer.wait() == []
@@ -0,0 +1,71 @@
+import io
+
+import pytest
+
+from ghost_writer.services.image_pipeline import ImagePipeline, ImageProfile
+from ghost_writer.utils.content_cache import ContentCache
+from ghost_writer.utils.fake_image_server import synthetic_png
+
+Image = pytest.importorskip("PIL.Image")
+
+@pytest.fixture
+def images_path(tmp_path):
+    path = tmp_path / "images"
+    path.mkdir()
+    (path / "chapter_01.png").write_bytes(synthetic_png(1024, 1536))
+    return path
+
+def test_variant_is_downscaled_and_recompressed(images_path):
+    pipeline = ImagePipeline(images_path)
+
+    variant = pipeline.variant(images_path / "chapter_01.png", "screen")
+
+    assert variant.suffix == ".jpg"
+    with Image.open(variant) as image:
+        assert image.format == "JPEG"
+        assert max(image.size) == 900
+
+def test_variant_is_rendered_once_per_source(images_path, monkeypatch):
+    pipeline = ImagePipeline(images_path)
+    first = pipeline.variant(images_path / "chapter_01.png", "print")
+    monkeypatch.setattr(ImagePipeline, "_render", lambda *args: pytest.fail("rendered twice"))
+
+    assert pipeline.variant(images_path / "chapter_01.png", "print") == first
+
+def test_changed_source_replaces_stale_variant(images_path):
+    pipeline = ImagePipeline(images_path)
+    first = pipeline.variant(images_path / "chapter_01.png", "print")
+    (images_path / "chapter_01.png").write_bytes(synthetic_png(64, 64, color=(0, 0, 255)))
+
+    second = pipeline.variant(images_path / "chapter_01.png", "print")
+
+    assert second != first
+    assert not first.exists()
+
+def test_variants_are_reused_from_the_cache_across_runs(tmp_path, images_path, monkeypatch):
+    cache = ContentCache(cache_dir=str(tmp_path / "cache"))
+    ImagePipeline(images_path, cache=cache).variant(images_path / "chapter_01.png", "screen")
+    fresh_images = tmp_path / "fresh"
+    fresh_images.mkdir()
+    (fresh_images / "chapter_01.png").write_bytes((images_path / "chapter_01.png").read_bytes())
+    monkeypatch.setattr(ImagePipeline, "_render", lambda *args: pytest.fail("not served from cache"))
+
+    assert ImagePipeline(fresh_images, cache=cache).variant(fresh_images / "chapter_01.png", "screen").exists()
+
+def test_palette_profile_writes_png(images_path):
+    profiles = {"ebook": ImageProfile(name="ebook", dpi=96, palette_colors=16)}
+    variant = ImagePipeline(images_path, profiles=profiles).variant(images_path / "chapter_01.png", "ebook")
+
+    with Image.open(io.BytesIO(variant.read_bytes())) as image:
+        assert image.format == "PNG"
+        assert image.mode == "P"
+
+def test_rewrite_markdown_points_at_variants(tmp_path, images_path):
+    pipeline = ImagePipeline(images_path)
+    content = "# Book\n\n![Book Cover](images/chapter_01.png)\n\n![Book Cover](images/missing.png)\n"
+
+    rewritten = pipeline.rewrite_markdown(content, tmp_path, "screen")
+
+    assert "](images/variants/chapter_01.screen." in rewritten
+    # Images that have not been generated yet are left alone
+    assert "](images/missing.png)" in rewritten
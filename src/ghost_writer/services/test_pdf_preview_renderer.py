@@ -0,0 +1,72 @@
+import threading
+import time
+
+from ghost_writer.services.pdf_preview_renderer import PdfPreviewRenderer
+
+class BlockingRender:
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, label):
+        self.calls.append(label)
+        self.started.set()
+        assert self.release.wait(5)
+
+def test_requests_during_a_render_coalesce_into_the_latest():
+    render = BlockingRender()
+    renderer = PdfPreviewRenderer(render)
+
+    renderer.request("act 1")
+    assert render.started.wait(5)
+    for label in ["act 2", "act 3", "book"]:
+        renderer.request(label)
+    render.release.set()
+    renderer.wait()
+
+    assert render.calls == ["act 1", "book"]
+    assert (renderer.requested, renderer.rendered, renderer.coalesced) == (4, 2, 2)
+    renderer.close()
+
+def test_wait_can_discard_a_preview_that_has_not_started():
+    render = BlockingRender()
+    renderer = PdfPreviewRenderer(render)
+    renderer.request("act 1")
+    assert render.started.wait(5)
+    renderer.request("act 2")
+
+    render.release.set()
+    renderer.wait(discard_pending=True)
+
+    assert render.calls == ["act 1"]
+    renderer.close()
+
+def test_a_burst_of_requests_is_debounced_into_one_render():
+    calls = []
+    renderer = PdfPreviewRenderer(calls.append, debounce=0.05)
+    for index in range(5):
+        renderer.request(index)
+        time.sleep(0.005)
+    renderer.wait()
+
+    assert calls == [4]
+    renderer.close()
+
+def test_a_failed_preview_does_not_stop_the_worker():
+    calls = []
+
+    def render(label):
+        calls.append(label)
+        if label == "broken":
+            raise RuntimeError("markdown_pdf failed")
+
+    renderer = PdfPreviewRenderer(render)
+    renderer.request("broken")
+    renderer.wait()
+    renderer.request("fixed")
+    renderer.wait()
+
+    assert calls == ["broken", "fixed"]
+    assert isinstance(renderer.last_error, RuntimeError)
+    renderer.close()
@@ -0,0 +1,61 @@
+import json
+
+from ghost_writer.benchmarks.fakes import synthetic_acts
+from ghost_writer.services.progress_tracker import ProgressTracker, format_progress
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_eta_extrapolates_unplanned_acts_from_the_moving_average(tmp_path):
+    clock = FakeClock()
+    progress = ProgressTracker(status_path=tmp_path / "progress.json", smoothing=0.5, report_interval=0, clock=clock, echo=False)
+    progress.add_work(images=2)
+    progress.add_act(synthetic_acts(chapters=6, scenes_per_chapter=2)[0])
+
+    for interval in (10, 20):
+        clock.now += interval
+        progress.scene_completed(words=500)
+
+    status = json.loads((tmp_path / "progress.json").read_text(encoding="utf-8"))
+    # Two of three acts are not outlined yet: 4 planned scenes per act
+    assert status["scenes"] == {"completed": 2, "total": 4}
+    assert status["images"] == {"completed": 0, "total": 4}
+    assert status["planned_scenes"] == 12
+    assert status["seconds_per_scene"] == 15
+    assert status["eta_seconds"] == 10 * 15
+    assert status["words_per_minute"] == 2000
+
+def test_restored_work_counts_as_done_without_moving_the_averages(tmp_path):
+    clock = FakeClock()
+    progress = ProgressTracker(report_interval=0, clock=clock, echo=False)
+    progress.add_act(synthetic_acts(chapters=3, scenes_per_chapter=2, acts=1)[0])
+    clock.now = 100
+    progress.restore(scenes=2, chapters=1, images=1)
+    progress.scene_completed(words=300, restored=True)
+    clock.now = 130
+    progress.scene_completed(words=300)
+
+    status = progress.snapshot()
+    assert status["scenes"]["completed"] == 4 and status["chapters"]["completed"] == 1
+    assert status["seconds_per_scene"] == 30
+    assert status["words"] == 300
+
+def test_reports_are_throttled_and_the_final_one_is_forced(tmp_path, capsys):
+    clock = FakeClock()
+    progress = ProgressTracker(status_path=tmp_path / "progress.json", report_interval=5, clock=clock)
+    progress.add_act(synthetic_acts(chapters=3, scenes_per_chapter=1, acts=1)[0])
+    clock.now = 1
+    progress.scene_completed(words=100)
+    progress.chapter_completed()
+    clock.now = 2
+    progress.finish()
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 2
+    assert lines[-1] == format_progress(progress.snapshot())
+    assert "done after" in lines[-1]
+    assert json.loads((tmp_path / "progress.json").read_text(encoding="utf-8"))["state"] == "done"
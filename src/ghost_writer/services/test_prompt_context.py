@@ -0,0 +1,65 @@
+import pytest
+
+from ghost_writer.models import Scene, Idea, Characters, Character, Act, Chapter
+from ghost_writer.services.prompt_context import ScenePromptContext
+from ghost_writer.services.writer_templates import get_scene_task_prompt
+from ghost_writer.utils.token_utils import estimate_tokens
+
+def make_character(name, role="Supporting"):
+    return Character(
+        name=name,
+        role=role,
+        traits="Curious",
+        backstory="A long backstory " * 40,
+        motivations="To understand",
+        flaws="Stubborn",
+        relationships="Complicated " * 20)
+
+@pytest.fixture
+def idea():
+    return Idea(
+        premise="A scientist talks to a worm",
+        theme="Connection",
+        characters="Ada, Caelum",
+        plot_concepts="Long plot concepts " * 40,
+        tone_style="Reflective",
+        narrative_perspective="Third person",
+        symbolism="Earth " * 40,
+        linquistic_constraints="No em dashes",
+        inspirations="Many " * 40,
+        core_philosophical_questions="What is consciousness?")
+
+@pytest.fixture
+def cast():
+    return Characters(characters=[
+        make_character("Dr. Ada N. Sel", "Protagonist"),
+        make_character("Caelum Lumbricus"),
+        make_character("Marcus Hale"),
+    ])
+
+def make_scene(characters):
+    return Scene(scene_title="Contact", scene_description="d", scene_plot="They talk", characters=characters)
+
+def test_only_scene_characters_are_included(idea, cast):
+    context = ScenePromptContext(idea, cast)
+
+    assert context.scene_characters(make_scene("Ada and Caelum")) == ["Dr. Ada N. Sel", "Caelum Lumbricus"]
+    _, characters_json = context.for_scene(make_scene("Marcus Hale alone"))
+    assert "Marcus Hale" in characters_json
+    assert "Caelum" not in characters_json
+
+def test_unmatched_scene_characters_fall_back_to_whole_cast(idea, cast):
+    context = ScenePromptContext(idea, cast)
+
+    assert len(context.scene_characters(make_scene("A crowd"))) == 3
+
+def test_token_budget_is_respected(idea, cast):
+    scene = make_scene("Ada, Caelum, Marcus")
+    act = Act(act_number=1, act_title="a", act_description="d", act_plot="p", chapters=[])
+    chapter = Chapter(chapter_title="c", chapter_description="d", chapter_plot="p", scenes=[scene])
+
+    full = get_scene_task_prompt(scene, act, chapter, idea, cast)
+    compact = get_scene_task_prompt(scene, act, chapter, idea, cast, prompt_context=ScenePromptContext(idea, cast, token_budget=400))
+
+    assert estimate_tokens(compact) <= 400 < estimate_tokens(full)
+    assert "No em dashes" in compact
@@ -0,0 +1,93 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from ghost_writer.benchmarks.fakes import (
+    FakeIllustrator, FakeSceneWriter, fake_author_agent, synthetic_acts, synthetic_book, synthetic_characters, synthetic_idea)
+from ghost_writer.services.book_writer_service import BookWriterService
+from ghost_writer.services.checkpoint_store import CheckpointStore
+from ghost_writer.services.continuity_tracker import ContinuityTracker
+from ghost_writer.services.scene_regenerator import SceneRegenerator, parse_target
+from ghost_writer.tools.convert_to_pdf_tool import MarkdownToPDFTool
+from ghost_writer.tools.transcribe_tool import TranscribeTool
+
+@pytest.fixture
+def written_book(tmp_path):
+    """A finished book of three acts, two chapters each, written with checkpoints."""
+    author = fake_author_agent()
+    checkpoints = CheckpointStore(output_path=tmp_path)
+    acts = synthetic_acts(chapters=6, scenes_per_chapter=2)
+    checkpoints.save_task_output("ideation_task", synthetic_idea().model_dump_json())
+    checkpoints.save_task_output("character_development_task", synthetic_characters().model_dump_json())
+    for act in acts:
+        checkpoints.save_task_output(f"act{act.act_number}_development_task", act.model_dump_json())
+
+    transcriber = TranscribeTool(filename=str(tmp_path / "book.md"))
+    writer = BookWriterService(
+        author_agent=author,
+        transcriber=transcriber,
+        illustrator=FakeIllustrator(),
+        pdf_tool=MagicMock(),
+        output_path=tmp_path,
+        checkpoints=checkpoints,
+        scene_writer=FakeSceneWriter(author_agent=author, transcriber=transcriber, words=40))
+    writer.write_book_intro(synthetic_book())
+    for act in acts:
+        writer.write_act(act, synthetic_idea(), synthetic_characters())
+    writer.save_pdf()
+    return tmp_path
+
+def make_regenerator(path, **kwargs):
+    return SceneRegenerator(
+        output_path=path,
+        scene_writer=FakeSceneWriter(author_agent=fake_author_agent(), words=60),
+        **kwargs)
+
+def test_targets_name_chapters_or_scenes_counted_from_one():
+    assert parse_target("12") == (12, None)
+    assert parse_target("12.3") == (12, 2)
+    with pytest.raises(ValueError):
+        parse_target("twelve")
+
+def test_a_scene_is_replaced_in_place(written_book):
+    checkpoints = CheckpointStore(output_path=written_book)
+    before = (written_book / "book.md").read_text(encoding="utf-8")
+    previous = checkpoints.load_scene(3, 1)
+
+    regenerated = make_regenerator(written_book).regenerate([(3, 1)])
+
+    after = (written_book / "book.md").read_text(encoding="utf-8")
+    text = CheckpointStore(output_path=written_book).load_scene(3, 1)
+    assert [(scene.chapter_number, scene.scene_index, scene.previous_words, scene.words) for scene in regenerated] == [(3, 1, 40, 60)]
+    assert previous not in after and text in after
+    assert after == before.replace(previous, text)
+    # Completed units still end where book.md ends, so a resume does not cut into the new text
+    assert CheckpointStore(output_path=written_book).transcript_size == (written_book / "book.md").stat().st_size
+
+def test_a_chapter_regenerates_every_scene_and_only_its_pdf_section_renders(written_book):
+    regenerator = make_regenerator(written_book, pdf_tool=MarkdownToPDFTool(incremental=True))
+    assert "(6 section(s) re-rendered)" in regenerator.render_pdf()
+
+    regenerated = regenerator.regenerate([(4, None)])
+
+    assert [(scene.scene_index, scene.words) for scene in regenerated] == [(0, 60), (1, 60)]
+    assert "(1 section(s) re-rendered)" in regenerator.render_pdf()
+
+def test_a_scene_edited_by_hand_is_not_overwritten(written_book):
+    book_md = written_book / "book.md"
+    previous = CheckpointStore(output_path=written_book).load_scene(1, 0)
+    book_md.write_text(book_md.read_text(encoding="utf-8").replace(previous, "Edited by hand."), encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        make_regenerator(written_book).regenerate([(1, 0)])
+    assert "Edited by hand." in book_md.read_text(encoding="utf-8")
+
+def test_a_regenerated_scene_sees_the_earlier_scenes_of_its_act(written_book):
+    regenerator = make_regenerator(written_book, continuity=ContinuityTracker())
+    prompts = []
+    regenerator.scene_writer._execute = lambda task, scene: prompts.append(task.description) or "New text."
+
+    regenerator.regenerate([(2, 0)])
+
+    assert "- Scene 1.1:" in prompts[0] and "- Scene 1.2:" in prompts[0]
+    assert "- Scene 2.1:" not in prompts[0]
@@ -0,0 +1,117 @@
+from unittest.mock import MagicMock, patch
+
+from crewai import Task
+
+from ghost_writer.models import Idea, Characters
+from ghost_writer.services.scene_streamer import SceneStreamer
+from ghost_writer.services.scene_writer import SceneWriter
+from ghost_writer.services.test_scene_writer import author_agent, make_act
+from ghost_writer.tools.buffered_transcribe_tool import BufferedTranscribeTool
+from ghost_writer.tools.transcribe_tool import TranscribeTool
+from ghost_writer.utils.crewai_events import event_bus, llm_event
+from ghost_writer.utils.markdown_utils import header_markdown
+
+IDEA = Idea(
+    premise="A story about friendship",
+    theme="Friendship",
+    characters="John Doe",
+    plot_concepts="A journey",
+    tone_style="Light-hearted",
+    narrative_perspective="First-person",
+    symbolism="The journey represents life",
+    linquistic_constraints="Simple language",
+    inspirations="Real-life events",
+    core_philosophical_questions="What does it mean to be a friend?")
+
+def test_scene_is_streamed_after_the_final_answer_marker(tmp_path, author_agent):
+    act = make_act(1)
+    chapter = act.chapters[0]
+    book = tmp_path / "book.md"
+    seen = []
+    chunks = ["Thought: I now can give a great answer\nFinal ", "Answer: Hello", " world.\n\nSecond", " paragraph."]
+
+    def execute(task: Task):
+        for chunk in chunks:
+            event_bus().emit(task.agent.llm, llm_event("LLMStreamChunkEvent")(chunk=chunk, from_task=task))
+            seen.append(book.read_text())
+        return MagicMock(raw="Hello world.\n\nSecond paragraph.")
+
+    writer = SceneWriter(author_agent=author_agent, transcriber=TranscribeTool(filename=str(book)), stream=True)
+    with patch("crewai.Task.execute_sync", autospec=True, side_effect=execute):
+        writer.write_scene(chapter.scenes[0], act, chapter, IDEA, Characters(characters=[]))
+
+    assert book.read_text() == header_markdown("Scene 0", level=4) + "\nHello world.\n\nSecond paragraph.\n\n\n"
+    # The scene shows up in book.md before the task finishes
+    assert seen[2].endswith("Hello world.\n\nSecond")
+
+def test_an_answer_the_agent_retried_is_replaced_in_the_transcript(tmp_path, author_agent):
+    act = make_act(1)
+    chapter = act.chapters[0]
+    book = tmp_path / "book.md"
+    seen = []
+    calls = [
+        ["Thought: x\nFinal Answer: First draft.\n", "Rejected"],
+        ["Thought: the format was wrong\nFinal Answer: Hello", " world."],
+    ]
+
+    def execute(task: Task):
+        for chunks in calls:
+            event_bus().emit(task.agent.llm, llm_event("LLMCallStartedEvent")(messages="scene", from_task=task))
+            for chunk in chunks:
+                event_bus().emit(task.agent.llm, llm_event("LLMStreamChunkEvent")(chunk=chunk, from_task=task))
+        seen.append(book.read_text())
+        return MagicMock(raw="Hello world.")
+
+    writer = SceneWriter(author_agent=author_agent, transcriber=TranscribeTool(filename=str(book)), stream=True)
+    with patch("crewai.Task.execute_sync", autospec=True, side_effect=execute):
+        writer.write_scene(chapter.scenes[0], act, chapter, IDEA, Characters(characters=[]))
+
+    # The retry's reasoning is not streamed and its answer replaces the first one
+    assert seen == [header_markdown("Scene 0", level=4) + "\nHello world."]
+    assert book.read_text() == header_markdown("Scene 0", level=4) + "\nHello world.\n\n\n"
+
+def test_a_streamed_answer_that_differs_from_the_output_is_rewritten(tmp_path):
+    book = tmp_path / "book.md"
+    book.write_text("# Chapter\n", encoding="utf-8")
+    streamer = SceneStreamer(TranscribeTool(filename=str(book)))
+    streamer._started = 0
+
+    streamer.feed("Final Answer: Hello world.\n\nSecond")
+    streamer.finish("Hello there.")
+
+    assert book.read_text(encoding="utf-8") == "# Chapter\nHello there.\n\n\n"
+
+def test_streaming_falls_back_to_the_task_output():
+    transcriber = MagicMock()
+    streamer = SceneStreamer(transcriber)
+
+    streamer.finish("Whole scene.")
+
+    assert [call.args[0] for call in transcriber.write.call_args_list] == ["Whole scene.", "\n\n\n"]
+
+def test_marker_split_across_chunks():
+    transcriber = MagicMock()
+    streamer = SceneStreamer(transcriber)
+    streamer._started = 0
+
+    for chunk in ["Thought: x\nFinal An", "swer:", "  Once", " upon"]:
+        streamer.feed(chunk)
+    streamer.finish("Once upon a time")
+
+    written = "".join(call.args[0] for call in transcriber.write.call_args_list)
+    assert written == "Once upon a time\n\n\n"
+    assert streamer.ttfb is not None
+
+def test_streaming_into_an_atomic_transcript_does_not_publish_half_scenes(tmp_path):
+    book = tmp_path / "book.md"
+    transcriber = BufferedTranscribeTool(filename=str(book), buffer_size=1, atomic=True)
+    streamer = SceneStreamer(transcriber)
+    streamer._started = 0
+
+    streamer.feed("Final Answer: First paragraph.\n\nSecond")
+    assert not book.exists()
+    assert transcriber.partial_path.read_text(encoding="utf-8") == "First paragraph.\n\nSecond"
+
+    streamer.finish("First paragraph.\n\nSecond paragraph.")
+    transcriber.finalize()
+    assert book.read_text(encoding="utf-8") == "First paragraph.\n\nSecond paragraph.\n\n\n"
@@ -0,0 +1,114 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from crewai import Agent, Task
+
+from ghost_writer.models import Act, Chapter, Scene, Idea, Characters
+from ghost_writer.services.scene_writer import SceneWriter
+from ghost_writer.utils.content_cache import ContentCache
+from ghost_writer.utils.metrics_recorder import MetricsRecorder
+
+@pytest.fixture
+def author_agent():
+    return Agent(config={"name": "Test Author", "role": "Writes scenes", "goal": "goal", "backstory": "backstory"}, verbose=False)
+
+@pytest.fixture
+def idea():
+    return Idea(
+        premise="A story about friendship",
+        theme="Friendship",
+        characters="John Doe",
+        plot_concepts="A journey",
+        tone_style="Light-hearted",
+        narrative_perspective="First-person",
+        symbolism="The journey represents life",
+        linquistic_constraints="Simple language",
+        inspirations="Real-life events",
+        core_philosophical_questions="What does it mean to be a friend?")
+
+@pytest.fixture
+def characters():
+    return Characters(characters=[])
+
+def make_act(scene_count: int) -> Act:
+    scenes = [
+        Scene(
+            scene_title=f"Scene {i}",
+            scene_description="desc",
+            scene_plot=f"plot-{i}",
+            characters="John Doe")
+        for i in range(scene_count)
+    ]
+    chapter = Chapter(chapter_title="One", chapter_description="desc", chapter_plot="plot", scenes=scenes)
+    return Act(act_number=1, act_title="Act", act_description="desc", act_plot="plot", chapters=[chapter])
+
+def test_prefetched_scenes_are_transcribed_in_outline_order(author_agent, idea, characters):
+    act = make_act(6)
+    chapter = act.chapters[0]
+    transcriber = MagicMock()
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_execute(task: Task):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        index = int(task.description.split("plot-")[1].split()[0])
+        # Later scenes finish first to prove ordering does not depend on completion order
+        time.sleep(0.01 * (6 - index))
+        with lock:
+            active -= 1
+        return MagicMock(raw=f"text-{index}")
+
+    writer = SceneWriter(author_agent=author_agent, transcriber=transcriber, max_concurrency=3)
+    with patch("crewai.Task.execute_sync", autospec=True, side_effect=fake_execute):
+        writer.prefetch_scenes(act, idea, characters)
+        for scene in chapter.scenes:
+            writer.write_scene(scene, act, chapter, idea, characters)
+    writer.shutdown()
+
+    contents = [call.kwargs["content"] for call in transcriber.run.call_args_list]
+    texts = [c.strip() for c in contents if c.startswith("text-")]
+    assert texts == [f"text-{i}" for i in range(6)]
+    assert 1 < peak <= 3
+
+def test_sequential_mode_does_not_prefetch(author_agent, idea, characters):
+    act = make_act(2)
+    writer = SceneWriter(author_agent=author_agent, transcriber=MagicMock())
+
+    writer.prefetch_scenes(act, idea, characters)
+
+    assert writer._executor is None
+
+def test_cached_scene_skips_llm(tmp_path, author_agent, idea, characters):
+    act = make_act(1)
+    chapter = act.chapters[0]
+    cache = ContentCache(cache_dir=str(tmp_path))
+    writer = SceneWriter(author_agent=author_agent, transcriber=MagicMock(), cache=cache)
+
+    with patch("crewai.Task.execute_sync", return_value=MagicMock(raw="Generated once")) as execute:
+        first = writer.generate_scene(chapter.scenes[0], act, chapter, idea, characters)
+        second = writer.generate_scene(chapter.scenes[0], act, chapter, idea, characters)
+
+    assert first == second == "Generated once"
+    assert execute.call_count == 1
+
+def test_scene_generation_is_recorded(tmp_path, author_agent, idea, characters):
+    act = make_act(1)
+    chapter = act.chapters[0]
+    metrics = MetricsRecorder(trace_path=str(tmp_path / "trace.jsonl"))
+    writer = SceneWriter(author_agent=author_agent, transcriber=MagicMock(), metrics=metrics)
+
+    with patch("crewai.Task.execute_sync", return_value=MagicMock(raw="Some text")):
+        writer.generate_scene(chapter.scenes[0], act, chapter, idea, characters)
+
+    [record] = metrics.records
+    assert record["phase"] == "scene"
+    assert record["act"] == 1
+    assert record["chapter"] == "One"
+    assert record["bytes_written"] == len("Some text")
+    assert record["prompt_tokens_estimate"] > 0
@@ -1,6 +1,15 @@
 from ghost_writer.models import Scene, Act, Chapter, Book, Idea, Characters
+from ghost_writer.services.prompt_context import ScenePromptContext
+from ghost_writer.utils.token_utils import estimate_tokens
 
-def get_scene_task_prompt(scene: Scene, act: Act, chapter: Chapter, idea: Idea, characters: Characters) -> str:
+def get_scene_task_prompt(
+        scene: Scene,
+        act: Act,
+        chapter: Chapter,
+        idea: Idea,
+        characters: Characters,
+        prompt_context: ScenePromptContext = None,
+        continuity: str = None) -> str:
     """
     Generates a task prompt for writing a scene based on the provided scene, act, and chapter details.
     
@@ -8,18 +17,35 @@ def get_scene_task_prompt(scene: Scene, act: Act, chapter: Chapter, idea: Idea,
         scene (Scene): The scene object containing details about the scene.
         act (Act): The act object containing details about the act.
         chapter (Chapter): The chapter object containing details about the chapter.
+        prompt_context (ScenePromptContext): Optional compact context. When given, only the
+            characters in the scene are included and the context respects its token budget.
+        continuity (str): Optional summary of the scenes before this one in the act (see
+            ContinuityTracker).
     
     Returns:
         str: The generated task prompt.
     """
+    if prompt_context is None:
+        return _scene_task_prompt(scene, idea.model_dump_json(), characters.model_dump_json(), continuity)
+
+    base_tokens = estimate_tokens(_scene_task_prompt(scene, "", "", continuity))
+    idea_json, characters_json = prompt_context.for_scene(scene, base_tokens=base_tokens)
+    return _scene_task_prompt(scene, idea_json, characters_json, continuity)
+
+def _scene_task_prompt(scene: Scene, idea_json: str, characters_json: str, continuity: str = None) -> str:
+    # Without continuity the prompt stays exactly as before, so cached scenes remain valid
+    story_so_far = f"""
+
+        Story so far in this act (stay consistent with it, do not retell it):
+        {continuity}""" if continuity else ""
     return f"""
         Write the scene for the novel with the following plot elements and characters:
         Scene Plot: {scene.scene_plot}
         Scene Characters: {scene.characters}
         
-        Idea: {idea.model_dump_json()}
+        Idea: {idea_json}
         
-        Character Info: {characters.model_dump_json()}
+        Character Info: {characters_json}{story_so_far}
 
         Important:
         - Do not use any headings, just paragraphs.
@@ -0,0 +1,71 @@
+import json
+import time
+
+import pytest
+
+from ghost_writer.batch import BatchRunner, load_manifest
+
+def fake_book_worker(book, output_path, status, llm_limiter, image_limiter):
+    if book["id"] == "broken":
+        raise RuntimeError("no idea")
+    time.sleep(book["options"]["seconds"])
+    if llm_limiter is not None:
+        llm_limiter.acquire()
+    with open(f"{output_path}.done", "w") as done:
+        done.write(str(time.time()))
+
+def test_load_jsonl_manifest(tmp_path):
+    manifest = tmp_path / "books.jsonl"
+    manifest.write_text(
+        json.dumps({"idea": "i", "author": "a", "title": "The Same Title"}) + "\n\n"
+        + json.dumps({"idea": "i", "author": "a", "title": "The Same Title"}) + "\n")
+
+    books = load_manifest(str(manifest))
+
+    assert [book["id"] for book in books] == ["the_same_title", "the_same_title_2"]
+
+def test_load_yaml_manifest(tmp_path):
+    manifest = tmp_path / "books.yaml"
+    manifest.write_text(
+        "books:\n"
+        "  - id: first\n    idea: i\n    author: a\n    title: t\n    options:\n      disable_illustration: true\n")
+
+    [book] = load_manifest(str(manifest))
+
+    assert book["id"] == "first"
+    assert book["options"] == {"disable_illustration": True}
+
+def test_manifest_validation(tmp_path):
+    manifest = tmp_path / "books.jsonl"
+    manifest.write_text(json.dumps({"idea": "i", "title": "t"}) + "\n")
+    with pytest.raises(ValueError, match="author"):
+        load_manifest(str(manifest))
+
+    manifest.write_text(json.dumps({"idea": "i", "author": "a", "title": "t", "options": {"output_path": "/"}}) + "\n")
+    with pytest.raises(ValueError, match="output_path"):
+        load_manifest(str(manifest))
+
+def test_slow_book_does_not_hold_up_the_queue(tmp_path):
+    books = [
+        {"id": "slow", "title": "Slow", "options": {"seconds": 6}},
+        {"id": "fast_1", "title": "Fast 1", "options": {"seconds": 0}},
+        {"id": "fast_2", "title": "Fast 2", "options": {"seconds": 0}},
+        {"id": "broken", "title": "Broken", "options": {"seconds": 0}},
+    ]
+    runner = BatchRunner(
+        books,
+        output_root=str(tmp_path),
+        max_concurrent_books=2,
+        llm_requests_per_minute=600,
+        poll_interval=0.1,
+        worker=fake_book_worker)
+
+    status = runner.run()
+
+    assert {book_id: book["state"] for book_id, book in status.items()} == {
+        "slow": "done", "fast_1": "done", "fast_2": "done", "broken": "failed"}
+    assert "no idea" in status["broken"]["error"]
+    # Both fast books finished while the slow one was still running in the other slot
+    slow_done = float((tmp_path / "slow.done").read_text())
+    assert float((tmp_path / "fast_2.done").read_text()) < slow_done
+    assert json.loads((tmp_path / "status.json").read_text()) == status
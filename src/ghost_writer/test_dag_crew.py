@@ -0,0 +1,65 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from crewai import Agent, Process, Task
+from crewai.tasks.task_output import TaskOutput
+
+from ghost_writer.dag_crew import DagCrew, task_dependencies
+
+def make_agent(role):
+    return Agent(config={"role": role, "goal": "goal", "backstory": "backstory"}, verbose=False)
+
+@pytest.fixture
+def planning_tasks():
+    # Mirrors the shape of config/tasks.yaml
+    idea, characters, art, author, outline = (make_agent(r) for r in ["idea", "characters", "art", "author", "outline"])
+    ideation = Task(name="ideation", description="d", expected_output="o", agent=idea)
+    character = Task(name="character", description="d", expected_output="o", agent=characters, context=[ideation])
+    book = Task(name="book", description="d", expected_output="o", agent=author, context=[ideation])
+    vision = Task(name="vision", description="d", expected_output="o", agent=art, context=[ideation])
+    act = Task(name="act", description="d", expected_output="o", agent=outline, context=[ideation, character])
+    return [ideation, character, book, vision, act]
+
+def test_task_dependencies_follow_context(planning_tasks):
+    assert task_dependencies(planning_tasks) == [[], [0], [0], [0], [0, 1]]
+
+def test_task_dependencies_ignore_tasks_outside_the_schedule(planning_tasks):
+    # ideation was restored from a checkpoint and is not scheduled again
+    assert task_dependencies(planning_tasks[1:]) == [[], [], [], [0]]
+
+def test_independent_tasks_run_concurrently_and_callbacks_fire_in_order(planning_tasks):
+    fired = []
+    for task in planning_tasks:
+        task.callback = lambda output, name=task.name: fired.append(name)
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_execute(task, agent=None, context=None, tools=None):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        # Later declared tasks finish first
+        time.sleep({"character": 0.06, "book": 0.04, "vision": 0.02}.get(task.name, 0.01))
+        with lock:
+            active -= 1
+        return TaskOutput(name=task.name, description=task.description, raw=task.name, agent=agent.role)
+
+    crew = DagCrew(
+        agents=list({id(t.agent): t.agent for t in planning_tasks}.values()),
+        tasks=planning_tasks,
+        process=Process.sequential,
+        max_parallel_tasks=3)
+
+    with patch("crewai.Task.execute_sync", autospec=True, side_effect=fake_execute):
+        output = crew._execute_tasks(planning_tasks)
+
+    assert 1 < peak <= crew.max_parallel_tasks
+    assert fired == ["ideation", "character", "book", "vision", "act"]
+    assert output.raw == "act"
+    # Callbacks are restored after the run
+    assert all(task.callback is not None for task in planning_tasks)
@@ -0,0 +1,137 @@
+from unittest.mock import patch
+import json
+import re
+
+import pytest
+
+from ghost_writer.benchmarks.fakes import (
+    fake_text, synthetic_acts, synthetic_artistic_vision, synthetic_book, synthetic_characters, synthetic_idea)
+from ghost_writer.crew import GhostWriter
+from ghost_writer.models import Act, Plot, SubPlot, SubPlots
+from ghost_writer.replay import ReplayFixtures
+from ghost_writer.services.checkpoint_store import CheckpointStore
+
+def plot() -> Plot:
+    return Plot(description="d", rising_action="r", climax="c", falling_action="f", resolution="r")
+
+@pytest.fixture
+def recording(tmp_path):
+    """The output directory of a finished two-chapter-per-act run."""
+    path = tmp_path / "recording"
+    checkpoints = CheckpointStore(str(path))
+    acts = synthetic_acts(chapters=6, scenes_per_chapter=2)
+    outputs = {
+        "ideation_task": synthetic_idea(),
+        "character_development_task": synthetic_characters(),
+        "plot_development_task": plot(),
+        "sublots_development_task": SubPlots(subplots=[SubPlot(
+            **plot().model_dump(), connection_to_main_plot="m", connection_to_character_arc="a")]),
+        "book_development_task": synthetic_book(),
+        "artistic_vision_task": synthetic_artistic_vision(),
+        **{f"act{act.act_number}_development_task": act for act in acts},
+    }
+    for name, output in outputs.items():
+        checkpoints.save_task_output(name, output.model_dump_json())
+
+    chapter_number = 0
+    for act in acts:
+        for chapter in act.chapters:
+            chapter_number += 1
+            for scene_index, scene in enumerate(chapter.scenes):
+                checkpoints.save_scene(chapter_number, scene_index, f"Recorded {scene.scene_title}. " + fake_text(scene.scene_title, 30))
+    return path
+
+def test_scenes_are_found_by_outline_across_acts(recording):
+    fixtures = ReplayFixtures(recording)
+    act3 = CheckpointStore(str(recording)).load_task_output("act3_development_task")
+    last_scene = Act.model_validate_json(act3).chapters[-1].scenes[-1]
+
+    assert fixtures.scene_text(last_scene).startswith(f"Recorded {last_scene.scene_title}.")
+    with pytest.raises(FileNotFoundError):
+        fixtures.scene_text(last_scene.model_copy(update={"scene_plot": "a scene that was never written"}))
+
+def test_replay_writes_the_recorded_book_without_calling_the_llm(recording, tmp_path, monkeypatch):
+    # Offline: no telemetry export and no first-run tracing prompt
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    monkeypatch.setenv("CREWAI_TESTING", "true")
+    ghost_writer = GhostWriter()
+    ghost_writer.output_path = str(tmp_path / "replay")
+    ghost_writer.replay_from = str(recording)
+    ghost_writer.chapter_concurrency = 2
+    ghost_writer.pdf_image_profile = None
+
+    with patch("crewai.Task.execute_sync", side_effect=AssertionError("the LLM was called")):
+        ghost_writer.crew().kickoff(inputs={"idea": "idea", "author": "author", "title": "title"})
+
+    book = (tmp_path / "replay" / "book.md").read_text(encoding="utf-8")
+    assert synthetic_book().title in book
+    # Every recorded scene, in book order
+    assert re.findall(r"^Recorded Scene (\S+)\.", book, flags=re.M) == [
+        f"{chapter}.{scene}" for chapter in range(1, 7) for scene in (1, 2)]
+    assert "Chapter 6: Chapter 6" in book
+    assert (tmp_path / "replay" / "book.pdf").exists()
+    assert (tmp_path / "replay" / "ideation.json").exists()
+    progress = json.loads((tmp_path / "replay" / "progress.json").read_text(encoding="utf-8"))
+    assert progress["state"] == "done"
+    assert [progress[kind] for kind in ("scenes", "chapters", "images")] == [
+        {"completed": 12, "total": 12}, {"completed": 6, "total": 6}, {"completed": 8, "total": 8}]
+
+def test_a_failed_run_marks_the_progress_as_failed(recording, tmp_path, monkeypatch):
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    monkeypatch.setenv("CREWAI_TESTING", "true")
+    ghost_writer = GhostWriter()
+    ghost_writer.output_path = str(tmp_path / "replay")
+    ghost_writer.replay_from = str(recording)
+    ghost_writer.pdf_image_profile = None
+
+    with patch("ghost_writer.services.book_writer_service.BookWriterService.save_pdf", side_effect=RuntimeError("render failed")):
+        with pytest.raises(RuntimeError):
+            ghost_writer.kickoff(inputs={"idea": "idea", "author": "author", "title": "title"})
+
+    progress = json.loads((tmp_path / "replay" / "progress.json").read_text(encoding="utf-8"))
+    assert progress["state"] == "failed"
+
+def test_a_run_that_failed_in_the_last_act_resumes_without_running_any_task(recording, tmp_path, monkeypatch):
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    monkeypatch.setenv("CREWAI_TESTING", "true")
+    scene_text = ReplayFixtures.scene_text
+
+    def fail_at_scene_6_2(fixtures, scene):
+        if scene.scene_title == "Scene 6.2":
+            raise RuntimeError("connection reset")
+        return scene_text(fixtures, scene)
+
+    def replay_writer(resume):
+        ghost_writer = GhostWriter()
+        ghost_writer.output_path = str(tmp_path / "replay")
+        ghost_writer.replay_from = str(recording)
+        ghost_writer.resume = resume
+        ghost_writer.chapter_concurrency = 1
+        ghost_writer.pdf_image_profile = None
+        return ghost_writer
+
+    with patch.object(ReplayFixtures, "scene_text", fail_at_scene_6_2):
+        with pytest.raises(RuntimeError):
+            replay_writer(resume=False).kickoff(inputs={"idea": "idea", "author": "author", "title": "title"})
+    # Every task output, including the last act's outline, was checkpointed before the failure
+    checkpoints = CheckpointStore(str(tmp_path / "replay"))
+    assert checkpoints.load_task_output("act3_development_task") is not None
+
+    with patch("crewai.Task.execute_sync", side_effect=AssertionError("the LLM was called")):
+        output = replay_writer(resume=True).kickoff(inputs={"idea": "idea", "author": "author", "title": "title"})
+
+    assert output.pydantic.act_number == 3
+    book = (tmp_path / "replay" / "book.md").read_text(encoding="utf-8")
+    assert re.findall(r"^Recorded Scene (\S+)\.", book, flags=re.M) == [
+        f"{chapter}.{scene}" for chapter in range(1, 7) for scene in (1, 2)]
+    assert (tmp_path / "replay" / "book.pdf").exists()
+    progress = json.loads((tmp_path / "replay" / "progress.json").read_text(encoding="utf-8"))
+    assert progress["state"] == "done"
+
+def test_replay_refuses_to_replay_into_its_own_recording(recording):
+    ghost_writer = GhostWriter()
+    ghost_writer.output_path = str(recording)
+    ghost_writer.replay_from = str(recording)
+
+    with pytest.raises(ValueError):
+        ghost_writer.crew()
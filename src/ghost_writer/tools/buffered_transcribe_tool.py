@@ -0,0 +1,126 @@
+from pathlib import Path
+from typing import IO, List, Optional
+import os
+import shutil
+import threading
+
+from pydantic import PrivateAttr
+
+from ghost_writer.tools.transcribe_tool import TranscribeTool, retract_tail
+
+class BufferedTranscribeTool(TranscribeTool):
+    """
+    Drop-in replacement for TranscribeTool that keeps a single file handle open and buffers
+    appends in memory until buffer_size bytes are pending or flush() is called.
+
+    In atomic mode the content is streamed into '<filename>.partial' and only flushed content
+    is published to the target: each flush appends what was written since the previous one,
+    so publishing costs the size of the new content rather than a copy of the whole book.
+    These intermediate publishes are plain appends, so a crash during one can leave a torn
+    tail in the target; a resumed run truncates book.md to the checkpointed transcript_size,
+    which drops it. finalize() replaces the target with the partial file (write-then-rename).
+    """
+
+    name: str = "BufferedAppendTool"
+    description: str = "Appends content to a specified text file through a buffered handle."
+    buffer_size: int = 64 * 1024
+    atomic: bool = False
+
+    _handle: Optional[IO[str]] = PrivateAttr(default=None)
+    _buffer: List[str] = PrivateAttr(default_factory=list)
+    _buffered: int = PrivateAttr(default=0)
+    _unpublished: List[str] = PrivateAttr(default_factory=list)
+    _lock: threading.RLock = PrivateAttr(default_factory=threading.RLock)
+
+    def _run(self, content: str) -> str:
+        try:
+            self.write(content + '\n')
+            return f"Content appended to {self.filename}."
+        except Exception as e:
+            return f"Failed to append to {self.filename}: {e}"
+
+    def write(self, content: str):
+        with self._lock:
+            self._buffer.append(content)
+            self._buffered += len(content)
+            if self._buffered >= self.buffer_size:
+                self._write_buffer()
+
+    @property
+    def partial_path(self) -> Path:
+        return Path(f"{self.filename}.partial")
+
+    def flush(self, publish: bool = True):
+        """
+        Writes buffered content to disk. In atomic mode what was written since the last publish
+        is then appended to the target file, unless publish is False (e.g. mid-scene flushes of
+        a streamed scene only reach '<filename>.partial').
+        """
+        with self._lock:
+            self._write_buffer()
+            if self._handle is None:
+                return
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            if self.atomic and publish and self._unpublished:
+                with open(self.filename, 'a', encoding='utf-8') as published:
+                    published.write("".join(self._unpublished))
+                    published.flush()
+                    os.fsync(published.fileno())
+                self._unpublished.clear()
+
+    def retract(self, content: str):
+        """
+        Removes content that was the last thing written, whether it is still buffered or
+        already on disk. In atomic mode it must not have been published yet.
+        """
+        if not content:
+            return
+        with self._lock:
+            self._write_buffer()
+            if self._handle is None:
+                raise ValueError(f"{self.filename} does not end with the content to retract.")
+            self._handle.flush()
+            if self.atomic:
+                unpublished = "".join(self._unpublished)
+                if not unpublished.endswith(content):
+                    raise ValueError(f"{self.filename} already published the content to retract.")
+                self._unpublished = [unpublished[:len(unpublished) - len(content)]]
+            retract_tail(str(self.partial_path if self.atomic else self.filename), content)
+
+    def finalize(self):
+        """
+        Flushes and closes the handle. In atomic mode the partial file is renamed onto the target.
+        """
+        with self._lock:
+            self.flush()
+            if self._handle is None:
+                return
+            self._handle.close()
+            self._handle = None
+            if self.atomic:
+                os.replace(self.partial_path, self.filename)
+
+    def _write_buffer(self):
+        if not self._buffer:
+            return
+        if self._handle is None:
+            self._handle = self._open()
+        content = "".join(self._buffer)
+        self._handle.write(content)
+        if self.atomic:
+            self._unpublished.append(content)
+        self._buffer.clear()
+        self._buffered = 0
+
+    def _open(self) -> IO[str]:
+        Path(self.filename).parent.mkdir(parents=True, exist_ok=True)
+        if not self.atomic:
+            return open(self.filename, 'a', encoding='utf-8')
+
+        # Continue from the last published version of the target (e.g. on resume)
+        if Path(self.filename).exists():
+            shutil.copyfile(self.filename, self.partial_path)
+        else:
+            self.partial_path.unlink(missing_ok=True)
+        return open(self.partial_path, 'a', encoding='utf-8')
@@ -0,0 +1,260 @@
+from typing import Callable, Dict, List, Optional, Tuple, Type
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+import html
+import os
+import re
+import uuid
+import zipfile
+
+from ghost_writer.utils.markdown_utils import PAGE_BREAK, replace_image_references, split_markdown_sections
+
+IMAGE_MEDIA_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".gif": "image/gif", ".webp": "image/webp"}
+
+STYLESHEET = """body { font-family: serif; line-height: 1.5; margin: 0 5%; }
+h1, h2, h3, h4 { font-family: sans-serif; }
+img { display: block; max-width: 100%; height: auto; margin: 1em auto; }
+blockquote { font-style: italic; margin: 1.5em 2em; }
+nav.pages { display: flex; justify-content: space-between; margin: 2em 0; }
+"""
+
+CONTAINER_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>
+"""
+
+_HEADING = re.compile(r"^(#{1,6}) +(.+?)\s*$", re.M)
+
+def book_documents(content: str) -> List[Tuple[int, str, str]]:
+    """
+    Splits book markdown into the documents of an e-book: the title page, every level-2
+    section (preface, author's note, act title) and every chapter. Page breaks are dropped,
+    since every document starts on a new page anyway.
+
+    Returns:
+        List[Tuple[int, str, str]]: (heading level, title, markdown) per document; the title
+        page has level 1.
+    """
+    documents = []
+    for section in split_markdown_sections(content.replace(PAGE_BREAK, ""), level=2):
+        for document in split_markdown_sections(section, level=3):
+            if not document.strip():
+                continue
+            heading = _HEADING.search(document)
+            level = len(heading.group(1)) if heading and document.lstrip().startswith("#") else 1
+            title = heading.group(2) if heading else "Title Page"
+            documents.append((min(level, 3), title, document))
+    return documents
+
+@lru_cache(maxsize=1)
+def _markdown_renderer():
+    # markdown-it is only loaded once a book is actually exported
+    from markdown_it import MarkdownIt
+
+    return MarkdownIt("commonmark", {"xhtmlOut": True, "html": True})
+
+def render_markdown(content: str) -> str:
+    """Renders markdown to XHTML-compatible HTML (self-closed void tags)."""
+    return _markdown_renderer().render(content)
+
+def _image_names(documents: List[Tuple[int, str, str]], root: Path) -> Dict[str, str]:
+    # Every distinct image once, under a unique file name, however often it is referenced
+    names: Dict[str, str] = {}
+    used = set()
+    for _, _, document in documents:
+        def collect(image_path: str) -> str:
+            if image_path not in names and (root / image_path).exists():
+                name = Path(image_path).name
+                if name in used:
+                    name = f"{len(used):03}_{name}"
+                used.add(name)
+                names[image_path] = name
+            return image_path
+        replace_image_references(document, collect)
+    return names
+
+def _rewrite_images(document: str, rewrite: Callable[[str], Optional[str]]) -> str:
+    return replace_image_references(document, lambda image_path: rewrite(image_path) or image_path)
+
+class BookExportInput(BaseModel):
+    markdown_path: str = Field(..., description="Path to the input Markdown file.")
+    output_path: str = Field(..., description="Path of the e-book file or directory to write.")
+
+class MarkdownToEPUBTool(BaseTool):
+    name: str = "Markdown to EPUB Converter"
+    description: str = "Converts a Markdown book into an EPUB 3 e-book with one document per chapter."
+    args_schema: Type[BaseModel] = BookExportInput
+
+    language: str = "en"
+    author: Optional[str] = None
+
+    def _run(self, markdown_path: str, output_path: str) -> str:
+        md_path = Path(markdown_path).resolve()
+        if not md_path.exists():
+            return f"Markdown file not found: {md_path}"
+
+        out_path = Path(output_path).resolve()
+        documents = self.export(md_path.read_text(encoding="utf-8"), md_path.parent, out_path)
+        return f"EPUB successfully created at: {out_path} ({documents} document(s))"
+
+    def export(self, content: str, root, output_path, title: str = None, author: str = None) -> int:
+        """
+        Writes the markdown (with image paths relative to root) as an EPUB to output_path.
+        Documents are rendered and written into the archive one at a time; every image is
+        stored once and referenced from the documents that show it.
+
+        Returns:
+            int: The number of documents (title page, sections and chapters) in the book.
+        """
+        root = Path(root)
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        documents = book_documents(content)
+        images = _image_names(documents, root)
+        title = title or next((doc_title for level, doc_title, _ in documents if level == 1), "Book")
+        files = [(f"doc{index:03}", f"text/doc{index:03}.xhtml", level, doc_title) for index, (level, doc_title, _) in enumerate(documents, start=1)]
+
+        tmp_path = output_path.with_name(f"{output_path.name}.tmp")
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as epub:
+            # The mimetype comes first and uncompressed, as the EPUB container format requires
+            epub.writestr(zipfile.ZipInfo("mimetype"), "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+            epub.writestr("META-INF/container.xml", CONTAINER_XML)
+            epub.writestr("OEBPS/style.css", STYLESHEET)
+
+            for (_, href, _, doc_title), (_, _, document) in zip(files, documents):
+                body = render_markdown(_rewrite_images(document, lambda image_path: images.get(image_path) and f"../images/{images[image_path]}"))
+                epub.writestr(f"OEBPS/{href}", self._xhtml(doc_title, body, stylesheet="../style.css"))
+
+            for image_path, name in images.items():
+                # Images are compressed already
+                epub.write(root / image_path, f"OEBPS/images/{name}", compress_type=zipfile.ZIP_STORED)
+
+            epub.writestr("OEBPS/nav.xhtml", self._xhtml(title, self._nav(files), stylesheet="style.css", nav=True))
+            epub.writestr("OEBPS/content.opf", self._package(title, author or self.author, files, images))
+        os.replace(tmp_path, output_path)
+        return len(documents)
+
+    def _xhtml(self, title: str, body: str, stylesheet: str, nav: bool = False) -> str:
+        namespace = ' xmlns:epub="http://www.idpf.org/2007/ops"' if nav else ""
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE html>\n'
+            f'<html xmlns="http://www.w3.org/1999/xhtml"{namespace} xml:lang="{self.language}" lang="{self.language}">\n'
+            f'<head><meta charset="UTF-8"/><title>{html.escape(title)}</title>'
+            f'<link rel="stylesheet" type="text/css" href="{stylesheet}"/></head>\n'
+            f'<body>\n{body}</body>\n</html>\n')
+
+    @staticmethod
+    def _nav(files) -> str:
+        # Chapters are nested under the act (or section) before them
+        items, open_list = [], False
+        for _, href, level, title in files:
+            link = f'<a href="{href}">{html.escape(title)}</a>'
+            if level == 3 and items:
+                if not open_list:
+                    items[-1] = items[-1][:-len("</li>")] + "<ol>"
+                    open_list = True
+                items.append(f"<li>{link}</li>")
+                continue
+            if open_list:
+                items.append("</ol></li>")
+                open_list = False
+            items.append(f"<li>{link}</li>")
+        if open_list:
+            items.append("</ol></li>")
+        return '<nav epub:type="toc" id="toc"><h1>Contents</h1>\n<ol>\n' + "\n".join(items) + "\n</ol>\n</nav>\n"
+
+    def _package(self, title: str, author: Optional[str], files, images: Dict[str, str]) -> str:
+        cover = next(iter(images.values()), None)
+        manifest = [
+            '<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>',
+            '<item id="css" href="style.css" media-type="text/css"/>',
+            *(f'<item id="{item_id}" href="{href}" media-type="application/xhtml+xml"/>' for item_id, href, _, _ in files),
+            *(
+                f'<item id="img{index:03}" href="images/{name}" media-type="{IMAGE_MEDIA_TYPES.get(Path(name).suffix.lower(), "application/octet-stream")}"'
+                + (' properties="cover-image"' if name == cover else "") + "/>"
+                for index, name in enumerate(images.values(), start=1)
+            ),
+        ]
+        spine = [f'<itemref idref="{item_id}"/>' for item_id, _, _, _ in files]
+        creator = f"<dc:creator>{html.escape(author)}</dc:creator>" if author else ""
+        modified = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="book-id">\n'
+            '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">\n'
+            f'<dc:identifier id="book-id">urn:uuid:{uuid.uuid5(uuid.NAMESPACE_URL, title)}</dc:identifier>\n'
+            f"<dc:title>{html.escape(title)}</dc:title>{creator}\n"
+            f"<dc:language>{self.language}</dc:language>\n"
+            f'<meta property="dcterms:modified">{modified}</meta>\n'
+            "</metadata>\n<manifest>\n" + "\n".join(manifest) + "\n</manifest>\n"
+            "<spine>\n" + "\n".join(spine) + "\n</spine>\n</package>\n")
+
+class MarkdownToHTMLTool(BaseTool):
+    name: str = "Markdown to HTML Converter"
+    description: str = "Converts a Markdown book into a directory of HTML pages, one per chapter, with a contents page."
+    args_schema: Type[BaseModel] = BookExportInput
+
+    language: str = "en"
+
+    def _run(self, markdown_path: str, output_path: str) -> str:
+        md_path = Path(markdown_path).resolve()
+        if not md_path.exists():
+            return f"Markdown file not found: {md_path}"
+
+        out_path = Path(output_path).resolve()
+        documents = self.export(md_path.read_text(encoding="utf-8"), md_path.parent, out_path)
+        return f"HTML successfully created at: {out_path} ({documents} document(s))"
+
+    def export(self, content: str, root, output_path, title: str = None, author: str = None) -> int:
+        """
+        Writes the markdown (with image paths relative to root) as one HTML page per document
+        into the output_path directory, plus an index.html with the contents. Images are not
+        copied; the pages reference them where they are.
+
+        Returns:
+            int: The number of documents (title page, sections and chapters) written.
+        """
+        root = Path(root).resolve()
+        output_path = Path(output_path).resolve()
+        output_path.mkdir(parents=True, exist_ok=True)
+        documents = book_documents(content)
+        title = title or next((doc_title for level, doc_title, _ in documents if level == 1), "Book")
+        pages = [f"{index:03}.html" for index in range(1, len(documents) + 1)]
+
+        def reference(image_path: str) -> str:
+            return Path(os.path.relpath(root / image_path, output_path)).as_posix()
+
+        for index, ((_, doc_title, document), page) in enumerate(zip(documents, pages)):
+            links = [
+                f'<a href="{pages[index - 1]}">Previous</a>' if index > 0 else "<span></span>",
+                '<a href="index.html">Contents</a>',
+                f'<a href="{pages[index + 1]}">Next</a>' if index + 1 < len(pages) else "<span></span>",
+            ]
+            body = render_markdown(_rewrite_images(document, reference)) + f'<nav class="pages">{"".join(links)}</nav>\n'
+            (output_path / page).write_text(self._page(doc_title, body), encoding="utf-8")
+
+        byline = f'<p class="author">{html.escape(author)}</p>\n' if author else ""
+        contents = "".join(
+            f'<li class="level-{level}"><a href="{page}">{html.escape(doc_title)}</a></li>\n'
+            for (level, doc_title, _), page in zip(documents, pages))
+        (output_path / "index.html").write_text(
+            self._page(title, f"<h1>{html.escape(title)}</h1>\n{byline}<ol>\n{contents}</ol>\n"), encoding="utf-8")
+        (output_path / "style.css").write_text(STYLESHEET + "li.level-3 { margin-left: 2em; }\n", encoding="utf-8")
+
+        # Pages of a previous, longer export are not part of this book anymore
+        for stale in set(output_path.glob("[0-9][0-9][0-9].html")) - {output_path / page for page in pages}:
+            stale.unlink()
+        return len(documents)
+
+    def _page(self, title: str, body: str) -> str:
+        return (
+            f'<!DOCTYPE html>\n<html lang="{self.language}">\n'
+            f'<head><meta charset="UTF-8"/><title>{html.escape(title)}</title>'
+            '<link rel="stylesheet" href="style.css"/></head>\n'
+            f"<body>\n{body}</body>\n</html>\n")
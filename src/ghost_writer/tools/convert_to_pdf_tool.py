@@ -1,22 +1,13 @@
-from typing import Type
+from typing import Type, List, Optional
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
-from markdown_pdf import MarkdownPdf, Section
 from pathlib import Path
-from contextlib import contextmanager
+import hashlib
+import json
 import os
+import threading
 
-# Context manager for safe pushd/popd behavior
-@contextmanager
-def pushd(directory: Path):
-    prev_dir = Path.cwd()
-    os.chdir(directory)
-    print(f"Changed directory to: {directory}") 
-    try:
-        yield
-    finally:
-        os.chdir(prev_dir)
-        print(f"Returned to directory: {prev_dir}")
+from ghost_writer.utils.markdown_utils import image_references, split_markdown_sections
 
 class MarkdownToPDFInput(BaseModel):
     markdown_path: str = Field(..., description="Path to the input Markdown file.")
@@ -27,6 +18,11 @@ class MarkdownToPDFTool(BaseTool):
     description: str = "Converts a Markdown file into a PDF document."
     args_schema: Type[BaseModel] = MarkdownToPDFInput
 
+    # When enabled, each act / intro block is rendered into its own cached PDF and the
+    # book is assembled by concatenating them, so only changed sections are re-rendered.
+    incremental: bool = False
+    section_cache_dir: Optional[str] = None
+
     def _run(self, markdown_path: str, output_pdf_path: str) -> str:
         md_path = Path(markdown_path).resolve()
         out_path = Path(output_pdf_path).resolve()
@@ -37,15 +33,106 @@ class MarkdownToPDFTool(BaseTool):
         # Read the markdown content
         md_content = md_path.read_text(encoding="utf-8")
 
-        # Safely switch working directory for image resolution
-        with pushd(md_path.parent):
-            pdf = MarkdownPdf(toc_level=3)
-            pdf.add_section(Section(md_content))
-            pdf.meta["title"] = md_path.stem
+        # Create output directory if needed
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if self.incremental:
+            rendered = self._render_incremental(md_content, md_path, out_path)
+            return f"PDF successfully created at: {out_path} ({rendered} section(s) re-rendered)"
+
+        # markdown_pdf and pymupdf are only loaded once a PDF is actually rendered
+        from markdown_pdf import MarkdownPdf, Section
 
-            # Create output directory if needed
-            out_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            pdf.save(str(out_path))
+        # Images resolve against the markdown directory through the section root rather than
+        # the process-wide working directory, so renders can run alongside anything else
+        pdf = MarkdownPdf(toc_level=3)
+        pdf.add_section(Section(md_content, root=str(md_path.parent)))
+        pdf.meta["title"] = md_path.stem
+
+        pdf.save(str(out_path))
 
         return f"PDF successfully created at: {out_path}"
+
+    def _render_incremental(self, md_content: str, md_path: Path, out_path: Path) -> int:
+        """
+        Renders each section of the markdown into a cached PDF and concatenates them.
+
+        Returns:
+            int: The number of sections that had to be rendered (cache misses).
+        """
+        return self.render_sections(
+            split_markdown_sections(md_content, level=2), md_path.parent, out_path, title=md_path.stem)
+
+    def render_sections(self, sections: List[str], root: Path, output_pdf_path: Path, title: str = "book") -> int:
+        """
+        Renders already split sections (see split_markdown_sections) into cached PDFs and
+        concatenates them into output_pdf_path. Images resolve against root.
+
+        Returns:
+            int: The number of sections that had to be rendered (cache misses).
+        """
+        root = Path(root).resolve()
+        out_path = Path(output_pdf_path).resolve()
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_dir = Path(self.section_cache_dir or out_path.parent / ".pdf_sections").resolve()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        section_paths: List[Path] = []
+        rendered = 0
+        for section in sections:
+            section_path = cache_dir / f"{self._section_key(section, root)}.pdf"
+            if not section_path.exists() or not section_path.with_suffix(".toc.json").exists():
+                self._render_section(section, root, section_path)
+                rendered += 1
+            section_paths.append(section_path)
+
+        import pymupdf
+
+        book = pymupdf.open()
+        toc = []
+        for section_path in section_paths:
+            section_toc = json.loads(section_path.with_suffix(".toc.json").read_text(encoding="utf-8"))
+            with pymupdf.open(section_path) as section_pdf:
+                offset = book.page_count
+                book.insert_pdf(section_pdf)
+            toc.extend([level, heading, page + offset, top] for level, heading, page, top in section_toc)
+        book.set_toc(toc)
+        book.set_metadata({"title": title})
+        book.save(str(out_path))
+        book.close()
+
+        # Drop sections that are no longer part of the book so the cache does not grow unbounded
+        for stale in set(cache_dir.glob("*.pdf")) - set(section_paths):
+            stale.unlink()
+            stale.with_suffix(".toc.json").unlink(missing_ok=True)
+
+        return rendered
+
+    def _section_key(self, section: str, root: Path) -> str:
+        """
+        Hashes the section markdown together with the size and mtime of every image it references,
+        so regenerated images invalidate the cached section as well.
+        """
+        digest = hashlib.sha256(section.encode("utf-8"))
+        for image in image_references(section):
+            image_path = root / image
+            if image_path.exists():
+                stat = image_path.stat()
+                digest.update(f"{image}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _render_section(self, section: str, root: Path, section_path: Path):
+        from markdown_pdf import MarkdownPdf, Section
+
+        pdf = MarkdownPdf(toc_level=3)
+        pdf.add_section(Section(section, root=str(root)))
+
+        # A section may start below level 1 (e.g. an act), which is not a valid standalone
+        # outline, so the TOC entries are kept aside and applied to the assembled book instead.
+        toc = [list(entry) for entry in pdf.toc]
+        pdf.toc_level = 0
+
+        tmp_path = section_path.with_name(f"{section_path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        pdf.save(str(tmp_path))
+        section_path.with_suffix(".toc.json").write_text(json.dumps(toc), encoding="utf-8")
+        os.replace(tmp_path, section_path)
@@ -1,11 +1,12 @@
 from pathlib import Path
-import base64
-import openai
-import os
-from typing import Type
+from typing import Any, List, Optional, Tuple, Type
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+from ghost_writer.utils.content_cache import ContentCache
+from ghost_writer.utils.image_client import shared_image_client
+from ghost_writer.utils.metrics_recorder import NullMetricsRecorder
+
 class IllustratorToolInput(BaseModel):
     prompt: str = Field(..., description="Text prompt for image generation.")
 
@@ -13,22 +14,51 @@ class IllustratorTool(BaseTool):
     name: str = "GPT-4o Image Generator"
     description: str = "Generates an image using GPT-4o (DALL·E 3) based on a text prompt."
     args_schema: Type[BaseModel] = IllustratorToolInput
+    model: str = "gpt-image-1"
+    # Optional ContentCache; identical prompt/model/size requests are served from disk
+    cache: Optional[Any] = None
+    # Optional MetricsRecorder; every call is recorded under the "image" phase
+    metrics: Optional[Any] = None
+    # Optional ImageClient; defaults to the shared, pooled and rate limited client
+    client: Optional[Any] = None
+    # Failed images are listed here as (filename, error); raise_on_failure re-raises instead
+    # of returning the error message to the caller
+    failures: List[Tuple[str, str]] = Field(default_factory=list)
+    raise_on_failure: bool = False
 
     def _run(self, prompt: str, filename: str, size: str = "1024x1024") -> str:
-        try:
-            client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            response = client.images.generate(
-                model="gpt-image-1", 
-                prompt=prompt,
-                size=size,
-                n=1,
-            )
-            image_data = response.data[0].b64_json
-            # Ensure parent directory exists
-            out_path = Path(filename)
-            out_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(out_path, 'wb') as f:
-                f.write(base64.b64decode(image_data))
-            return f"Image generated and saved to {filename}."
-        except Exception as e:
-            return f"Failed to generate image: {e}"
+        metrics = self.metrics or NullMetricsRecorder()
+        with metrics.measure("image", image=Path(filename).name, model=self.model, size=size) as call:
+            try:
+                cache_key = ContentCache.make_key(kind="image", prompt=prompt, model=self.model, size=size) if self.cache else None
+                image_bytes = self.cache.get(cache_key) if cache_key else None
+                if image_bytes is not None:
+                    self._save(filename, image_bytes)
+                    call["cached"] = True
+                    call["bytes_written"] = len(image_bytes)
+                    return f"Image loaded from cache and saved to {filename}."
+
+                client = self.client or shared_image_client()
+                image = client.generate(prompt=prompt, model=self.model, size=size)
+                image_bytes = image.image_bytes
+                self._save(filename, image_bytes)
+                if cache_key:
+                    self.cache.put(cache_key, image_bytes)
+                call["prompt_tokens"] = image.prompt_tokens
+                call["completion_tokens"] = image.completion_tokens
+                call["retries"] = image.attempts - 1
+                call["bytes_written"] = len(image_bytes)
+                return f"Image generated and saved to {filename}."
+            except Exception as e:
+                call["error"] = str(e)
+                self.failures.append((filename, str(e)))
+                if self.raise_on_failure:
+                    raise
+                return f"Failed to generate image: {e}"
+
+    def _save(self, filename: str, image_bytes: bytes):
+        # Ensure parent directory exists
+        out_path = Path(filename)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(out_path, 'wb') as f:
+            f.write(image_bytes)
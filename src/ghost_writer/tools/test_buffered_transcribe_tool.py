@@ -0,0 +1,98 @@
+import pytest
+
+from ghost_writer.tools.buffered_transcribe_tool import BufferedTranscribeTool
+
+def test_content_is_buffered_until_flush(tmp_path):
+    book = tmp_path / "book.md"
+    tool = BufferedTranscribeTool(filename=str(book), buffer_size=1024)
+
+    tool.run(content="# Title")
+    tool.run(content="Some text")
+    assert not book.exists()
+
+    tool.flush()
+    assert book.read_text(encoding="utf-8") == "# Title\nSome text\n"
+    tool.finalize()
+
+def test_buffer_is_written_when_full(tmp_path):
+    book = tmp_path / "book.md"
+    tool = BufferedTranscribeTool(filename=str(book), buffer_size=8)
+
+    tool.run(content="0123456789")
+    tool.flush()
+
+    assert book.read_text(encoding="utf-8") == "0123456789\n"
+    tool.finalize()
+
+def test_atomic_mode_only_publishes_complete_snapshots(tmp_path):
+    book = tmp_path / "book.md"
+    tool = BufferedTranscribeTool(filename=str(book), buffer_size=1, atomic=True)
+
+    tool.run(content="Chapter 1")
+    tool.flush()
+    tool.run(content="Chapter 2 (in progress)")
+
+    # Content written after the last flush is not visible in book.md yet
+    assert book.read_text(encoding="utf-8") == "Chapter 1\n"
+
+    tool.flush()
+    # Only what was written since the previous flush is published
+    assert book.read_text(encoding="utf-8") == "Chapter 1\nChapter 2 (in progress)\n"
+    tool.run(content="Chapter 3")
+    tool.finalize()
+    assert book.read_text(encoding="utf-8") == "Chapter 1\nChapter 2 (in progress)\nChapter 3\n"
+    assert not tool.partial_path.exists()
+
+def test_atomic_mode_continues_existing_file(tmp_path):
+    book = tmp_path / "book.md"
+    book.write_text("Existing\n", encoding="utf-8")
+    tool = BufferedTranscribeTool(filename=str(book), atomic=True)
+
+    tool.run(content="More")
+    tool.finalize()
+
+    assert book.read_text(encoding="utf-8") == "Existing\nMore\n"
+
+def test_retract_removes_the_last_content_whether_buffered_or_written(tmp_path):
+    book = tmp_path / "book.md"
+    tool = BufferedTranscribeTool(filename=str(book), buffer_size=1024)
+
+    tool.write("Kept. ")
+    tool.write("Buffered.")
+    tool.retract("Buffered.")
+    tool.write("Written.")
+    tool.flush()
+    tool.retract("Written.")
+    tool.finalize()
+
+    assert book.read_text(encoding="utf-8") == "Kept. "
+
+def test_atomic_retract_only_touches_unpublished_content(tmp_path):
+    book = tmp_path / "book.md"
+    tool = BufferedTranscribeTool(filename=str(book), buffer_size=1, atomic=True)
+
+    tool.write("Chapter 1\n")
+    tool.flush()
+    tool.write("Draft")
+    tool.retract("Draft")
+    tool.write("Chapter 2\n")
+    tool.flush()
+
+    assert book.read_text(encoding="utf-8") == "Chapter 1\nChapter 2\n"
+    with pytest.raises(ValueError):
+        tool.retract("Chapter 2\n")
+    tool.finalize()
+    assert book.read_text(encoding="utf-8") == "Chapter 1\nChapter 2\n"
+
+def test_atomic_flush_without_publish_only_reaches_the_partial_file(tmp_path):
+    book = tmp_path / "book.md"
+    tool = BufferedTranscribeTool(filename=str(book), atomic=True)
+
+    tool.write("Half a scene\n")
+    tool.flush(publish=False)
+    assert not book.exists()
+    assert tool.partial_path.read_text(encoding="utf-8") == "Half a scene\n"
+
+    tool.flush()
+    assert book.read_text(encoding="utf-8") == "Half a scene\n"
+    tool.finalize()
@@ -0,0 +1,84 @@
+from pathlib import Path
+from xml.etree import ElementTree
+import zipfile
+
+from ghost_writer.tools.convert_to_epub_tool import MarkdownToEPUBTool, MarkdownToHTMLTool, book_documents
+from ghost_writer.utils.fake_image_server import synthetic_png
+from ghost_writer.utils.markdown_utils import add_page_break, header_markdown, image_markdown, quote_block_markdown
+
+XHTML = "{http://www.w3.org/1999/xhtml}"
+
+def write_book(path: Path) -> Path:
+    (path / "images").mkdir(parents=True)
+    for name in ("cover.png", "chapter_01.png"):
+        (path / "images" / name).write_bytes(synthetic_png(64, 64))
+
+    book = "".join(part + "\n" for part in [
+        image_markdown("images/cover.png", "Book Cover"),
+        header_markdown("The Shifting City", 1),
+        quote_block_markdown("Maps lie.", "A. Benchmark"),
+        add_page_break(),
+        header_markdown("Preface", 2),
+        "A preface.\n\n",
+        add_page_break(),
+        header_markdown("Act 1: Arrival", 2),
+        header_markdown("Chapter 1: Harbor", 3),
+        image_markdown("images/chapter_01.png", "Book Cover"),
+        header_markdown("Scene 1.1", 4),
+        "The tide came in.\n\n",
+        add_page_break(),
+        header_markdown("Chapter 2: Archive", 3),
+        # The cover again; it is stored once
+        image_markdown("images/cover.png", "Book Cover"),
+        "The archive was closed.\n\n",
+    ])
+    (path / "book.md").write_text(book, encoding="utf-8")
+    return path / "book.md"
+
+def test_the_book_splits_into_a_document_per_section_and_chapter(tmp_path):
+    documents = book_documents(write_book(tmp_path).read_text(encoding="utf-8"))
+
+    assert [(level, title) for level, title, _ in documents] == [
+        (1, "The Shifting City"), (2, "Preface"), (2, "Act 1: Arrival"), (3, "Chapter 1: Harbor"), (3, "Chapter 2: Archive")]
+    assert all("page-break" not in markdown for _, _, markdown in documents)
+
+def test_epub_has_one_xhtml_document_per_chapter_and_stores_images_once(tmp_path):
+    md_path = write_book(tmp_path)
+    result = MarkdownToEPUBTool(author="A. Benchmark").run(markdown_path=str(md_path), output_path=str(tmp_path / "book.epub"))
+    assert "(5 document(s))" in result
+
+    with zipfile.ZipFile(tmp_path / "book.epub") as epub:
+        first = epub.infolist()[0]
+        assert (first.filename, first.compress_type) == ("mimetype", zipfile.ZIP_STORED)
+        names = epub.namelist()
+        assert sorted(name for name in names if name.startswith("OEBPS/images/")) == [
+            "OEBPS/images/chapter_01.png", "OEBPS/images/cover.png"]
+        assert len([name for name in names if name.startswith("OEBPS/text/")]) == 5
+
+        # Every document is well-formed XHTML
+        for name in names:
+            if name.endswith((".xhtml", ".opf")):
+                ElementTree.fromstring(epub.read(name))
+        chapter = ElementTree.fromstring(epub.read("OEBPS/text/doc005.xhtml"))
+        assert [img.get("src") for img in chapter.iter(f"{XHTML}img")] == ["../images/cover.png"]
+
+        nav = ElementTree.fromstring(epub.read("OEBPS/nav.xhtml"))
+        act = [item for item in nav.iter(f"{XHTML}li") if item.find(f"{XHTML}a").text == "Act 1: Arrival"][0]
+        assert [a.text for a in act.find(f"{XHTML}ol").iter(f"{XHTML}a")] == ["Chapter 1: Harbor", "Chapter 2: Archive"]
+
+        package = epub.read("OEBPS/content.opf").decode("utf-8")
+        assert 'href="images/cover.png" media-type="image/png" properties="cover-image"' in package
+        assert "<dc:title>The Shifting City</dc:title><dc:creator>A. Benchmark</dc:creator>" in package
+
+def test_html_pages_reference_the_images_in_place(tmp_path):
+    md_path = write_book(tmp_path)
+
+    MarkdownToHTMLTool().run(markdown_path=str(md_path), output_path=str(tmp_path / "html"))
+
+    pages = sorted(path.name for path in (tmp_path / "html").glob("*.html"))
+    assert pages == ["001.html", "002.html", "003.html", "004.html", "005.html", "index.html"]
+    assert not list((tmp_path / "html").glob("*.png"))
+    chapter = (tmp_path / "html" / "004.html").read_text(encoding="utf-8")
+    assert '<img src="../images/chapter_01.png" alt="Book Cover" />' in chapter
+    assert 'href="003.html">Previous</a>' in chapter and 'href="005.html">Next</a>' in chapter
+    assert 'href="004.html">Chapter 1: Harbor</a>' in (tmp_path / "html" / "index.html").read_text(encoding="utf-8")
@@ -43,3 +43,49 @@ This is a test chapter.
     assert pdf_path.exists(), f"Expected PDF at {pdf_path}, but it wasn't created"
     assert "successfully" in result.lower()
     print(result)
+
+def test_incremental_render_only_rerenders_changed_sections(tmp_path):
+    # Arrange
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+    create_test_image(images_dir / "cover.png")
+
+    md_path = tmp_path / "book.md"
+    intro = "# Test Book Title\n\n![Cover](images/cover.png)\n\n"
+    act_one = "## Act 1: Beginnings\n\n### Chapter 1: Start\n\nFirst chapter.\n\n"
+    md_path.write_text(intro + act_one, encoding="utf-8")
+    pdf_path = tmp_path / "book.pdf"
+    tool = MarkdownToPDFTool(incremental=True)
+
+    # Act
+    first = tool.run(markdown_path=str(md_path), output_pdf_path=str(pdf_path))
+
+    act_two = "## Act 2: Middles\n\n### Chapter 2: Onward\n\nSecond chapter.\n\n"
+    md_path.write_text(intro + act_one + act_two, encoding="utf-8")
+    second = tool.run(markdown_path=str(md_path), output_pdf_path=str(pdf_path))
+
+    # Assert
+    assert "2 section(s) re-rendered" in first
+    assert "1 section(s) re-rendered" in second
+    assert pdf_path.exists()
+
+    import pymupdf
+    with pymupdf.open(pdf_path) as doc:
+        titles = [title for _, title, _ in doc.get_toc()]
+    assert titles == ["Test Book Title", "Act 1: Beginnings", "Chapter 1: Start", "Act 2: Middles", "Chapter 2: Onward"]
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_images_resolve_without_changing_directory(tmp_path, monkeypatch, incremental):
+    import os
+    import pymupdf
+
+    (tmp_path / "images").mkdir()
+    create_test_image(tmp_path / "images" / "cover.png")
+    md_path = tmp_path / "book.md"
+    md_path.write_text("# Title\n\n![Cover](images/cover.png)\n\n## Act 1\n\nText.\n", encoding="utf-8")
+    monkeypatch.setattr(os, "chdir", lambda path: pytest.fail("the working directory must not change"))
+
+    MarkdownToPDFTool(incremental=incremental).run(markdown_path=str(md_path), output_pdf_path=str(tmp_path / "book.pdf"))
+
+    with pymupdf.open(tmp_path / "book.pdf") as pdf:
+        assert len(pdf[0].get_images()) == 1
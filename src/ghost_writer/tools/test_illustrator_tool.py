@@ -6,6 +6,9 @@ from unittest.mock import patch, MagicMock
 import pytest
 
 from ghost_writer.tools.illustrator_tool import IllustratorTool
+from ghost_writer.utils.content_cache import ContentCache
+from ghost_writer.utils.fake_image_server import FakeImageServer, synthetic_png
+from ghost_writer.utils.image_client import ImageClient
 
 def test_image_is_written(tmp_path):
     # Prepare fake image data
@@ -16,12 +19,12 @@ def test_image_is_written(tmp_path):
     mock_response = MagicMock()
     mock_response.data = [MagicMock(b64_json=fake_b64)]
     
-    with patch("ghost_writer.tools.illustrator_tool.openai.OpenAI") as MockOpenAI:
+    with patch("openai.OpenAI") as MockOpenAI:
         MockOpenAI.return_value.images.generate.return_value = mock_response
         
         # Create a subfolder path for the output image
         output_file = tmp_path / "foo" / "bar.png"
-        tool = IllustratorTool()
+        tool = IllustratorTool(client=ImageClient())
         result = tool._run("draw a cat", filename=str(output_file))
         
         assert output_file.exists()
@@ -31,8 +34,48 @@ def test_image_is_written(tmp_path):
 
 def test_api_failure(tmp_path):
     # Patch OpenAI to throw
-    with patch("ghost_writer.tools.illustrator_tool.openai.OpenAI") as MockOpenAI:
+    with patch("openai.OpenAI") as MockOpenAI:
         MockOpenAI.return_value.images.generate.side_effect = Exception("fail!")
-        tool = IllustratorTool()
+        tool = IllustratorTool(client=ImageClient())
         result = tool._run("draw a cat", filename=str(tmp_path / "fail.png"))
         assert "Failed to generate image" in result
+        assert tool.failures == [(str(tmp_path / "fail.png"), "fail!")]
+
+def test_cached_image_skips_api(tmp_path):
+    fake_b64 = base64.b64encode(b"FAKE_IMAGE").decode()
+    mock_response = MagicMock()
+    mock_response.data = [MagicMock(b64_json=fake_b64)]
+    cache = ContentCache(cache_dir=str(tmp_path / "cache"))
+
+    with patch("openai.OpenAI") as MockOpenAI:
+        MockOpenAI.return_value.images.generate.return_value = mock_response
+        tool = IllustratorTool(cache=cache, client=ImageClient())
+        tool._run("draw a cat", filename=str(tmp_path / "first.png"))
+        result = tool._run("draw a cat", filename=str(tmp_path / "second.png"))
+
+        assert MockOpenAI.return_value.images.generate.call_count == 1
+        assert (tmp_path / "second.png").read_bytes() == b"FAKE_IMAGE"
+        assert "cache" in result
+
+def test_rate_limited_request_is_retried(tmp_path):
+    image = synthetic_png(8, 8)
+    with FakeImageServer(statuses=[429, 503], image_bytes=image) as server:
+        client = ImageClient(api_key="test", base_url=server.base_url, backoff_base=0)
+        tool = IllustratorTool(client=client)
+        result = tool._run("draw a cat", filename=str(tmp_path / "cat.png"))
+        client.close()
+
+    assert "Image generated and saved" in result
+    assert (tmp_path / "cat.png").read_bytes() == image
+    assert len(server.requests) == 3
+    assert tool.failures == []
+
+def test_raise_on_failure(tmp_path):
+    with FakeImageServer(statuses=[400]) as server:
+        tool = IllustratorTool(client=ImageClient(api_key="test", base_url=server.base_url), raise_on_failure=True)
+        with pytest.raises(Exception):
+            tool._run("draw a cat", filename=str(tmp_path / "cat.png"))
+
+    # Client errors are not retried
+    assert len(server.requests) == 1
+    assert len(tool.failures) == 1
@@ -1,4 +1,6 @@
+from pathlib import Path
 from typing import Type
+import os
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
@@ -18,3 +20,29 @@ class TranscribeTool(BaseTool):
             return f"Content appended to {self.filename}."
         except Exception as e:
             return f"Failed to append to {self.filename}: {e}"
+
+    def write(self, content: str):
+        """
+        Appends content as is (no trailing newline), e.g. a chunk of a streamed scene.
+        """
+        with open(self.filename, 'a', encoding='utf-8') as file:
+            file.write(content)
+
+    def retract(self, content: str):
+        """
+        Removes content that was the last thing written, e.g. a streamed scene the agent then
+        replaced with a different answer.
+        """
+        retract_tail(self.filename, content)
+
+def retract_tail(path: str, content: str):
+    """Truncates the file at path by content, which it must end with."""
+    data = content.encode('utf-8')
+    if not data:
+        return
+    with open(Path(path), 'r+b') as file:
+        size = file.seek(0, os.SEEK_END)
+        file.seek(max(size - len(data), 0))
+        if file.read() != data:
+            raise ValueError(f"{path} does not end with the content to retract.")
+        file.truncate(size - len(data))
@@ -0,0 +1,123 @@
+from pathlib import Path
+from typing import Optional
+import hashlib
+import json
+import os
+import threading
+import time
+
+class ContentCache:
+    """
+    Persistent, content-addressed cache for generated artifacts (scene text, images).
+
+    Entries are keyed by a hash of everything that influences the generation (prompt, model,
+    agent config, size, ...) so byte-identical requests are served from disk across runs.
+    Entries are evicted when they are older than max_age_seconds (since last use) or, least
+    recently used first, when the cache grows beyond max_bytes.
+
+    The directory is scanned once when the cache is opened; after that the total size is
+    tracked as entries are written, and the directory is only rescanned when a write takes the
+    cache over max_bytes.
+    """
+
+    def __init__(self, cache_dir: str = ".cache/ghost_writer", max_bytes: Optional[int] = None, max_age_seconds: Optional[float] = None):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+        self.evict()
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        """
+        Builds a cache key from the inputs of a generation.
+
+        Args:
+            **parts: Everything that influences the output, e.g. prompt, model and size.
+
+        Returns:
+            str: A hex digest that is stable across runs.
+        """
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if self._is_expired(stat.st_mtime):
+                path.unlink(missing_ok=True)
+                self._grow(-stat.st_size)
+                return None
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        # Refresh the timestamp so eviction is least-recently-used
+        os.utime(path)
+        return data
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        self._grow(len(data) - replaced)
+
+        with self._lock:
+            over_budget = self.max_bytes is not None and (self._size is None or self._size > self.max_bytes)
+        if over_budget:
+            self.evict()
+
+    def get_text(self, key: str) -> Optional[str]:
+        data = self.get(key)
+        return data.decode("utf-8") if data is not None else None
+
+    def put_text(self, key: str, text: str):
+        self.put(key, text.encode("utf-8"))
+
+    def evict(self):
+        if self.max_bytes is None and self.max_age_seconds is None:
+            return
+
+        entries = []
+        for path in self.cache_dir.glob("*/*"):
+            if path.name.endswith(".tmp"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if self._is_expired(stat.st_mtime):
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if self.max_bytes is not None:
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+        with self._lock:
+            self._size = total
+
+    def _grow(self, delta: int):
+        with self._lock:
+            if self._size is not None:
+                self._size += delta
+
+    def _is_expired(self, mtime: float) -> bool:
+        return self.max_age_seconds is not None and time.time() - mtime > self.max_age_seconds
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
@@ -0,0 +1,19 @@
+def event_bus():
+    """
+    Returns crewAI's event bus. Newer crewAI releases moved the events from
+    crewai.utilities.events to crewai.events; both layouts are supported, and the import is
+    deferred so that importing ghost_writer does not depend on either.
+    """
+    try:
+        from crewai.events import crewai_event_bus
+    except ImportError:
+        from crewai.utilities.events import crewai_event_bus
+    return crewai_event_bus
+
+def llm_event(name: str):
+    """Returns the crewAI LLM event class with the given name, e.g. "LLMStreamChunkEvent"."""
+    try:
+        from crewai.events.types import llm_events
+    except ImportError:
+        from crewai.utilities.events import llm_events
+    return getattr(llm_events, name)
@@ -0,0 +1,107 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+import base64
+import json
+import struct
+import threading
+import zlib
+
+def synthetic_png(width: int = 64, height: int = 64, color=(200, 120, 40)) -> bytes:
+    """
+    Builds a valid solid-colour RGB PNG without any imaging library.
+    """
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    row = b"\x00" + bytes(color) * width
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * height))
+        + chunk(b"IEND", b""))
+
+class FakeImageServer:
+    """
+    Local stand-in for the OpenAI images endpoint (POST /v1/images/generations). It also
+    answers POST /v1/embeddings with small deterministic vectors, for the memory embedder.
+
+    Every request pops the next status code from statuses (200 once they run out); error
+    responses carry a Retry-After of retry_after seconds. Use base_url as the client's base URL:
+
+        with FakeImageServer(statuses=[429, 200]) as server:
+            client = ImageClient(api_key="test", base_url=server.base_url)
+    """
+
+    def __init__(self, statuses: Optional[List[int]] = None, image_bytes: bytes = None, retry_after: float = 0):
+        self.statuses = list(statuses or [])
+        self.image_bytes = image_bytes or synthetic_png()
+        self.retry_after = retry_after
+        self.requests: List[dict] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "FakeImageServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next_status(self, request: dict) -> int:
+        with self._lock:
+            self.requests.append(request)
+            return self.statuses.pop(0) if self.statuses else 200
+
+    @staticmethod
+    def _embeddings(request: dict) -> dict:
+        texts = request["input"] if isinstance(request["input"], list) else [request["input"]]
+        vectors = [[float(len(text)), float(len(text.split())), 1.0] for text in texts]
+        if request.get("encoding_format") == "base64":
+            vectors = [base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode() for vector in vectors]
+        return {
+            "object": "list",
+            "model": request.get("model", ""),
+            "data": [{"object": "embedding", "index": index, "embedding": vector} for index, vector in enumerate(vectors)],
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("content-length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                status = server._next_status(request)
+                if status == 200 and self.path.endswith("/embeddings"):
+                    body = server._embeddings(request)
+                elif status == 200:
+                    body = {
+                        "created": 0,
+                        "data": [{"b64_json": base64.b64encode(server.image_bytes).decode()}],
+                        "usage": {"input_tokens": len(request.get("prompt", "").split()), "output_tokens": 1056,
+                                  "total_tokens": 0, "input_tokens_details": {"text_tokens": 0, "image_tokens": 0}},
+                    }
+                else:
+                    body = {"error": {"message": f"fake error {status}", "type": "fake", "code": None, "param": None}}
+
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(payload)))
+                if status != 200:
+                    self.send_header("retry-after", str(server.retry_after))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+import base64
+import os
+import random
+import threading
+import time
+
+# Status codes worth retrying: rate limits and transient server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Thread-safe token bucket; acquire() blocks until a request may be sent so that no more than
+    rate_per_minute requests start per minute, with bursts of up to capacity requests.
+    """
+
+    def __init__(
+            self,
+            rate_per_minute: float,
+            capacity: Optional[int] = None,
+            clock: Callable[[], float] = time.monotonic,
+            sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity or max(int(rate_per_minute // 60), 1)
+        self.tokens = float(self.capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self._clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self._sleep(wait)
+
+@dataclass
+class GeneratedImage:
+    image_bytes: bytes
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    attempts: int = 1
+
+class ImageClient:
+    """
+    Long-lived wrapper around one openai.OpenAI client, shared by every IllustratorTool so that
+    images reuse a pooled HTTP connection instead of opening a new one per request.
+
+    Requests are throttled by an optional TokenBucket and retried on 429 and 5xx responses (and
+    connection errors) with exponential backoff and jitter, honouring Retry-After when the API
+    sends one. Other errors, and the last error once max_retries is exhausted, are raised.
+    base_url points the client at another endpoint, e.g. a FakeImageServer in tests.
+    """
+
+    def __init__(
+            self,
+            api_key: Optional[str] = None,
+            base_url: Optional[str] = None,
+            requests_per_minute: Optional[float] = None,
+            max_retries: int = 5,
+            backoff_base: float = 1.0,
+            backoff_max: float = 60.0,
+            max_connections: int = 8,
+            timeout: float = 300.0,
+            client: Any = None,
+            sleep: Callable[[float], None] = time.sleep):
+        if client is None:
+            # openai takes a second or two to import, so it is only loaded once a client is needed
+            import httpx
+            import openai
+            client = openai.OpenAI(
+                api_key=api_key or os.getenv("OPENAI_API_KEY"),
+                base_url=base_url,
+                # Retries are handled here so they can be rate limited and counted
+                max_retries=0,
+                timeout=timeout,
+                http_client=openai.DefaultHttpxClient(
+                    limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)))
+        self.client = client
+        self.rate_limiter = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+
+    def generate(self, prompt: str, model: str, size: str) -> GeneratedImage:
+        """
+        Generates one image and returns its decoded bytes together with the token usage and the
+        number of attempts it took.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                response = self.client.images.generate(model=model, prompt=prompt, size=size, n=1)
+            except Exception as e:
+                if attempt > self.max_retries or not self.is_retryable(e):
+                    raise
+                self._sleep(self._backoff(attempt, e))
+                continue
+
+            usage = getattr(response, "usage", None)
+            return GeneratedImage(
+                image_bytes=base64.b64decode(response.data[0].b64_json),
+                prompt_tokens=self._usage_tokens(usage, "input_tokens"),
+                completion_tokens=self._usage_tokens(usage, "output_tokens"),
+                attempts=attempt)
+
+    def close(self):
+        self.client.close()
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        import openai
+
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error, (openai.APIConnectionError, openai.APITimeoutError))
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        delay = min(self.backoff_base * 2 ** (attempt - 1), self.backoff_max)
+        # Jitter spreads out retries of requests that were throttled together
+        return random.uniform(delay / 2, delay)
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        response = getattr(error, "response", None)
+        value = response.headers.get("retry-after") if response is not None else None
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _usage_tokens(usage, field: str) -> int:
+        # Only gpt-image models report usage; other models leave it empty. SDKs that predate the
+        # typed usage field keep it as the raw dict from the response.
+        tokens = usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)
+        return tokens if isinstance(tokens, int) else 0
+
+_shared_client: Optional[ImageClient] = None
+_shared_client_lock = threading.Lock()
+_shared_rate_limiter = None
+
+def share_rate_limiter(rate_limiter):
+    """
+    Throttles the shared client with an externally owned limiter (anything with acquire()),
+    e.g. one bucket shared by every book of a batch run.
+    """
+    global _shared_rate_limiter
+    with _shared_client_lock:
+        _shared_rate_limiter = rate_limiter
+        if _shared_client is not None:
+            _shared_client.rate_limiter = rate_limiter
+
+def shared_image_client() -> ImageClient:
+    """
+    Returns the process-wide ImageClient, creating it on first use. OPENAI_BASE_URL and
+    GHOST_WRITER_IMAGES_PER_MINUTE configure the endpoint and the rate limit.
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            requests_per_minute = os.getenv("GHOST_WRITER_IMAGES_PER_MINUTE")
+            _shared_client = ImageClient(
+                base_url=os.getenv("OPENAI_BASE_URL"),
+                requests_per_minute=float(requests_per_minute) if requests_per_minute else None)
+            if _shared_rate_limiter is not None:
+                _shared_client.rate_limiter = _shared_rate_limiter
+        return _shared_client
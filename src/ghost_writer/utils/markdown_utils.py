@@ -1,4 +1,6 @@
 from pathlib import Path
+from typing import Callable, List
+import re
 
 PAGE_BREAK = "<div style=\"page-break-after: always;\"></div>\n\n"
 
@@ -82,4 +84,60 @@ def quote_block_markdown(text: str, author: str) -> str:
     quoted_paragraphs = "\n\n".join(f"> {p.replace('\n', '\n> ')}" for p in paragraphs)
 
     # Append author attribution
-    return f"{quoted_paragraphs}\n>\n> — *{author}*"
\ No newline at end of file
+    return f"{quoted_paragraphs}\n>\n> — *{author}*"
+
+IMAGE_REFERENCE_PATTERN = re.compile(r"!\[[^\]]*\]\(([^)\s]+)\)")
+
+def image_references(content: str) -> List[str]:
+    """
+    Returns the paths of all markdown image tags in the content.
+
+    Args:
+        content (str): The markdown text to scan.
+
+    Returns:
+        List[str]: Image paths in the order they appear.
+    """
+    return IMAGE_REFERENCE_PATTERN.findall(content)
+
+def replace_image_references(content: str, replace: Callable[[str], str]) -> str:
+    """
+    Rewrites the path of every markdown image tag in the content.
+
+    Args:
+        content (str): The markdown text to rewrite.
+        replace (Callable[[str], str]): Maps an image path to the path to use instead.
+
+    Returns:
+        str: The content with the image paths replaced.
+    """
+    def rewrite(match: re.Match) -> str:
+        start, end = match.span(1)
+        return match.group(0)[:start - match.start()] + replace(match.group(1)) + match.group(0)[end - match.start():]
+    return IMAGE_REFERENCE_PATTERN.sub(rewrite, content)
+
+def split_markdown_sections(content: str, level: int = 2) -> List[str]:
+    """
+    Splits markdown content into sections that each start with a header of the given level.
+
+    Any content before the first header of that level (e.g. the title page) becomes its own
+    section. Whitespace-only sections are dropped.
+
+    Args:
+        content (str): The markdown text to split.
+        level (int): Header level that starts a new section.
+
+    Returns:
+        List[str]: The non-empty sections in document order.
+    """
+    prefix = f"{'#' * level} "
+    sections = []
+    current = []
+    for line in content.splitlines(keepends=True):
+        if line.startswith(prefix) and current:
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return [section for section in sections if section.strip()]
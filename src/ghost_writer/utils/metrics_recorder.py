@@ -0,0 +1,131 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+import json
+import threading
+import time
+
+# Numeric fields that are summed in the end-of-run summary
+SUMMED_FIELDS = ["wall_time", "prompt_tokens", "completion_tokens", "llm_calls", "retries", "bytes_written", "embedding_calls"]
+
+def agent_usage(agent) -> Dict[str, int]:
+    """
+    Returns a snapshot of the cumulative token usage of a crewAI agent.
+
+    Agents only expose running totals, so per-call usage is the difference between two
+    snapshots taken around the call (valid as long as the agent runs one task at a time).
+    """
+    process = getattr(agent, "_token_process", None)
+    return {
+        "prompt_tokens": getattr(process, "prompt_tokens", 0),
+        "completion_tokens": getattr(process, "completion_tokens", 0),
+        "requests": getattr(process, "successful_requests", 0),
+    }
+
+def usage_delta(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+    """
+    Converts two agent_usage snapshots into the metrics of the call between them.
+
+    A task can take several LLM round-trips (tool use, ReAct steps), so llm_calls counts them
+    all; they are not retries.
+    """
+    return {
+        "prompt_tokens": after["prompt_tokens"] - before["prompt_tokens"],
+        "completion_tokens": after["completion_tokens"] - before["completion_tokens"],
+        "llm_calls": after["requests"] - before["requests"],
+    }
+
+class MetricsRecorder:
+    """
+    Records structured per-call metrics (wall time, tokens, LLM calls, image retries, bytes
+    written, model) for crew tasks, scene generations and image generations.
+
+    Every call is appended as one JSON line to trace_path; summary() aggregates the records
+    by phase, act and chapter at the end of the run.
+    """
+
+    def __init__(self, trace_path: str = "output/trace.jsonl"):
+        self.trace_path = Path(trace_path)
+        self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, phase: str, **fields):
+        record = {"timestamp": time.time(), "phase": phase, **fields}
+        with self._lock:
+            self.records.append(record)
+            with open(self.trace_path, "a", encoding="utf-8") as trace:
+                trace.write(json.dumps(record, default=str) + "\n")
+
+    @contextmanager
+    def measure(self, phase: str, **fields) -> Iterator[Dict[str, Any]]:
+        """
+        Times the enclosed block and records it. The yielded dict can be filled with further
+        fields (tokens, bytes written, ...) from inside the block.
+        """
+        metrics = dict(fields)
+        start = time.perf_counter()
+        try:
+            yield metrics
+        except Exception as e:
+            metrics["error"] = str(e)
+            raise
+        finally:
+            metrics["wall_time"] = round(time.perf_counter() - start, 4)
+            self.record(phase, **metrics)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Aggregates the records by phase, by act and by chapter.
+
+        Returns:
+            dict: {"phase": {...}, "act": {...}, "chapter": {...}} where each group maps a key
+            to the call count and the sums of the numeric fields.
+        """
+        groups = {"phase": defaultdict(self._empty_totals), "act": defaultdict(self._empty_totals), "chapter": defaultdict(self._empty_totals)}
+        with self._lock:
+            records = list(self.records)
+
+        for record in records:
+            keys = {"phase": record["phase"]}
+            if record.get("act") is not None:
+                keys["act"] = f"Act {record['act']}"
+                if record.get("chapter") is not None:
+                    keys["chapter"] = f"Act {record['act']} / {record['chapter']}"
+            for group, key in keys.items():
+                totals = groups[group][key]
+                totals["calls"] += 1
+                for field in SUMMED_FIELDS:
+                    totals[field] += record.get(field) or 0
+
+        return {group: dict(values) for group, values in groups.items()}
+
+    def write_summary(self, path: str = None) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Writes the summary as JSON (next to the trace by default) and prints the per-phase totals.
+        """
+        summary = self.summary()
+        summary_path = Path(path) if path else self.trace_path.with_name("trace_summary.json")
+        summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+        for phase, totals in summary["phase"].items():
+            print(
+                f"{phase}: {totals['calls']} call(s), {totals['wall_time']:.1f}s, "
+                f"{totals['prompt_tokens']} prompt / {totals['completion_tokens']} completion tokens, "
+                f"{totals['llm_calls']} LLM call(s), {totals['retries']} retries, {totals['bytes_written']} bytes")
+        return summary
+
+    @staticmethod
+    def _empty_totals() -> Dict[str, float]:
+        return {"calls": 0, **{field: 0 for field in SUMMED_FIELDS}}
+
+class NullMetricsRecorder:
+    """Metrics recorder that discards everything; used when no trace is requested."""
+
+    def record(self, phase: str, **fields):
+        pass
+
+    @contextmanager
+    def measure(self, phase: str, **fields) -> Iterator[Dict[str, Any]]:
+        yield dict(fields)
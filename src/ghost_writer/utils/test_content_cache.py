@@ -0,0 +1,64 @@
+from unittest.mock import patch
+import os
+import time
+
+from ghost_writer.utils.content_cache import ContentCache
+
+def test_make_key_is_stable_and_order_independent():
+    a = ContentCache.make_key(prompt="p", model="m", size="1024x1024")
+    b = ContentCache.make_key(size="1024x1024", model="m", prompt="p")
+    c = ContentCache.make_key(prompt="p", model="m", size="1024x1536")
+    assert a == b
+    assert a != c
+
+def test_put_and_get_round_trip(tmp_path):
+    cache = ContentCache(cache_dir=str(tmp_path))
+    key = ContentCache.make_key(prompt="hello")
+
+    assert cache.get(key) is None
+    cache.put_text(key, "world")
+
+    assert cache.get_text(key) == "world"
+    # A fresh instance over the same directory sees the entry (persistence across runs)
+    assert ContentCache(cache_dir=str(tmp_path)).get_text(key) == "world"
+
+def test_age_based_eviction(tmp_path):
+    cache = ContentCache(cache_dir=str(tmp_path), max_age_seconds=60)
+    key = ContentCache.make_key(prompt="old")
+    cache.put(key, b"data")
+    old = time.time() - 120
+    os.utime(cache._path(key), (old, old))
+
+    assert cache.get(key) is None
+    assert not cache._path(key).exists()
+
+def test_size_based_eviction_removes_least_recently_used(tmp_path):
+    cache = ContentCache(cache_dir=str(tmp_path), max_bytes=10)
+    first = ContentCache.make_key(prompt="first")
+    second = ContentCache.make_key(prompt="second")
+    third = ContentCache.make_key(prompt="third")
+
+    cache.put(first, b"12345")
+    os.utime(cache._path(first), (time.time() - 30, time.time() - 30))
+    cache.put(second, b"12345")
+    os.utime(cache._path(second), (time.time() - 20, time.time() - 20))
+    cache.get(first)  # first becomes the most recently used
+    cache.put(third, b"12345")
+
+    assert cache.get(second) is None
+    assert cache.get(first) == b"12345"
+    assert cache.get(third) == b"12345"
+
+def test_writes_within_budget_do_not_rescan_the_cache(tmp_path):
+    ContentCache(cache_dir=str(tmp_path)).put(ContentCache.make_key(prompt="earlier run"), b"12345")
+    # The entries of earlier runs are counted when the cache is opened
+    cache = ContentCache(cache_dir=str(tmp_path), max_bytes=10)
+
+    with patch.object(ContentCache, "evict", wraps=cache.evict) as evict:
+        cache.put(ContentCache.make_key(prompt="first"), b"12345")
+        cache.put(ContentCache.make_key(prompt="first"), b"12345")
+        assert not evict.called
+
+        cache.put(ContentCache.make_key(prompt="second"), b"12345")
+        assert evict.call_count == 1
+    assert sum(1 for _ in tmp_path.glob("*/*")) == 2
@@ -0,0 +1,6 @@
+from ghost_writer.utils.crewai_events import event_bus, llm_event
+
+def test_events_resolve_in_the_installed_crewai():
+    assert callable(event_bus().register_handler)
+    assert llm_event("LLMStreamChunkEvent").__name__ == "LLMStreamChunkEvent"
+    assert llm_event("LLMCallStartedEvent").__name__ == "LLMCallStartedEvent"
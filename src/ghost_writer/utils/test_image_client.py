@@ -0,0 +1,50 @@
+import openai
+import pytest
+
+from ghost_writer.utils.fake_image_server import FakeImageServer, synthetic_png
+from ghost_writer.utils.image_client import ImageClient, TokenBucket
+
+def test_retries_until_success_and_counts_attempts():
+    image = synthetic_png(4, 4)
+    delays = []
+    with FakeImageServer(statuses=[429, 500, 502], image_bytes=image, retry_after=0.25) as server:
+        client = ImageClient(api_key="test", base_url=server.base_url, sleep=delays.append)
+        generated = client.generate(prompt="a red fox", model="gpt-image-1", size="1024x1024")
+
+    assert generated.image_bytes == image
+    assert generated.attempts == 4
+    # The fake server reports one input token per prompt word, typed or as a raw dict depending on the SDK
+    assert generated.prompt_tokens == 3
+    # Retry-After is honoured
+    assert delays == [0.25, 0.25, 0.25]
+
+def test_gives_up_after_max_retries():
+    with FakeImageServer(statuses=[429] * 10) as server:
+        client = ImageClient(api_key="test", base_url=server.base_url, max_retries=2, sleep=lambda _: None)
+        with pytest.raises(openai.RateLimitError):
+            client.generate(prompt="a red fox", model="gpt-image-1", size="1024x1024")
+
+    assert len(server.requests) == 3
+
+def test_backoff_is_exponential_with_jitter():
+    client = ImageClient(api_key="test", backoff_base=1, backoff_max=8)
+    error = Exception("connection reset")
+
+    assert 0.5 <= client._backoff(1, error) <= 1
+    assert 2 <= client._backoff(3, error) <= 4
+    assert 4 <= client._backoff(10, error) <= 8
+
+def test_token_bucket_throttles_bursts():
+    now = [0.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate_per_minute=60, capacity=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        bucket.acquire()
+
+    # Two requests pass immediately, the next two wait one second each
+    assert sum(slept) == pytest.approx(2.0)
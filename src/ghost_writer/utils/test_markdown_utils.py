@@ -62,3 +62,22 @@ def test_quote_block_markdown():
     # Check author attribution
     assert result.strip().endswith(f"> — *{author}*")
 
+
+def test_image_references():
+    content = "# Title\n\n![Cover](images/cover.png)\n\nText\n\n![](images/chapter_01.png)\n"
+    assert md_utils.image_references(content) == ["images/cover.png", "images/chapter_01.png"]
+
+def test_split_markdown_sections():
+    content = "# Title\n\nIntro\n\n## Act 1\n\n### Chapter 1\n\nText\n\n## Act 2\n\nMore\n"
+
+    sections = md_utils.split_markdown_sections(content, level=2)
+
+    assert len(sections) == 3
+    assert sections[0].startswith("# Title")
+    assert sections[1].startswith("## Act 1")
+    assert "### Chapter 1" in sections[1]
+    assert sections[2].startswith("## Act 2")
+
+def test_replace_image_references():
+    content = "Text ![Cover](images/a.png) and ![](images/b.png)"
+    assert md_utils.replace_image_references(content, lambda path: path.upper()) == "Text ![Cover](IMAGES/A.PNG) and ![](IMAGES/B.PNG)"
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from ghost_writer.utils.metrics_recorder import MetricsRecorder, NullMetricsRecorder, usage_delta
+
+def test_records_are_appended_to_the_trace(tmp_path):
+    trace_path = tmp_path / "trace.jsonl"
+    metrics = MetricsRecorder(trace_path=str(trace_path))
+
+    metrics.record("task", task="ideation_task", wall_time=1.5, prompt_tokens=10)
+    with metrics.measure("scene", act=1, chapter="One") as call:
+        call["bytes_written"] = 42
+
+    lines = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert [line["phase"] for line in lines] == ["task", "scene"]
+    assert lines[1]["bytes_written"] == 42
+    assert lines[1]["wall_time"] >= 0
+
+def test_failed_calls_record_the_error(tmp_path):
+    metrics = MetricsRecorder(trace_path=str(tmp_path / "trace.jsonl"))
+
+    with pytest.raises(RuntimeError):
+        with metrics.measure("image"):
+            raise RuntimeError("rate limited")
+
+    assert metrics.records[0]["error"] == "rate limited"
+
+def test_summary_groups_by_phase_act_and_chapter(tmp_path):
+    metrics = MetricsRecorder(trace_path=str(tmp_path / "trace.jsonl"))
+    metrics.record("scene", act=1, chapter="One", wall_time=2, prompt_tokens=100, completion_tokens=50)
+    metrics.record("scene", act=1, chapter="Two", wall_time=3, prompt_tokens=200, completion_tokens=70, retries=1)
+    metrics.record("image", wall_time=4, bytes_written=1024)
+
+    summary = metrics.write_summary()
+
+    assert summary["phase"]["scene"]["calls"] == 2
+    assert summary["phase"]["scene"]["prompt_tokens"] == 300
+    assert summary["phase"]["image"]["bytes_written"] == 1024
+    assert summary["act"]["Act 1"]["retries"] == 1
+    assert summary["chapter"]["Act 1 / Two"]["completion_tokens"] == 70
+    assert json.loads((tmp_path / "trace_summary.json").read_text()) == summary
+
+def test_usage_delta_counts_llm_calls():
+    before = {"prompt_tokens": 10, "completion_tokens": 5, "requests": 1}
+    after = {"prompt_tokens": 40, "completion_tokens": 25, "requests": 4}
+
+    assert usage_delta(before, after) == {"prompt_tokens": 30, "completion_tokens": 20, "llm_calls": 3}
+
+def test_null_recorder_yields_fields():
+    with NullMetricsRecorder().measure("scene", act=1) as call:
+        call["bytes_written"] = 1
+
+    assert call == {"act": 1, "bytes_written": 1}
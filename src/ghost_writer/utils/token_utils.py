@@ -0,0 +1,35 @@
+import math
+
+# Rough average for English prose with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of LLM tokens in the text.
+
+    Uses a characters-per-token heuristic instead of a real tokenizer so it is fast, works
+    offline and does not depend on the model.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: The estimated token count.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cuts the text so that its estimated token count does not exceed max_tokens.
+
+    Args:
+        text (str): The text to truncate.
+        max_tokens (int): The token budget.
+
+    Returns:
+        str: The text, shortened with a trailing ellipsis if it did not fit.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = max(max_tokens * CHARS_PER_TOKEN - 3, 0)
+    return text[:max_chars] + "..."